@@ -15,12 +15,20 @@ CẤU TRÚC PACKAGE:
     ├── __init__.py          ← File này
     ├── base.py              → GraphAlgorithms (kết hợp tất cả mixins)
     ├── traversal.py         → TraversalMixin (BFS, DFS)
-    ├── shortest_path.py     → ShortestPathMixin (Dijkstra)
+    ├── traversal_engine.py  → Danh sách kề số nguyên, BFS/DFS/tô màu trên mảng
+    ├── shortest_path.py     → ShortestPathMixin (Dijkstra, A* ALT)
+    ├── landmarks.py         → Bảng mốc ALT cho shortest_path
+    ├── isochrone.py         → IsochroneMixin (vùng đến được trong bán kính)
     ├── bipartite.py         → BipartiteMixin
     ├── mst.py               → MSTMixin, UnionFind
     ├── flow.py              → FlowMixin
     ├── euler.py             → EulerMixin
-    └── conversion.py        → ConversionMixin
+    ├── conversion.py        → ConversionMixin
+    ├── components.py        → Thành phần liên thông yếu/mạnh (cache theo đồ thị)
+    ├── partition.py         → Tách theo thành phần, chạy từng phần trong process pool
+    ├── validation.py        → GraphIndex, báo cáo cấu trúc đồ thị
+    ├── simplification.py    → simplify_graph, co chuỗi đỉnh bậc 2
+    └── conversion_engine.py → GraphArrays, chuyển đổi trên mảng thuần
 
 CÁCH SỬ DỤNG:
     from algorithms import GraphAlgorithms, UnionFind
@@ -16,13 +16,14 @@ KIẾN TRÚC MIXIN:
     └─────────────────┬───────────────────┘
                       │
         ┌─────────────┴─────────────┐
-        │   Kế thừa từ 7 Mixins     │
+        │   Kế thừa từ 8 Mixins     │
         └───────────────────────────┘
                       │
     ┌─────────────────┴─────────────────────┐
     │                                       │
     ├─ TraversalMixin      (BFS, DFS)      │
     ├─ ShortestPathMixin   (Dijkstra)      │  
+    ├─ IsochroneMixin      (Isochrone)     │
     ├─ BipartiteMixin      (2-Coloring)    │
     ├─ MSTMixin            (Prim, Kruskal) │
     ├─ FlowMixin           (Ford-Fulkerson)│
@@ -55,23 +56,52 @@ LƯU Ý QUAN TRỌNG:
     - GraphData = định dạng của bạn (từ frontend)
     - NetworkX Graph = định dạng thư viện (để chạy thuật toán)
     - _build_networkx_graph() chuyển đổi GraphData → NetworkX
+    - self.index (validation.py): chỉ mục đỉnh + báo cáo cấu trúc, dựng một lần
+      và cache trên GraphData; dùng check_preconditions() thay vì tự quét lại
+    - Thời gian dựng index/NetworkX được ghi vào metrics (pha "index",
+      "build_graph"); mã gọi thuật toán bọc bằng `with phase("algorithm")`
+    - networkx được import lười trong _build_networkx_graph() để tiến trình
+      khởi động nhanh (import networkx mất ~100ms)
+    - Đồ thị dựng sẵn lúc khởi động (warmup.py) đăng ký qua register_prebuilt();
+      request có cùng nội dung đồ thị dùng lại self.G thay vì dựng lại
+      → thuật toán KHÔNG được sửa self.G (cần xóa cạnh thì tự G.copy())
+    - self.G dựng lười và cache trên self.index (cùng GraphData → dùng chung
+      giữa các GraphAlgorithms, vd: các job của /api/batch): BFS/DFS/bipartite dùng danh sách kề số nguyên của
+      traversal_engine.py (cache trên self.index) và không bao giờ dựng NetworkX
+    - self.components() / self.unreachable(): thành phần liên thông tính một lần
+      (components.py) → truy vấn giữa hai thành phần khác nhau trả lời ngay
+    - self.component_parts(): đồ thị tách theo thành phần (partition.py) -
+      Kruskal, bipartite, kiểm tra bậc Euler chạy từng phần trong process pool
 ================================================================================
 """
-import networkx as nx
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
 from models import GraphData
+from metrics import phase, record_graph
 
 from .traversal import TraversalMixin
 from .shortest_path import ShortestPathMixin
+from .isochrone import IsochroneMixin
 from .bipartite import BipartiteMixin
 from .mst import MSTMixin
 from .flow import FlowMixin
 from .euler import EulerMixin
 from .conversion import ConversionMixin
+from .components import ComponentLabels, component_labels
+from .partition import ComponentPart, partition_graph
+from .validation import graph_content_hash, graph_index
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+# Đồ thị NetworkX dựng sẵn theo hash nội dung (+ kích thước để khỏi hash mọi request)
+_prebuilt_graphs: Dict[str, "nx.Graph"] = {}
+_prebuilt_sizes: Set[Tuple[int, int]] = set()
 
 
 class GraphAlgorithms(
     TraversalMixin,          # Cung cấp: bfs(), dfs()
     ShortestPathMixin,       # Cung cấp: shortest_path()
+    IsochroneMixin,          # Cung cấp: isochrone()
     BipartiteMixin,          # Cung cấp: check_bipartite()
     MSTMixin,                # Cung cấp: prim_mst(), kruskal_mst()
     FlowMixin,               # Cung cấp: ford_fulkerson()
@@ -93,12 +123,80 @@ class GraphAlgorithms(
         
         Thuộc tính được tạo:
             self.graph_data: Lưu trữ dữ liệu gốc
-            self.G: Đồ thị NetworkX để chạy thuật toán
+            self.index: Chỉ mục đỉnh + báo cáo cấu trúc (cache trên graph_data)
+            self.G: Đồ thị NetworkX để chạy thuật toán (property, dựng lười)
         """
         self.graph_data = graph_data
-        self.G = self._build_networkx_graph()
+        record_graph(len(graph_data.nodes), len(graph_data.edges))
+        with phase("index"):
+            self.index = graph_index(graph_data)
+
+    @property
+    def G(self) -> "nx.Graph":
+        """Đồ thị NetworkX - dựng lười ở lần dùng đầu tiên
+        
+        BFS/DFS/bipartite chạy trên traversal_engine nên không cần dựng.
+        Cache trên self.index → các GraphAlgorithms khác trên cùng GraphData dùng lại.
+        """
+        index = self.index
+        if index.networkx is None:
+            graph_data = self.graph_data
+            with phase("build_graph"):
+                G = None
+                if (len(graph_data.nodes), len(graph_data.edges)) in _prebuilt_sizes:
+                    G = _prebuilt_graphs.get(graph_content_hash(graph_data))
+                index.networkx = G if G is not None else self._build_networkx_graph()
+        return index.networkx
+
+    @staticmethod
+    def register_prebuilt(algo: "GraphAlgorithms") -> None:
+        """Đăng ký đồ thị NetworkX đã dựng để các request sau dùng lại
+        
+        Tham số:
+            algo: GraphAlgorithms đã khởi tạo (thường là đồ thị mặc định lúc khởi động)
+        """
+        data = algo.graph_data
+        _prebuilt_graphs[graph_content_hash(data)] = algo.G
+        _prebuilt_sizes.add((len(data.nodes), len(data.edges)))
     
-    def _build_networkx_graph(self) -> nx.Graph:
+    def check_preconditions(self, *node_ids: Optional[str],
+                            non_negative_weights: bool = False) -> Optional[str]:
+        """Kiểm tra điều kiện đầu vào trong O(1) nhờ chỉ mục đã cache
+        
+        Tham số:
+            node_ids: Các đỉnh phải tồn tại (bỏ qua None)
+            non_negative_weights: True nếu thuật toán cần trọng số >= 0
+        
+        Trả về:
+            Thông báo lỗi, hoặc None nếu hợp lệ
+        """
+        missing = self.index.missing_nodes(*node_ids)
+        if missing:
+            return f"Node not found: {', '.join(missing)}"
+        if non_negative_weights and self.index.report.has_negative_weights:
+            return "Graph has negative edge weights"
+        return None
+    
+    def components(self, kind: str = "weak") -> ComponentLabels:
+        """Nhãn thành phần liên thông ("weak" | "strong"), cache trên self.index"""
+        return component_labels(self.graph_data, kind)
+
+    def component_parts(self) -> List[ComponentPart]:
+        """Đồ thị tách theo thành phần liên thông yếu (partition.py), cache trên self.index"""
+        if self.index.parts is None:
+            self.index.parts = partition_graph(self.graph_data)
+        return self.index.parts
+
+    def unreachable(self, source: str, target: str) -> bool:
+        """True nếu chắc chắn không có đường source → target - O(1) sau lần đầu
+        
+        Khác thành phần liên thông yếu → không có đường đi (cả có hướng lẫn vô hướng).
+        False KHÔNG có nghĩa là tới được (đồ thị có hướng vẫn phải duyệt).
+        """
+        node_index = self.index.node_index
+        return not self.components("weak").same(node_index[source], node_index[target])
+    
+    def _build_networkx_graph(self) -> "nx.Graph":
         """Chuyển đổi GraphData sang đồ thị NetworkX
         
         CÁCH HOẠT ĐỘNG:
@@ -110,6 +208,8 @@ class GraphAlgorithms(
         Trả về:
             nx.Graph hoặc nx.DiGraph
         """
+        import networkx as nx
+
         # BƯỚC 1: Chọn loại đồ thị
         if self.graph_data.directed:
             G = nx.DiGraph()   # Đồ thị có hướng
@@ -125,8 +225,11 @@ class GraphAlgorithms(
                 label=node.label   # Nhãn hiển thị
             )
         
-        # BƯỚC 3: Thêm các cạnh với trọng số
-        for edge in self.graph_data.edges:
+        # BƯỚC 3: Thêm các cạnh với trọng số (bỏ qua cạnh treo - xem self.index.report)
+        dangling = self.index.dangling_edge_indices
+        for k, edge in enumerate(self.graph_data.edges):
+            if k in dangling:
+                continue
             G.add_edge(
                 edge.source,       # Đỉnh nguồn
                 edge.target,       # Đỉnh đích
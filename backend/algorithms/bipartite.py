@@ -14,33 +14,116 @@ CÁCH HOẠT ĐỘNG:
     5. Lặp lại cho tất cả thành phần liên thông
     => Độ phức tạp: O(V + E)
 
+    Chạy trên engine mảng số nguyên (traversal_engine.py): màu là mảng int8,
+    hàng đợi là mảng int cấp phát sẵn. Không trace + có numpy → tô màu theo
+    chẵn lẻ tầng BFS vector hóa rồi kiểm tra mọi cạnh một lần.
+    Đồ thị lớn nhiều thành phần → tô từng thành phần trong process pool
+    (partition.py), ghép lại cho đúng kết quả tuần tự.
+
 ĐẦU VÀO:
-    - self.G: Đồ thị VÔ HƯỚNG cần kiểm tra
+    - self.graph_data: Đồ thị VÔ HƯỚNG cần kiểm tra
+    - include_steps: Ghi trace từng bước tô màu
 
 ĐẦU RA:
     - AlgorithmResponse chứa:
         + is_bipartite: True/False
         + set_a, set_b: Hai tập đỉnh (nếu là bipartite)
-        + coloring: Màu của từng đỉnh
+        + coloring: Màu của từng đỉnh (None nếu không phải bipartite)
+        + conflict_edge: Cạnh có hai đầu cùng màu (nếu không phải bipartite)
         + steps: Các bước tô màu
 
 ĐIỀU KIỆN:
     - Đồ thị phải VÔ HƯỚNG
     - Có hướng thì không áp dụng được
 """
-from collections import deque
-from models import AlgorithmResponse, AlgorithmStep
+from array import array
+from typing import List
+from models import AlgorithmResponse, AlgorithmStep, trusted_step
+
+from . import traversal_engine as engine
+from .partition import ComponentPart, bipartite_part, plan_bins, run_per_component
 
 
 class BipartiteMixin:
     """Mixin cung cấp kiểm tra đồ thị hai phần"""
     
-    def check_bipartite(self) -> AlgorithmResponse:
+    def check_bipartite(self, include_steps: bool = True) -> AlgorithmResponse:
         """
         Kiểm tra đồ thị có phải bipartite sử dụng thuật toán tô màu hai màu
         
+        Tham số:
+            include_steps: Ghi trace từng bước (False → chỉ kết quả)
+
         Trả về:
-      AlgorithmResponse với các bước thực thi
+            AlgorithmResponse với các bước thực thi
         """
-        # TODO: Triển khai thuật toán kiểm tra bipartite
-        pass
+        if self.graph_data.directed:
+            return AlgorithmResponse(
+                success=False, algorithm="bipartite", steps=[], result=None,
+                error="Bipartite check requires an undirected graph"
+            )
+        adj = engine.int_adjacency(self.graph_data)
+        parts = self.component_parts()
+        bins = plan_bins(parts)
+        steps: List[AlgorithmStep] = []
+        if bins is not None:
+            color, conflict, order = self._two_color_parallel(parts, bins)
+            if include_steps:
+                steps = self._coloring_steps(adj, color, order)
+        elif not include_steps and engine.use_numpy(adj):
+            color, conflict = engine.two_color_numpy(adj)
+            color = color.tolist()
+        else:
+            color, conflict, order = engine.two_color(adj)
+            if include_steps:
+                steps = self._coloring_steps(adj, color, order)
+
+        ids = adj.node_ids
+        result = {"is_bipartite": conflict is None, "set_a": [], "set_b": [],
+                  "coloring": None, "conflict_edge": None, "parallel": bins is not None}
+        if conflict is None:
+            result["set_a"] = [ids[i] for i, c in enumerate(color) if c == 0]
+            result["set_b"] = [ids[i] for i, c in enumerate(color) if c == 1]
+            result["coloring"] = {ids[i]: int(c) for i, c in enumerate(color)}
+        else:
+            edge = {"source": ids[conflict[0]], "target": ids[conflict[1]]}
+            result["conflict_edge"] = edge
+            if include_steps:
+                steps.append(trusted_step(
+                    len(steps), "conflict",
+                    f"Xung đột: {edge['source']} và {edge['target']} kề nhau nhưng cùng màu",
+                    node=edge["target"], edge=edge
+                ))
+        if include_steps:
+            verdict = "LÀ" if conflict is None else "KHÔNG phải"
+            steps.append(trusted_step(len(steps), "complete", f"Đồ thị {verdict} đồ thị hai phần"))
+        return AlgorithmResponse(success=True, algorithm="bipartite", steps=steps, result=result)
+
+    def _two_color_parallel(self, parts: List[ComponentPart], bins: List[List[int]]):
+        """
+        Tô màu từng thành phần trong process pool rồi ghép về chỉ số toàn cục
+
+        Ghép theo thứ tự nhãn và dừng ở thành phần xung đột đầu tiên → cùng
+        (color, conflict, order) với engine.two_color() trên cả đồ thị
+        """
+        outputs, _ = run_per_component(bipartite_part, parts, bins)
+        color = array("b", [-1]) * len(self.graph_data.nodes)
+        order = array("q")
+        for part, (part_color, part_conflict, part_order) in zip(parts, outputs):
+            to_global = part.indices
+            for v in part_order:
+                color[to_global[v]] = part_color[v]
+                order.append(to_global[v])
+            if part_conflict is not None:
+                return color, (to_global[part_conflict[0]], to_global[part_conflict[1]]), order
+        return color, None, order
+
+    @staticmethod
+    def _coloring_steps(adj: "engine.IntAdjacency", color, order) -> List[AlgorithmStep]:
+        """Một bước "color" cho mỗi đỉnh theo thứ tự tô"""
+        ids = adj.node_ids
+        return [
+            trusted_step(k, "color", f"Tô {ids[v]} màu {color[v]}", node=ids[v],
+                         sets={"color": int(color[v])})
+            for k, v in enumerate(order)
+        ]
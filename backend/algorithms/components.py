@@ -0,0 +1,191 @@
+"""
+FILE: components.py
+MÔ TẢ: Thành phần liên thông (yếu / mạnh), tính một lần cho mỗi đồ thị
+
+CHỨC NĂNG:
+    - Gán nhãn thành phần cho mọi đỉnh, cache trên GraphIndex của đồ thị
+      (validation.py) → các request sau trên cùng GraphData dùng lại
+    - Trả lời "chắc chắn không có đường đi u → v" trong O(1): khác thành phần
+      liên thông yếu → shortest_path / ford_fulkerson trả kết quả ngay thay vì
+      duyệt hết thành phần chứa nguồn
+    - MST biết đồ thị không liên thông → báo rừng khung (component_count)
+
+CÁCH HOẠT ĐỘNG:
+    Liên thông yếu ("weak" - cũng là liên thông thường của đồ thị vô hướng):
+        - Union-Find trên mảng int (nén đường nửa + hợp theo kích thước)
+          duyệt mọi cạnh của danh sách kề số nguyên (traversal_engine.py)
+    Liên thông mạnh ("strong" - chỉ có nghĩa với đồ thị có hướng):
+        - Tarjan dạng lặp: ngăn xếp gọi là hai mảng (đỉnh, con trỏ cạnh)
+          → không đệ quy, chạy được trên đồ thị OSM lớn
+    Nhãn tất định: thành phần chứa đỉnh xuất hiện trước (theo thứ tự
+    graph_data.nodes) có nhãn nhỏ hơn; thành phần 0 chứa đỉnh đầu tiên
+    => O(V + E) mỗi loại, một lần cho mỗi đồ thị
+
+ĐẦU RA:
+    - ComponentLabels: labels[i] = nhãn của đỉnh thứ i, sizes[c] = số đỉnh
+      của thành phần c
+
+LƯU Ý:
+    - Đồ thị vô hướng: "strong" trùng "weak" → dùng chung một bảng nhãn
+    - Có hướng: cùng thành phần yếu CHƯA chắc có đường đi (cần duyệt);
+      khác thành phần yếu thì chắc chắn không có
+"""
+from array import array
+from typing import List
+
+from models import GraphData
+from .traversal_engine import IntAdjacency, int_adjacency
+from .validation import graph_index
+
+KINDS = ("weak", "strong")
+
+
+class ComponentLabels:
+    """Nhãn thành phần liên thông theo chỉ số đỉnh (thứ tự của graph_data.nodes)"""
+
+    __slots__ = ("kind", "labels", "sizes")
+
+    def __init__(self, kind: str, labels: array, sizes: List[int]):
+        self.kind = kind
+        self.labels = labels
+        self.sizes = sizes
+
+    @property
+    def count(self) -> int:
+        return len(self.sizes)
+
+    def same(self, i: int, j: int) -> bool:
+        """Hai đỉnh (chỉ số) cùng thành phần - O(1)"""
+        return self.labels[i] == self.labels[j]
+
+    def members(self) -> List[List[int]]:
+        """Chỉ số đỉnh của từng thành phần (theo nhãn), mỗi nhóm tăng dần"""
+        groups: List[List[int]] = [[] for _ in self.sizes]
+        for i, c in enumerate(self.labels):
+            groups[c].append(i)
+        return groups
+
+
+def _relabel(roots) -> ComponentLabels:
+    """Đổi đại diện bất kỳ → nhãn 0..k-1 theo thứ tự xuất hiện đầu tiên"""
+    mapping = {}
+    labels = array("q", [0]) * len(roots)
+    sizes: List[int] = []
+    for i, root in enumerate(roots):
+        c = mapping.get(root)
+        if c is None:
+            c = mapping[root] = len(sizes)
+            sizes.append(0)
+        labels[i] = c
+        sizes[c] += 1
+    return ComponentLabels("", labels, sizes)
+
+
+def weak_components(adj: IntAdjacency) -> ComponentLabels:
+    """Liên thông yếu bằng Union-Find trên mảng"""
+    n = adj.node_count
+    offsets, targets = adj.offsets, adj.targets
+    parent = array("q", range(n))
+    size = array("q", [1]) * n
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]  # Nén đường nửa
+            x = parent[x]
+        return x
+
+    for u in range(n):
+        for k in range(offsets[u], offsets[u + 1]):
+            a, b = find(u), find(targets[k])
+            if a != b:
+                if size[a] < size[b]:
+                    a, b = b, a
+                parent[b] = a
+                size[a] += size[b]
+    result = _relabel([find(i) for i in range(n)])
+    result.kind = "weak"
+    return result
+
+
+def strong_components(adj: IntAdjacency) -> ComponentLabels:
+    """Liên thông mạnh bằng Tarjan dạng lặp"""
+    n = adj.node_count
+    offsets, targets = adj.offsets, adj.targets
+    order = array("q", [-1]) * n   # Thứ tự phát hiện
+    low = array("q", [0]) * n
+    on_stack = bytearray(n)
+    comp = array("q", [0]) * n
+    call_node = array("q", [0]) * n
+    call_edge = array("q", [0]) * n
+    stack = array("q")
+    counter = found = 0
+    for root in range(n):
+        if order[root] != -1:
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        call_node[0], call_edge[0] = root, offsets[root]
+        top = 0
+        while top >= 0:
+            u = call_node[top]
+            k, end = call_edge[top], offsets[u + 1]
+            descended = False
+            while k < end:
+                v = targets[k]
+                k += 1
+                if order[v] == -1:
+                    # "Gọi đệ quy" v: lưu con trỏ cạnh của u rồi đẩy v
+                    call_edge[top] = k
+                    order[v] = low[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = 1
+                    top += 1
+                    call_node[top], call_edge[top] = v, offsets[v]
+                    descended = True
+                    break
+                if on_stack[v] and order[v] < low[u]:
+                    low[u] = order[v]
+            if descended:
+                continue
+            # u đã duyệt xong: u là gốc của một thành phần mạnh?
+            if low[u] == order[u]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    comp[w] = found
+                    if w == u:
+                        break
+                found += 1
+            top -= 1
+            if top >= 0:
+                p = call_node[top]
+                if low[u] < low[p]:
+                    low[p] = low[u]
+    result = _relabel(comp)
+    result.kind = "strong"
+    return result
+
+
+def component_labels(graph_data: GraphData, kind: str = "weak") -> ComponentLabels:
+    """
+    Nhãn thành phần liên thông đã cache trên GraphIndex của graph_data
+
+    Tham số:
+        kind: "weak" | "strong" (đồ thị vô hướng: hai loại trùng nhau)
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown component kind: {kind}")
+    if not graph_data.directed:
+        kind = "weak"
+    index = graph_index(graph_data)
+    if index.components is None:
+        index.components = {}
+    labels = index.components.get(kind)
+    if labels is None:
+        adj = int_adjacency(graph_data)
+        labels = weak_components(adj) if kind == "weak" else strong_components(adj)
+        index.components[kind] = labels
+    return labels
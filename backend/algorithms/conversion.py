@@ -7,48 +7,192 @@ CHỨC NĂNG:
         + Ma trận kề (Adjacency Matrix)
         + Danh sách kề (Adjacency List)
         + Danh sách cạnh (Edge List)
+    - Ma trận kề có 3 kiểu bố trí (matrix_layout):
+        + "dense": ma trận n×n đầy đủ (chỉ nên dùng cho đồ thị nhỏ)
+        + "coo":   bộ ba (row, col, data) - chỉ lưu ô khác 0
+        + "csr":   (indptr, indices, data) - nén theo hàng
+    - Sinh ma trận dày theo từng hàng (iter_matrix_rows) để stream ra HTTP
+    - Mã hóa nhị phân gọn (encode_matrix_binary) thay cho JSON
+    - Chuyển trực tiếp dữ liệu thô giữa mọi cặp định dạng (convert_data),
+      không dựng lại Node/Edge model - xem conversion_engine.py
 
 CÁCH HOẠT ĐỘNG:
     Ma trận kề:
         - Ma trận n×n, matrix[i][j] = trọng số cạnh (i,j)
         - Ưu: Kiểm tra cạnh O(1)
         - Nhược: Tốn bộ nhớ O(V²)
-    
+        - Mọi kiểu bố trí đều dựng từ các hàng thưa (conversion_engine.sparse_rows)
+          nên bộ nhớ chỉ là O(V+E); bản dày được sinh từng hàng một
+
     Danh sách kề:
         - Mỗi đỉnh lưu danh sách đỉnh kề
         - Ưu: Tiết kiệm bộ nhớ O(V+E)
         - Nhược: Kiểm tra cạnh O(V)
-    
+
     Danh sách cạnh:
         - Danh sách các cặp (u, v, weight)
         - Ưu: Đơn giản, dễ sắp xếp
         - Nhược: Tìm đỉnh kề chậm
 
+ĐỊNH DẠNG NHỊ PHÂN (little-endian):
+    magic "GMAT" | uint8 version | uint8 layout (0=dense, 1=coo, 2=csr)
+    | uint32 n (số đỉnh) | uint32 nnz (số ô khác 0)
+    | n × (uint32 độ dài + UTF-8 id đỉnh)
+    | dữ liệu:
+        dense: n hàng × n float64
+        coo:   nnz uint32 row | nnz uint32 col | nnz float64 data
+        csr:   (n+1) uint32 indptr | nnz uint32 indices | nnz float64 data
+
 ĐẦU VÀO:
-    - graph_data: GraphData object
+    - graph_data: GraphData object (hoặc GraphArrays đã đọc sẵn)
     - to_format: "adjacency_matrix" | "adjacency_list" | "edge_list"
+    - matrix_layout: "dense" | "coo" | "csr" (chỉ dùng cho adjacency_matrix)
 
 ĐẦU RA:
     - Dictionary chứa dữ liệu đã chuyển đổi
 """
-from typing import Dict, Any
+import struct
+import sys
+from array import array
+from typing import Dict, Any, List, Tuple, Iterator, Union
 from models import GraphData
+from . import conversion_engine as engine
+from .conversion_engine import GraphArrays
+
+# Mã kiểu bố trí trong header nhị phân
+MATRIX_LAYOUT_CODES = {"dense": 0, "coo": 1, "csr": 2}
+BINARY_MAGIC = b"GMAT"
+BINARY_VERSION = 1
+
+
+def _le_bytes(values: array) -> bytes:
+    """Trả về bytes little-endian của một array (đổi byte order nếu cần)"""
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _as_arrays(graph: Union[GraphData, GraphArrays]) -> GraphArrays:
+    """Chấp nhận GraphData hoặc GraphArrays"""
+    if isinstance(graph, GraphArrays):
+        return graph
+    return engine.from_graph_data(graph)
 
 
 class ConversionMixin:
     """Mixin cung cấp chuyển đổi biểu diễn đồ thị"""
-    
+
     @staticmethod
-    def convert_representation(graph_data: GraphData, to_format: str) -> Dict[str, Any]:
+    def iter_matrix_rows(graph: Union[GraphData, GraphArrays]) -> Tuple[List[str], Iterator[List[float]]]:
+        """
+        Sinh ma trận kề dày theo từng hàng, không giữ toàn bộ ma trận trong bộ nhớ
+
+        Trả về:
+            (node_ids, iterator) - iterator trả về lần lượt từng hàng (list n float)
+        """
+        arrays = _as_arrays(graph)
+        rows = engine.sparse_rows(arrays)
+        n = arrays.node_count
+
+        def generate() -> Iterator[List[float]]:
+            for row in rows:
+                dense_row = [0.0] * n
+                for j, weight in row.items():
+                    dense_row[j] = weight
+                yield dense_row
+
+        return arrays.node_ids, generate()
+
+    @staticmethod
+    def encode_matrix_binary(graph: Union[GraphData, GraphArrays],
+                             matrix_layout: str = "csr") -> Iterator[bytes]:
+        """
+        Mã hóa ma trận kề sang định dạng nhị phân (xem header của file)
+
+        Dữ liệu được sinh theo từng khối nên có thể stream trực tiếp ra
+        response; với layout "dense" mỗi khối là một hàng.
+
+        Tham số:
+            graph: Dữ liệu đồ thị
+            matrix_layout: "dense" | "coo" | "csr"
+
+        Trả về:
+            Iterator các khối bytes
+        """
+        if matrix_layout not in MATRIX_LAYOUT_CODES:
+            raise ValueError(f"Unsupported matrix layout: {matrix_layout}")
+
+        arrays = _as_arrays(graph)
+        rows = engine.sparse_rows(arrays)
+        n = arrays.node_count
+        nnz = sum(len(row) for row in rows)
+
+        yield BINARY_MAGIC + struct.pack(
+            "<BBII", BINARY_VERSION, MATRIX_LAYOUT_CODES[matrix_layout], n, nnz
+        )
+
+        ids_block = bytearray()
+        for node_id in arrays.node_ids:
+            encoded = node_id.encode("utf-8")
+            ids_block += struct.pack("<I", len(encoded))
+            ids_block += encoded
+        yield bytes(ids_block)
+
+        if matrix_layout == "dense":
+            for row in rows:
+                dense_row = array("d", bytes(8 * n))
+                for j, weight in row.items():
+                    dense_row[j] = weight
+                yield _le_bytes(dense_row)
+        elif matrix_layout == "coo":
+            coo = engine.rows_to_coo(rows)
+            yield _le_bytes(array("I", coo["row"]))
+            yield _le_bytes(array("I", coo["col"]))
+            yield _le_bytes(array("d", coo["data"]))
+        else:
+            csr = engine.rows_to_csr(rows)
+            yield _le_bytes(array("I", csr["indptr"]))
+            yield _le_bytes(array("I", csr["indices"]))
+            yield _le_bytes(array("d", csr["data"]))
+
+    @staticmethod
+    def convert_representation(
+        graph_data: Union[GraphData, GraphArrays],
+        to_format: str,
+        matrix_layout: str = "dense"
+    ) -> Dict[str, Any]:
         """
         Chuyển đổi đồ thị sang các biểu diễn khác nhau
-        
+
         Tham số:
             graph_data: Dữ liệu đồ thị
             to_format: Định dạng đích (adjacency_matrix, adjacency_list, edge_list)
-            
+            matrix_layout: Kiểu bố trí ma trận kề (dense, coo, csr)
+
+        Trả về:
+            Dictionary chứa dữ liệu đã chuyển đổi
+        """
+        return engine.write(_as_arrays(graph_data), to_format, matrix_layout)
+
+    @staticmethod
+    def convert_data(
+        data: Dict[str, Any],
+        from_format: str,
+        to_format: str,
+        directed: bool = False,
+        matrix_layout: str = "dense"
+    ) -> Dict[str, Any]:
+        """
+        Chuyển trực tiếp dữ liệu thô từ from_format sang to_format
+
+        Tham số:
+            data: Dữ liệu nguồn ở định dạng from_format
+            from_format, to_format: adjacency_matrix | adjacency_list | edge_list
+            directed: Đồ thị có hướng hay không
+            matrix_layout: Kiểu bố trí ma trận kề đích
+
         Trả về:
             Dictionary chứa dữ liệu đã chuyển đổi
         """
-        # TODO: Triển khai chuyển đổi biểu diễn đồ thị
-        pass
+        return engine.convert(data, from_format, to_format, directed, matrix_layout)
@@ -0,0 +1,328 @@
+"""
+FILE: conversion_engine.py
+MÔ TẢ: Engine Chuyển Đổi Biểu Diễn - Làm việc trên mảng thuần, không dùng Pydantic
+
+CHỨC NĂNG:
+    - Đọc dữ liệu thô của cả 3 định dạng (và GraphData) thành GraphArrays
+    - Ghi GraphArrays ra cả 3 định dạng
+    - convert(): chuyển trực tiếp giữa mọi cặp định dạng
+    - Không tạo Node/Edge model trung gian → dùng được cho đồ thị rất lớn
+
+CÁCH HOẠT ĐỘNG:
+    GraphArrays là các mảng song song:
+        node_ids[i]              → id của đỉnh i
+        src[k], dst[k], weight[k] → cạnh thứ k (chỉ số đỉnh)
+
+    Mọi phép chuyển đều đi qua GraphArrays:
+        đọc (O(kích thước đầu vào)) → ghi (O(V+E))
+        => Tuyến tính theo kích thước dữ liệu cho mọi cặp định dạng
+
+    Đồ thị vô hướng:
+        - Ma trận/danh sách kề lưu mỗi cạnh 2 lần (i→j và j→i)
+        - Khi đọc, cặp đối xứng chỉ được giữ một lần
+        - Danh sách cạnh được giữ nguyên (kể cả cạnh song song)
+
+ĐỊNH DẠNG ĐẦU VÀO (giống đầu ra của ConversionMixin):
+    adjacency_matrix:
+        {"nodes": [...], "matrix": [[...]]}                         (dense)
+        {"layout": "coo", "nodes": [...], "row", "col", "data"}
+        {"layout": "csr", "nodes": [...], "indptr", "indices", "data"}
+    adjacency_list:
+        {"adjacency_list": {id: [{"node": id, "weight": w}, ...]}}
+        (phần tử kề cũng có thể là chuỗi id, trọng số mặc định 1.0)
+    edge_list:
+        {"edges": [{"source", "target", "weight"}, ...]}
+        (phần tử cũng có thể là [source, target] hoặc [source, target, weight])
+"""
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+from models import GraphData
+
+FORMATS = ("adjacency_matrix", "adjacency_list", "edge_list")
+MATRIX_LAYOUTS = ("dense", "coo", "csr")
+
+
+class GraphArrays:
+    """Đồ thị dạng mảng song song (chỉ số nguyên cho đỉnh)"""
+
+    __slots__ = ("node_ids", "src", "dst", "weight", "directed")
+
+    def __init__(self, node_ids: List[str], src: List[int], dst: List[int],
+                 weight: List[float], directed: bool = False):
+        self.node_ids = node_ids
+        self.src = src
+        self.dst = dst
+        self.weight = weight
+        self.directed = directed
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.src)
+
+
+class _Builder:
+    """Gom đỉnh/cạnh vào GraphArrays, cấp chỉ số cho id đỉnh khi gặp lần đầu"""
+
+    def __init__(self, directed: bool):
+        self.directed = directed
+        self.node_ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.src: List[int] = []
+        self.dst: List[int] = []
+        self.weight: List[float] = []
+        # Cặp (i, j) đã thấy - chỉ dùng để khử cạnh đối xứng khi đọc dạng kề
+        self._seen: Optional[set] = None
+
+    def node(self, node_id) -> int:
+        node_id = str(node_id)
+        i = self.index.get(node_id)
+        if i is None:
+            i = self.index[node_id] = len(self.node_ids)
+            self.node_ids.append(node_id)
+        return i
+
+    def edge(self, i: int, j: int, w: float) -> None:
+        self.src.append(i)
+        self.dst.append(j)
+        self.weight.append(float(w))
+
+    def symmetric_edge(self, i: int, j: int, w: float) -> None:
+        """Thêm cạnh từ dạng kề: với đồ thị vô hướng bỏ qua bản đối xứng"""
+        if self.directed:
+            self.edge(i, j, w)
+            return
+        if self._seen is None:
+            self._seen = set()
+        key = (i, j) if i <= j else (j, i)
+        if key not in self._seen:
+            self._seen.add(key)
+            self.edge(i, j, w)
+
+    def build(self) -> GraphArrays:
+        return GraphArrays(self.node_ids, self.src, self.dst, self.weight, self.directed)
+
+
+# ==================== Đọc ====================
+
+def from_graph_data(graph_data: GraphData) -> GraphArrays:
+    """Đọc GraphData (đã được validate) thành GraphArrays"""
+    builder = _Builder(graph_data.directed)
+    for node in graph_data.nodes:
+        builder.node(node.id)
+    for edge in graph_data.edges:
+        builder.edge(builder.node(edge.source), builder.node(edge.target), edge.weight)
+    return builder.build()
+
+
+def from_edge_list(data: Dict[str, Any], directed: bool = False) -> GraphArrays:
+    """Đọc danh sách cạnh thô"""
+    builder = _Builder(directed)
+    for node_id in data.get("nodes") or ():
+        builder.node(node_id)
+    for item in data["edges"]:
+        if isinstance(item, dict):
+            source, target = item["source"], item["target"]
+            weight = item.get("weight", 1.0)
+        else:
+            source, target = item[0], item[1]
+            weight = item[2] if len(item) > 2 else 1.0
+        builder.edge(builder.node(source), builder.node(target), weight)
+    return builder.build()
+
+
+def from_adjacency_list(data: Dict[str, Any], directed: bool = False) -> GraphArrays:
+    """Đọc danh sách kề thô"""
+    builder = _Builder(directed)
+    adjacency = data["adjacency_list"]
+    # Cấp chỉ số cho tất cả đỉnh nguồn trước để giữ thứ tự đỉnh
+    for node_id in adjacency:
+        builder.node(node_id)
+    for node_id, neighbors in adjacency.items():
+        i = builder.node(node_id)
+        for neighbor in neighbors:
+            if isinstance(neighbor, dict):
+                j = builder.node(neighbor["node"])
+                weight = neighbor.get("weight", 1.0)
+            else:
+                j = builder.node(neighbor)
+                weight = 1.0
+            builder.symmetric_edge(i, j, weight)
+    return builder.build()
+
+
+def from_adjacency_matrix(data: Dict[str, Any], directed: bool = False) -> GraphArrays:
+    """Đọc ma trận kề thô (dense, coo hoặc csr); ô bằng 0 nghĩa là không có cạnh"""
+    builder = _Builder(directed)
+    layout = data.get("layout", "dense")
+    nodes = data.get("nodes")
+
+    if layout == "dense":
+        matrix = data["matrix"]
+        n = len(matrix)
+        for node_id in (nodes if nodes is not None else range(n)):
+            builder.node(node_id)
+        if builder.node_ids and len(builder.node_ids) != n:
+            raise ValueError("Matrix size does not match node list")
+        for i, row in enumerate(matrix):
+            if len(row) != n:
+                raise ValueError("Adjacency matrix must be square")
+            for j, w in enumerate(row):
+                if w:
+                    builder.symmetric_edge(i, j, w)
+        return builder.build()
+
+    if layout not in MATRIX_LAYOUTS:
+        raise ValueError(f"Unsupported matrix layout: {layout}")
+    if nodes is None:
+        raise ValueError("Sparse matrix input requires a 'nodes' list")
+    for node_id in nodes:
+        builder.node(node_id)
+    n = len(builder.node_ids)
+    values = data["data"]
+
+    if layout == "coo":
+        if not len(data["row"]) == len(data["col"]) == len(values):
+            raise ValueError("COO row, col and data must have the same length")
+        pairs: Iterable[Tuple[int, int]] = zip(data["row"], data["col"])
+    else:
+        indptr, indices = data["indptr"], data["indices"]
+        if len(indptr) != n + 1:
+            raise ValueError("CSR indptr length must be n + 1")
+        if len(indices) != len(values):
+            raise ValueError("CSR indices and data must have the same length")
+        pairs = ((i, indices[k]) for i in range(n) for k in range(indptr[i], indptr[i + 1]))
+
+    for (i, j), w in zip(pairs, values):
+        if not (0 <= i < n and 0 <= j < n):
+            raise ValueError(f"Matrix index out of range: ({i}, {j})")
+        if w:
+            builder.symmetric_edge(i, j, w)
+    return builder.build()
+
+
+READERS = {
+    "adjacency_matrix": from_adjacency_matrix,
+    "adjacency_list": from_adjacency_list,
+    "edge_list": from_edge_list,
+}
+
+
+# ==================== Ghi ====================
+
+def sparse_rows(arrays: GraphArrays) -> List[Dict[int, float]]:
+    """Các hàng thưa của ma trận kề: rows[i] = {j: trọng số}; cạnh trùng lấy giá trị sau"""
+    rows: List[Dict[int, float]] = [{} for _ in range(arrays.node_count)]
+    symmetric = not arrays.directed
+    for i, j, w in zip(arrays.src, arrays.dst, arrays.weight):
+        rows[i][j] = w
+        if symmetric:
+            rows[j][i] = w
+    return rows
+
+
+def rows_to_csr(rows: List[Dict[int, float]]) -> Dict[str, List]:
+    """Chuyển các hàng thưa sang dạng CSR (indptr, indices, data)"""
+    indptr = [0]
+    indices: List[int] = []
+    data: List[float] = []
+    for row in rows:
+        for j in sorted(row):
+            indices.append(j)
+            data.append(row[j])
+        indptr.append(len(indices))
+    return {"indptr": indptr, "indices": indices, "data": data}
+
+
+def rows_to_coo(rows: List[Dict[int, float]]) -> Dict[str, List]:
+    """Chuyển các hàng thưa sang dạng COO (row, col, data)"""
+    row_idx: List[int] = []
+    col_idx: List[int] = []
+    data: List[float] = []
+    for i, row in enumerate(rows):
+        for j in sorted(row):
+            row_idx.append(i)
+            col_idx.append(j)
+            data.append(row[j])
+    return {"row": row_idx, "col": col_idx, "data": data}
+
+
+def to_edge_list(arrays: GraphArrays) -> Dict[str, Any]:
+    """Ghi danh sách cạnh"""
+    ids = arrays.node_ids
+    return {
+        "edges": [
+            {"source": ids[i], "target": ids[j], "weight": w}
+            for i, j, w in zip(arrays.src, arrays.dst, arrays.weight)
+        ]
+    }
+
+
+def to_adjacency_list(arrays: GraphArrays) -> Dict[str, Any]:
+    """Ghi danh sách kề"""
+    ids = arrays.node_ids
+    rows = sparse_rows(arrays)
+    return {
+        "adjacency_list": {
+            ids[i]: [{"node": ids[j], "weight": w} for j, w in row.items()]
+            for i, row in enumerate(rows)
+        }
+    }
+
+
+def to_adjacency_matrix(arrays: GraphArrays, matrix_layout: str = "dense") -> Dict[str, Any]:
+    """Ghi ma trận kề theo layout (dense, coo, csr)"""
+    if matrix_layout not in MATRIX_LAYOUTS:
+        raise ValueError(f"Unsupported matrix layout: {matrix_layout}")
+
+    n = arrays.node_count
+    rows = sparse_rows(arrays)
+    if matrix_layout == "dense":
+        matrix = []
+        for row in rows:
+            dense_row = [0.0] * n
+            for j, w in row.items():
+                dense_row[j] = w
+            matrix.append(dense_row)
+        return {"layout": "dense", "nodes": arrays.node_ids, "matrix": matrix}
+
+    sparse = rows_to_coo(rows) if matrix_layout == "coo" else rows_to_csr(rows)
+    return {"layout": matrix_layout, "nodes": arrays.node_ids, "shape": [n, n], **sparse}
+
+
+def write(arrays: GraphArrays, to_format: str, matrix_layout: str = "dense") -> Dict[str, Any]:
+    """Ghi GraphArrays ra định dạng đích"""
+    if to_format == "adjacency_matrix":
+        return to_adjacency_matrix(arrays, matrix_layout)
+    if to_format == "adjacency_list":
+        return to_adjacency_list(arrays)
+    if to_format == "edge_list":
+        return to_edge_list(arrays)
+    raise ValueError(f"Unsupported target format: {to_format}")
+
+
+def read(data: Dict[str, Any], from_format: str, directed: bool = False) -> GraphArrays:
+    """Đọc dữ liệu thô của một định dạng thành GraphArrays"""
+    reader = READERS.get(from_format)
+    if reader is None:
+        raise ValueError(f"Unsupported source format: {from_format}")
+    return reader(data, directed)
+
+
+def convert(data: Dict[str, Any], from_format: str, to_format: str,
+            directed: bool = False, matrix_layout: str = "dense") -> Dict[str, Any]:
+    """
+    Chuyển trực tiếp dữ liệu thô giữa hai định dạng bất kỳ
+
+    Tham số:
+        data: Dữ liệu nguồn (xem ĐỊNH DẠNG ĐẦU VÀO)
+        from_format, to_format: adjacency_matrix | adjacency_list | edge_list
+        directed: Đồ thị có hướng hay không
+        matrix_layout: Layout ma trận đích (dense, coo, csr)
+
+    Trả về:
+        Dictionary dữ liệu ở định dạng đích
+    """
+    return write(read(data, from_format, directed), to_format, matrix_layout)
@@ -26,14 +26,72 @@ CÁCH HOẠT ĐỘNG:
         2. Gặp đỉnh bế tắc → pop và thêm vào kết quả
         3. Lặp lại cho đến hết
         => O(E) - Nhanh hơn Fleury
+
+    Kiểm tra điều kiện (eulerian_check):
+        - Bậc từng đỉnh được đếm riêng trên mỗi thành phần liên thông yếu
+          (partition.py, song song khi đồ thị lớn nhiều thành phần)
+        - Mọi cạnh phải nằm trong CÙNG một thành phần, rồi xét bậc của nó
+        - Đa đồ thị: cạnh song song và khuyên đều tính (lấy từ graph_data,
+          không qua NetworkX vốn gộp cạnh song song)
+
+ĐẦU RA:
+    - Dictionary chứa: has_eulerian_path, has_eulerian_circuit,
+      path (danh sách đỉnh), path_type ("circuit" | "path" | "none"), steps
+
+CẤU HÌNH:
+    GRAPH_API_FLEURY_MAX_EDGES  Fleury O(E²) chỉ chạy khi số cạnh <= ngưỡng (5000)
 """
-import networkx as nx
-from typing import Dict, Any, Optional
-from models import AlgorithmStep
+import os
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+from models import AlgorithmStep, trusted_step
+
+from .partition import euler_degrees_part, plan_bins, run_per_component
+
+FLEURY_MAX_EDGES = int(os.environ.get("GRAPH_API_FLEURY_MAX_EDGES", 5000))
 
 
 class EulerMixin:
     """Mixin cung cấp các thuật toán đường đi/chu trình Euler"""
+
+    def eulerian_check(self) -> Dict[str, Any]:
+        """
+        Kiểm tra điều kiện Euler theo bậc trên từng thành phần liên thông
+
+        Trả về:
+            {"has_eulerian_path", "has_eulerian_circuit", "starts": các đỉnh
+            bắt buộc bắt đầu (rỗng = bất kỳ đỉnh của "component"),
+            "component": các đỉnh của thành phần chứa cạnh, "reason", "parallel"}
+        """
+        parts = self.component_parts()
+        outputs, parallel = run_per_component(euler_degrees_part, parts, plan_bins(parts))
+        with_edges = [(part, degrees) for part, degrees in zip(parts, outputs) if degrees["edges"]]
+        check = {"has_eulerian_path": False, "has_eulerian_circuit": False, "starts": [],
+                 "component": [], "reason": None, "parallel": parallel}
+        if not with_edges:
+            check["reason"] = "Đồ thị không có cạnh"
+            return check
+        if len(with_edges) > 1:
+            check["reason"] = f"Cạnh nằm trên {len(with_edges)} thành phần liên thông"
+            return check
+        part, degrees = with_edges[0]
+        ids = check["component"] = part.node_ids
+        if not self.graph_data.directed:
+            odd = degrees["odd"]
+            check["has_eulerian_circuit"] = not odd
+            check["has_eulerian_path"] = len(odd) in (0, 2)
+            check["starts"] = [ids[v] for v in odd]
+            if len(odd) not in (0, 2):
+                check["reason"] = f"{len(odd)} đỉnh bậc lẻ"
+            return check
+        plus, minus = degrees["plus"], degrees["minus"]
+        balanced = degrees["unbalanced"] == 0
+        check["has_eulerian_circuit"] = balanced and not plus and not minus
+        check["has_eulerian_path"] = balanced and len(plus) == len(minus) and len(plus) <= 1
+        check["starts"] = [ids[v] for v in plus]
+        if not check["has_eulerian_path"]:
+            check["reason"] = "Bán bậc vào/ra không cân bằng"
+        return check
     
     def fleury_algorithm(self, start_node: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -45,8 +103,41 @@ class EulerMixin:
         Trả về:
             Dictionary với đường đi Euler và các bước
         """
-        # TODO: Triển khai thuật toán Fleury
-        pass
+        if len(self.graph_data.edges) > FLEURY_MAX_EDGES:
+            raise ValueError(f"Fleury is O(E^2); graph has more than {FLEURY_MAX_EDGES} edges, use hierholzer")
+        check = self.eulerian_check()
+        start = self._euler_start(check, start_node)
+        if start is None:
+            return self._euler_result(check, None, [])
+        adjacency, edge_count = self._euler_adjacency()
+        used = bytearray(edge_count)
+        remaining = edge_count
+        path = [start]
+        steps: List[AlgorithmStep] = [trusted_step(0, "start", f"Bắt đầu Fleury từ {start}", node=start)]
+        u = start
+        while remaining:
+            candidates = [(v, e) for v, e in adjacency.get(u, ()) if not used[e]]
+            chosen, bridge = candidates[0], ""
+            if len(candidates) > 1:
+                # Tránh cầu: chọn cạnh mà sau khi đi qua vẫn tới được mọi cạnh còn lại
+                bridge = " (cầu - không còn lựa chọn khác)"
+                for v, e in candidates:
+                    used[e] = 1
+                    keeps_connected = self._reachable_edges(adjacency, used, v) == remaining - 1
+                    used[e] = 0
+                    if keeps_connected:
+                        chosen, bridge = (v, e), ""
+                        break
+            v, e = chosen
+            used[e] = 1
+            remaining -= 1
+            path.append(v)
+            steps.append(trusted_step(
+                len(steps), "traverse", f"Đi cạnh {u} → {v}{bridge}",
+                node=v, edge={"source": u, "target": v}
+            ))
+            u = v
+        return self._euler_result(check, path, steps)
     
     def hierholzer_algorithm(self, start_node: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -58,5 +149,96 @@ class EulerMixin:
         Trả về:
             Dictionary với chu trình Euler và các bước
         """
-        # TODO: Triển khai thuật toán Hierholzer
-        pass
+        check = self.eulerian_check()
+        start = self._euler_start(check, start_node)
+        if start is None:
+            return self._euler_result(check, None, [])
+        adjacency, edge_count = self._euler_adjacency()
+        used = bytearray(edge_count)
+        pointer: Dict[str, int] = {}
+        stack = [start]
+        circuit: List[str] = []
+        steps: List[AlgorithmStep] = [trusted_step(0, "start", f"Bắt đầu Hierholzer từ {start}", node=start)]
+        while stack:
+            u = stack[-1]
+            neighbors = adjacency.get(u, ())
+            k = pointer.get(u, 0)
+            while k < len(neighbors) and used[neighbors[k][1]]:
+                k += 1
+            pointer[u] = k
+            if k == len(neighbors):
+                # Bế tắc: u xong, đưa vào kết quả
+                circuit.append(stack.pop())
+                steps.append(trusted_step(len(steps), "backtrack", f"{u} hết cạnh, thêm vào kết quả", node=u))
+            else:
+                v, e = neighbors[k]
+                used[e] = 1
+                stack.append(v)
+                steps.append(trusted_step(
+                    len(steps), "traverse", f"Đi cạnh {u} → {v}",
+                    node=v, edge={"source": u, "target": v}
+                ))
+        circuit.reverse()
+        return self._euler_result(check, circuit, steps)
+
+    @staticmethod
+    def _euler_start(check: Dict[str, Any], start_node: Optional[str]) -> Optional[str]:
+        """Đỉnh bắt đầu hợp lệ (đường đi bắt buộc bắt đầu ở đỉnh lẻ/đỉnh thừa bậc ra)"""
+        if not check["has_eulerian_path"]:
+            return None
+        starts = check["starts"]
+        if starts:
+            return start_node if start_node in starts else starts[0]
+        # Chu trình: mọi đỉnh của thành phần chứa cạnh đều có cạnh
+        component = check["component"]
+        return start_node if start_node is not None and start_node in set(component) else component[0]
+
+    def _euler_adjacency(self) -> Tuple[Dict[str, List[Tuple[str, int]]], int]:
+        """Danh sách kề đa đồ thị: {u: [(v, mã cạnh), ...]} theo thứ tự cạnh"""
+        adjacency: Dict[str, List[Tuple[str, int]]] = {}
+        dangling = self.index.dangling_edge_indices
+        directed = self.graph_data.directed
+        edge_id = 0
+        for k, edge in enumerate(self.graph_data.edges):
+            if k in dangling:
+                continue
+            adjacency.setdefault(edge.source, []).append((edge.target, edge_id))
+            if not directed and edge.source != edge.target:
+                adjacency.setdefault(edge.target, []).append((edge.source, edge_id))
+            edge_id += 1
+        return adjacency, edge_id
+
+    @staticmethod
+    def _reachable_edges(adjacency: Dict[str, List[Tuple[str, int]]], used: bytearray, start: str) -> int:
+        """Số cạnh chưa dùng đi tới được từ start (BFS)"""
+        seen_nodes = {start}
+        seen_edges = set()
+        queue = deque([start])
+        while queue:
+            u = queue.popleft()
+            for v, e in adjacency.get(u, ()):
+                if used[e]:
+                    continue
+                seen_edges.add(e)
+                if v not in seen_nodes:
+                    seen_nodes.add(v)
+                    queue.append(v)
+        return len(seen_edges)
+
+    @staticmethod
+    def _euler_result(check: Dict[str, Any], path: Optional[List[str]],
+                      steps: List[AlgorithmStep]) -> Dict[str, Any]:
+        if path is None:
+            path_type = "none"
+            steps.append(trusted_step(len(steps), "complete", f"Không có đường đi Euler: {check['reason']}"))
+        else:
+            path_type = "circuit" if check["has_eulerian_circuit"] else "path"
+            kind = "Chu trình" if path_type == "circuit" else "Đường đi"
+            steps.append(trusted_step(len(steps), "complete", f"{kind} Euler qua {len(path) - 1} cạnh"))
+        return {
+            "steps": steps,
+            "has_eulerian_path": check["has_eulerian_path"],
+            "has_eulerian_circuit": check["has_eulerian_circuit"],
+            "path": path,
+            "path_type": path_type
+        }
@@ -14,20 +14,27 @@ CÁCH HOẠT ĐỘNG:
     5. Lặp lại cho đến khi không còn đường tăng luồng
     => Độ phức tạp: O(VE²)
 
+    Nguồn và đích khác thành phần liên thông (components.py, đã cache) →
+    luồng cực đại = 0 ngay, không dựng đồ thị thặng dư
+
 ĐẦU VÀO:
     - source: Đỉnh nguồn (phát luồng)
     - sink: Đỉnh đích (nhận luồng)
-    - graph_data: Đồ thị có capacity trên các cạnh
+    - graph_data: Đồ thị có capacity trên các cạnh (thiếu capacity → dùng weight;
+      cạnh song song cộng dồn; đồ thị vô hướng: mỗi cạnh có capacity cả hai chiều)
 
 ĐẦU RA:
     - Dictionary chứa:
         + max_flow: Giá trị luồng cực đại
-        + flow_edges: Luồng trên từng cạnh
+        + flow_edges: Luồng (ròng) trên các cạnh có luồng > 0
         + steps: Các lần tăng luồng
 """
 from collections import deque
-from typing import Dict, Any
-from models import AlgorithmStep
+from typing import Dict, Any, List
+from models import AlgorithmStep, trusted_step
+
+# Dung sai so sánh luồng/dung lượng số thực
+EPSILON = 1e-9
 
 
 class FlowMixin:
@@ -44,5 +51,73 @@ class FlowMixin:
         Trả về:
             Dictionary với max flow, flow edges, và các bước
         """
-        # TODO: Triển khai thuật toán Ford-Fulkerson/Edmonds-Karp
-        pass
+        if source == sink:
+            raise ValueError("Source and sink must be different")
+        if self.unreachable(source, sink):
+            return {
+                "steps": [trusted_step(
+                    0, "unreachable",
+                    f"{source} và {sink} khác thành phần liên thông → luồng cực đại = 0",
+                    node=sink
+                )],
+                "max_flow": 0.0,
+                "flow_edges": []
+            }
+
+        # BƯỚC 1: Đồ thị thặng dư residual[u][v], capacity ban đầu giữ trong capacity
+        capacity: Dict[str, Dict[str, float]] = {}
+        dangling = self.index.dangling_edge_indices
+        directed = self.graph_data.directed
+        for k, edge in enumerate(self.graph_data.edges):
+            if k in dangling or edge.source == edge.target:
+                continue
+            cap = edge.capacity if edge.capacity is not None else edge.weight
+            u, v = edge.source, edge.target
+            capacity.setdefault(u, {})
+            capacity.setdefault(v, {})
+            capacity[u][v] = capacity[u].get(v, 0.0) + cap
+            capacity[v].setdefault(u, 0.0)
+            if not directed:
+                capacity[v][u] += cap
+        residual = {u: dict(neighbors) for u, neighbors in capacity.items()}
+
+        steps: List[AlgorithmStep] = []
+        max_flow = 0.0
+        while True:
+            # BƯỚC 2: BFS tìm đường tăng luồng ngắn nhất (theo số cạnh)
+            parent = {source: None}
+            queue = deque([source])
+            while queue and sink not in parent:
+                u = queue.popleft()
+                for v, cap in residual.get(u, {}).items():
+                    if cap > EPSILON and v not in parent:
+                        parent[v] = u
+                        queue.append(v)
+            if sink not in parent:
+                break
+            path = [sink]
+            while parent[path[-1]] is not None:
+                path.append(parent[path[-1]])
+            path.reverse()
+
+            # BƯỚC 3-4: Dung lượng thắt cổ chai, cập nhật thuận/ngược
+            bottleneck = min(residual[u][v] for u, v in zip(path, path[1:]))
+            for u, v in zip(path, path[1:]):
+                residual[u][v] -= bottleneck
+                residual[v][u] += bottleneck
+            max_flow += bottleneck
+            steps.append(trusted_step(
+                len(steps), "augment",
+                f"Tăng luồng {bottleneck:.2f} theo {' → '.join(path)} (tổng {max_flow:.2f})",
+                node=sink,
+                current_flow={f"{u}->{v}": capacity[u][v] - residual[u][v] for u, v in zip(path, path[1:])}
+            ))
+
+        flow_edges = [
+            {"source": u, "target": v, "flow": cap - residual[u][v], "capacity": cap}
+            for u, neighbors in capacity.items()
+            for v, cap in neighbors.items()
+            if cap - residual[u][v] > EPSILON
+        ]
+        steps.append(trusted_step(len(steps), "complete", f"Luồng cực đại = {max_flow:.2f}"))
+        return {"steps": steps, "max_flow": max_flow, "flow_edges": flow_edges}
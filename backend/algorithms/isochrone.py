@@ -0,0 +1,165 @@
+"""
+FILE: isochrone.py
+MÔ TẢ: Vùng đến được trong bán kính (isochrone) - Dijkstra giới hạn khoảng cách
+
+CHỨC NĂNG:
+    - "Từ giao lộ này đi được tới đâu trong 800 m?" bằng MỘT lần duyệt,
+      thay vì gọi shortest-path cho từng đích
+    - Nhiều nguồn trong cùng một lần chạy (multi-source): mỗi đỉnh nhận
+      khoảng cách tới nguồn gần nhất và nguồn đó
+    - Tùy chọn bao lồi (hull) của vùng đến được, gồm cả điểm nội suy trên
+      các cạnh bị bán kính cắt ngang (đường đi được một phần)
+    - Mặc định KHÔNG ghi trace từng bước → chạy vài ms trên đồ thị cấp quận
+
+CÁCH HOẠT ĐỘNG:
+    1. Đưa mọi nguồn vào hàng đợi ưu tiên với khoảng cách 0
+    2. Chốt đỉnh có khoảng cách nhỏ nhất; dừng ngay khi khoảng cách > radius
+       (các đỉnh còn lại trong hàng đợi đều xa hơn)
+    3. Cạnh (u, v) với d(u) <= radius < d(u) + w: điểm cắt nằm ở tỉ lệ
+       (radius - d(u)) / w dọc cạnh → dùng cho hull
+    4. Hull: bao lồi Andrew monotone chain trên (lon, lat)
+    => O((V_r + E_r) log V_r), V_r/E_r = phần đồ thị nằm trong bán kính
+
+ĐẦU VÀO:
+    - sources: Danh sách đỉnh nguồn
+    - radius: Bán kính (cùng đơn vị với trọng số - mét với bản đồ OSM)
+    - include_steps: Ghi trace từng bước (cho animation)
+    - hull: Trả thêm bao lồi [[lat, lon], ...]
+
+ĐẦU RA:
+    - AlgorithmResponse, result gồm:
+        + distances: {đỉnh: khoảng cách tới nguồn gần nhất}
+        + nearest_source: {đỉnh: nguồn gần nhất}
+        + reachable_count, hull (hoặc None)
+
+ĐIỀU KIỆN:
+    - Trọng số các cạnh phải >= 0
+    - Đồ thị có hướng: đi theo chiều cạnh (vùng đi TỚI được từ nguồn)
+"""
+import heapq
+from typing import Dict, List, Optional, Sequence, Tuple
+from models import AlgorithmResponse, AlgorithmStep, trusted_step
+
+
+def convex_hull(points: Sequence[Tuple[float, float]]) -> List[List[float]]:
+    """
+    Bao lồi (Andrew monotone chain)
+
+    Tham số:
+        points: Các điểm (lat, lon)
+
+    Trả về:
+        Đỉnh bao lồi [[lat, lon], ...] ngược chiều kim đồng hồ (theo lon/lat)
+    """
+    pts = sorted({(lon, lat) for lat, lon in points})
+    if len(pts) <= 2:
+        return [[lat, lon] for lon, lat in pts]
+
+    def cross(o, a, b) -> float:
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower: List[Tuple[float, float]] = []
+    for p in pts:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    upper: List[Tuple[float, float]] = []
+    for p in reversed(pts):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return [[lat, lon] for lon, lat in lower[:-1] + upper[:-1]]
+
+
+class IsochroneMixin:
+    """Mixin cung cấp truy vấn vùng đến được trong bán kính"""
+
+    def isochrone(self, sources: List[str], radius: float, include_steps: bool = False,
+                  hull: bool = False) -> AlgorithmResponse:
+        """
+        Dijkstra nhiều nguồn, dừng ở bán kính radius
+
+        Tham số:
+            sources: Các đỉnh nguồn (đã kiểm tra tồn tại)
+            radius: Khoảng cách tối đa (>= 0)
+            include_steps: Ghi trace từng bước
+            hull: Tính bao lồi của vùng đến được
+
+        Trả về:
+            AlgorithmResponse (steps rỗng nếu include_steps=False)
+        """
+        adj = self.G.adj
+        dist: Dict[str, float] = {}
+        nearest: Dict[str, str] = {}
+        best: Dict[str, float] = {}
+        heap: List[Tuple[float, int, str, str]] = []
+        for order, source in enumerate(dict.fromkeys(sources)):
+            best[source] = 0.0
+            heap.append((0.0, order, source, source))
+        pushed = len(heap)
+        heapq.heapify(heap)
+
+        steps: List[AlgorithmStep] = []
+        if include_steps:
+            steps.append(trusted_step(
+                0, "start", f"Bắt đầu từ {len(heap)} nguồn, bán kính {radius:.2f}",
+                distance={source: 0.0 for _, _, source, _ in heap}
+            ))
+        # Điểm cắt trên các cạnh vượt bán kính (chỉ khi cần hull)
+        cut_points: List[Tuple[float, float]] = []
+        nodes = self.G.nodes if hull else None
+
+        while heap:
+            d, _, u, origin = heapq.heappop(heap)
+            if u in dist:
+                continue
+            if d > radius:
+                break  # Mọi đỉnh còn lại trong hàng đợi đều xa hơn bán kính
+            dist[u] = d
+            nearest[u] = origin
+            relaxed: Dict[str, float] = {}
+            for v, attrs in adj[u].items():
+                if v in dist:
+                    continue
+                w = attrs.get("weight", 1.0)
+                nd = d + w
+                if nd > radius:
+                    if hull and w > 0:
+                        fraction = (radius - d) / w
+                        a, b = nodes[u], nodes[v]
+                        cut_points.append((a["lat"] + (b["lat"] - a["lat"]) * fraction,
+                                           a["lon"] + (b["lon"] - a["lon"]) * fraction))
+                    continue
+                if nd < best.get(v, float("inf")):
+                    best[v] = nd
+                    relaxed[v] = nd
+                    heapq.heappush(heap, (nd, pushed, v, origin))
+                    pushed += 1
+            if include_steps:
+                steps.append(trusted_step(
+                    len(steps), "visit",
+                    f"Chốt {u} (khoảng cách {d:.2f} từ {origin}), cập nhật {len(relaxed)} đỉnh kề",
+                    node=u, distance=relaxed or None
+                ))
+
+        hull_coords: Optional[List[List[float]]] = None
+        if hull:
+            points = [(nodes[u]["lat"], nodes[u]["lon"]) for u in dist] + cut_points
+            hull_coords = convex_hull(points)
+        if include_steps:
+            steps.append(trusted_step(
+                len(steps), "complete", f"{len(dist)} đỉnh trong bán kính {radius:.2f}"
+            ))
+        return AlgorithmResponse(
+            success=True,
+            algorithm="isochrone",
+            steps=steps,
+            result={
+                "sources": list(dict.fromkeys(sources)),
+                "radius": radius,
+                "reachable_count": len(dist),
+                "distances": dist,
+                "nearest_source": nearest,
+                "hull": hull_coords
+            }
+        )
@@ -0,0 +1,475 @@
+"""
+FILE: landmarks.py
+MÔ TẢ: Tiền xử lý ALT (A*, Landmarks, Triangle inequality) cho tìm đường
+
+CHỨC NĂNG:
+    - Chọn k đỉnh mốc (landmark) và tính sẵn khoảng cách từ/đến mỗi mốc
+    - Cận dưới theo bất đẳng thức tam giác, với mọi mốc L:
+          d(v, t) >= d(v, L) - d(t, L)      (khoảng cách ĐẾN mốc)
+          d(v, t) >= d(L, t) - d(L, v)      (khoảng cách TỪ mốc)
+      → heuristic cho A* (shortest_path.py) chặt hơn nhiều so với khoảng cách
+        địa lý, và đúng với mọi trọng số không âm (không chỉ mét)
+    - Bảng mốc (LandmarkTable) lưu dạng mảng float64 liền khối (array 'd'),
+      giữ trong LRU theo hash nội dung đồ thị và lưu file cạnh các đồ thị đã lưu
+      (GraphStorage.save_landmarks) → khởi động lại không phải tính lại
+
+CÁCH HOẠT ĐỘNG:
+    1. Đồ thị NetworkX → CSR chỉ số nguyên (offsets/targets/weights) cho
+       Dijkstra nhanh và gửi được sang tiến trình con
+    2. Chọn mốc:
+        - "farthest": mốc tiếp theo là đỉnh xa nhất tới tập mốc hiện có
+          (đỉnh chưa mốc nào tới được - thành phần liên thông khác - ưu tiên trước)
+        - "avoid" (Goldberg & Werneck): chạy Dijkstra từ gốc ngẫu nhiên, trọng
+          số đỉnh = d(r, v) - cận dưới hiện tại; đi xuống cây theo nhánh có tổng
+          trọng số lớn nhất (bỏ nhánh đã chứa mốc) đến lá → mốc mới nằm ở vùng
+          các mốc cũ cho cận kém nhất
+    3. Các lượt Dijkstra độc lập (khoảng cách ĐẾN mốc trên đồ thị đảo của
+       đồ thị có hướng, hoặc khi mốc được chỉ định sẵn) chạy song song trong
+       ProcessPoolExecutor; việc chọn mốc vốn tuần tự (mốc sau phụ thuộc mốc trước)
+    4. Đồ thị vô hướng: d(v, L) = d(L, v) → chỉ lưu một mảng
+
+ĐẦU RA:
+    - LandmarkTable: landmarks, from_dist[k*n], to_dist[k*n] (None nếu vô hướng)
+
+CẤU HÌNH:
+    GRAPH_API_ALT_LANDMARKS   Số mốc mặc định (8)
+    GRAPH_API_ALT_ACTIVE      Số mốc dùng cho mỗi truy vấn - chọn theo cận tại nguồn (4)
+    GRAPH_API_ALT_WORKERS     Số tiến trình tính khoảng cách (mặc định min(4, số CPU); 1 = tuần tự)
+    GRAPH_API_ALT_CACHE_SIZE  Số bảng mốc giữ trong bộ nhớ (8)
+
+LƯU Ý:
+    - Trọng số phải >= 0 (cùng điều kiện với Dijkstra)
+    - Bảng mốc gắn với hash nội dung đồ thị: đồ thị bị sửa → bảng cũ không được dùng
+    - method="auto" tra bảng ở MỌI lần shortest-path: lần tra không thấy (cả
+      bộ nhớ lẫn file) được nhớ MISS_TTL giây cho hash đó → không đọc đĩa lặp
+      lại; bảng do worker khác lưu sau đó được thấy khi hết hạn
+"""
+import heapq
+import json
+import os
+import random
+import struct
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+INF = float("inf")
+DEFAULT_LANDMARKS = int(os.environ.get("GRAPH_API_ALT_LANDMARKS", 8))
+ACTIVE_LANDMARKS = int(os.environ.get("GRAPH_API_ALT_ACTIVE", 4))
+ALT_WORKERS = int(os.environ.get("GRAPH_API_ALT_WORKERS", min(4, os.cpu_count() or 1)))
+ALT_CACHE_SIZE = int(os.environ.get("GRAPH_API_ALT_CACHE_SIZE", 8))
+# Nhớ các hash không có bảng mốc (số lượng, thời gian giây)
+MISS_CACHE_SIZE = 1024
+MISS_TTL = 60.0
+STRATEGIES = ("avoid", "farthest")
+
+# Dưới ngưỡng này chạy tuần tự: chi phí tạo tiến trình lớn hơn phần tiết kiệm được
+PARALLEL_MIN_NODES = 20000
+
+_MAGIC = b"ALT1"
+
+CSR = Tuple[array, array, array]
+
+
+def graph_csr(G: "nx.Graph", reverse: bool = False) -> CSR:
+    """
+    Đồ thị NetworkX → CSR theo thứ tự đỉnh của G
+
+    Tham số:
+        reverse: True → đồ thị đảo (dùng G.pred của DiGraph) để tính khoảng cách ĐẾN một đỉnh
+    """
+    index = {node: i for i, node in enumerate(G)}
+    adj = G.pred if reverse and G.is_directed() else G.adj
+    offsets = array("q", [0])
+    targets = array("q")
+    weights = array("d")
+    for node in G:
+        for neighbor, attrs in adj[node].items():
+            targets.append(index[neighbor])
+            weights.append(attrs.get("weight", 1.0))
+        offsets.append(len(targets))
+    return offsets, targets, weights
+
+
+def csr_dijkstra(csr: CSR, source: int, parents: bool = False):
+    """
+    Dijkstra trên CSR
+
+    Trả về:
+        dist (array 'd', inf = không tới được); nếu parents=True trả thêm
+        (parent, order) - order là thứ tự chốt đỉnh
+    """
+    offsets, targets, weights = csr
+    n = len(offsets) - 1
+    dist = array("d", [INF]) * n
+    parent = array("q", [-1]) * n if parents else None
+    order: List[int] = []
+    done = bytearray(n)
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = 1
+        if parents:
+            order.append(u)
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                if parents:
+                    parent[v] = u
+                heapq.heappush(heap, (nd, v))
+    if parents:
+        return dist, parent, order
+    return dist
+
+
+# ==================== Tiến trình con ====================
+
+_worker_csr: Optional[CSR] = None
+
+
+def _init_worker(csr: CSR) -> None:
+    global _worker_csr
+    _worker_csr = csr
+
+
+def _worker_dijkstra(source: int) -> bytes:
+    return csr_dijkstra(_worker_csr, source).tobytes()
+
+
+def _run_many(csr: CSR, sources: Sequence[int], workers: int = ALT_WORKERS) -> List[array]:
+    """Dijkstra từ nhiều nguồn độc lập - song song nếu đồ thị đủ lớn"""
+    n = len(csr[0]) - 1
+    if workers <= 1 or len(sources) <= 1 or n < PARALLEL_MIN_NODES:
+        return [csr_dijkstra(csr, s) for s in sources]
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    # spawn: tiến trình cha có nhiều luồng (uvicorn/threadpool) → fork không an toàn
+    with ProcessPoolExecutor(min(workers, len(sources)), mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(csr,)) as pool:
+        return [array("d", raw) for raw in pool.map(_worker_dijkstra, sources)]
+
+
+# ==================== Chọn mốc ====================
+
+def _select_farthest(csr: CSR, k: int, rng: random.Random,
+                     symmetric: bool) -> Tuple[List[int], List[array]]:
+    n = len(csr[0]) - 1
+    start = csr_dijkstra(csr, rng.randrange(n))
+    first = max(range(n), key=lambda v: start[v] if start[v] < INF else -1.0)
+    landmarks, runs = [first], [csr_dijkstra(csr, first)]
+    nearest = array("d", runs[0])
+    while len(landmarks) < min(k, n):
+        chosen = set(landmarks)
+        # inf (chưa mốc nào tới được) > mọi khoảng cách hữu hạn → phủ thành phần khác trước
+        candidate = max((v for v in range(n) if v not in chosen), key=lambda v: nearest[v])
+        landmarks.append(candidate)
+        dist = csr_dijkstra(csr, candidate)
+        runs.append(dist)
+        for v in range(n):
+            if dist[v] < nearest[v]:
+                nearest[v] = dist[v]
+    return landmarks, runs
+
+
+def _select_avoid(csr: CSR, k: int, rng: random.Random,
+                  symmetric: bool) -> Tuple[List[int], List[array]]:
+    n = len(csr[0]) - 1
+    landmarks: List[int] = []
+    runs: List[array] = []
+    while len(landmarks) < min(k, n):
+        root = rng.randrange(n)
+        dist, parent, order = csr_dijkstra(csr, root, parents=True)
+        chosen = set(landmarks)
+        # Trọng số đỉnh: độ chênh giữa khoảng cách thật và cận dưới hiện có
+        size = array("d", [0.0]) * n
+        for v in order:
+            bound = 0.0
+            for run in runs:
+                a, b = run[root], run[v]
+                if a < INF and b < INF:
+                    # Vô hướng: d(r, v) >= |d(L, v) - d(L, r)|; có hướng chỉ một chiều
+                    bound = max(bound, abs(b - a) if symmetric else b - a)
+            size[v] = dist[v] - bound
+        # Cộng dồn từ lá lên gốc; cây con chứa mốc có size = 0
+        has_landmark = bytearray(n)
+        for v in reversed(order):
+            if v in chosen:
+                has_landmark[v] = 1
+            p = parent[v]
+            if p >= 0:
+                if has_landmark[v]:
+                    has_landmark[p] = 1
+                else:
+                    size[p] += size[v]
+        for v in order:
+            if has_landmark[v]:
+                size[v] = 0.0
+        children: Dict[int, List[int]] = {}
+        for v in order[1:]:
+            children.setdefault(parent[v], []).append(v)
+        node = root
+        while children.get(node):
+            best = max(children[node], key=lambda c: size[c])
+            if size[best] <= 0:
+                break
+            node = best
+        if node in chosen:
+            # Mọi nhánh đã có mốc: lấy đỉnh xa nhất chưa là mốc
+            node = max((v for v in order if v not in chosen), key=lambda v: dist[v], default=None)
+            if node is None:
+                node = next(v for v in range(n) if v not in chosen)
+        landmarks.append(node)
+        runs.append(csr_dijkstra(csr, node))
+    return landmarks, runs
+
+
+# ==================== Bảng mốc ====================
+
+class LandmarkTable:
+    """Khoảng cách từ/đến k mốc, mảng phẳng k*n theo thứ tự đỉnh của đồ thị"""
+
+    def __init__(self, node_ids: List[str], landmarks: List[int], from_dist: array,
+                 to_dist: Optional[array], strategy: str, content_hash: str):
+        self.node_ids = node_ids
+        self.index = {node_id: i for i, node_id in enumerate(node_ids)}
+        self.landmarks = landmarks
+        self.from_dist = from_dist
+        self.to_dist = to_dist  # None: đồ thị vô hướng, dùng from_dist
+        self.strategy = strategy
+        self.content_hash = content_hash
+
+    @property
+    def directed(self) -> bool:
+        return self.to_dist is not None
+
+    @property
+    def landmark_ids(self) -> List[str]:
+        return [self.node_ids[i] for i in self.landmarks]
+
+    @property
+    def nbytes(self) -> int:
+        return self.from_dist.itemsize * len(self.from_dist) * (2 if self.directed else 1)
+
+    def active_landmarks(self, source: int, target: int, limit: int = ACTIVE_LANDMARKS) -> List[int]:
+        """Các mốc (chỉ số trong bảng) cho cận lớn nhất tại nguồn"""
+        scored = sorted(range(len(self.landmarks)),
+                        key=lambda j: self._bound(j, source, target), reverse=True)
+        return scored[:max(limit, 1)]
+
+    def _bound(self, j: int, v: int, t: int) -> float:
+        """Cận dưới d(v, t) từ mốc j (inf = chắc chắn không tới được t)"""
+        n = len(self.node_ids)
+        from_dist = self.from_dist
+        to_dist = self.to_dist if self.to_dist is not None else from_dist
+        best = 0.0
+        # d(v, t) >= d(v, L) - d(t, L)
+        vl, tl = to_dist[j * n + v], to_dist[j * n + t]
+        if tl < INF:
+            if vl == INF:
+                return INF  # t tới được L mà v không → v không tới được t
+            best = max(best, vl - tl)
+        # d(v, t) >= d(L, t) - d(L, v)
+        lv, lt = from_dist[j * n + v], from_dist[j * n + t]
+        if lv < INF:
+            if lt == INF:
+                return INF  # L tới được v mà không tới được t → v không tới được t
+            best = max(best, lt - lv)
+        return best
+
+    def heuristic(self, target: int, active: Sequence[int]):
+        """
+        Hàm h(v) cho A* tới target (chỉ số đỉnh), dùng các mốc active
+
+        Trả về:
+            hàm chỉ số đỉnh → cận dưới (inf = cắt nhánh)
+        """
+        n = len(self.node_ids)
+        from_dist = self.from_dist
+        to_dist = self.to_dist if self.to_dist is not None else from_dist
+        # Khoảng cách của target tới/từ từng mốc active - tính một lần
+        terms = [(j * n, to_dist[j * n + target], from_dist[j * n + target]) for j in active]
+
+        def h(v: int) -> float:
+            best = 0.0
+            for base, tl, lt in terms:
+                vl, lv = to_dist[base + v], from_dist[base + v]
+                if tl < INF:
+                    if vl == INF:
+                        return INF
+                    if vl - tl > best:
+                        best = vl - tl
+                if lv < INF:
+                    if lt == INF:
+                        return INF
+                    if lt - lv > best:
+                        best = lt - lv
+            return best
+
+        return h
+
+    def to_bytes(self) -> bytes:
+        header = json.dumps({
+            "content_hash": self.content_hash,
+            "node_count": len(self.node_ids),
+            "landmarks": self.landmarks,
+            "strategy": self.strategy,
+            "directed": self.directed,
+        }).encode()
+        parts = [_MAGIC, struct.pack("<I", len(header)), header, self.from_dist.tobytes()]
+        if self.to_dist is not None:
+            parts.append(self.to_dist.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, node_ids: List[str]) -> "LandmarkTable":
+        """Đọc lại bảng; ValueError nếu file hỏng hoặc không khớp đồ thị"""
+        if data[:4] != _MAGIC:
+            raise ValueError("not a landmark table")
+        (length,) = struct.unpack_from("<I", data, 4)
+        header = json.loads(data[8:8 + length])
+        n, k = header["node_count"], len(header["landmarks"])
+        if n != len(node_ids):
+            raise ValueError("landmark table does not match graph")
+        size = n * k * 8
+        offset = 8 + length
+        from_dist = array("d")
+        from_dist.frombytes(data[offset:offset + size])
+        to_dist = None
+        if header["directed"]:
+            to_dist = array("d")
+            to_dist.frombytes(data[offset + size:offset + 2 * size])
+        if len(from_dist) != n * k or (to_dist is not None and len(to_dist) != n * k):
+            raise ValueError("truncated landmark table")
+        return cls(node_ids, header["landmarks"], from_dist, to_dist,
+                   header["strategy"], header["content_hash"])
+
+
+def build_landmark_table(G: "nx.Graph", content_hash: str, count: int = DEFAULT_LANDMARKS,
+                         strategy: str = "avoid", seed: int = 0,
+                         landmarks: Optional[Sequence[str]] = None) -> LandmarkTable:
+    """
+    Chọn mốc và tính bảng khoảng cách
+
+    Tham số:
+        G: Đồ thị NetworkX (trọng số >= 0)
+        content_hash: Hash nội dung GraphData tương ứng (khóa cache/file)
+        count: Số mốc
+        strategy: "avoid" hoặc "farthest"
+        seed: Seed chọn gốc ngẫu nhiên → cùng đồ thị luôn cho cùng mốc
+        landmarks: Chỉ định sẵn các mốc (bỏ qua bước chọn, mọi lượt chạy song song)
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown landmark strategy: {strategy}")
+    node_ids = list(G)
+    n = len(node_ids)
+    if n == 0:
+        raise ValueError("Graph is empty")
+    csr = graph_csr(G)
+    if landmarks:
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+        chosen = [index[node_id] for node_id in landmarks]
+        runs = _run_many(csr, chosen)
+    else:
+        select = _select_avoid if strategy == "avoid" else _select_farthest
+        chosen, runs = select(csr, count, random.Random(seed), not G.is_directed())
+
+    from_dist = array("d")
+    for run in runs:
+        from_dist.extend(run)
+    to_dist = None
+    if G.is_directed():
+        to_dist = array("d")
+        for run in _run_many(graph_csr(G, reverse=True), chosen):
+            to_dist.extend(run)
+    return LandmarkTable(node_ids, list(chosen), from_dist, to_dist, strategy, content_hash)
+
+
+class _LandmarkCache:
+    """LRU các LandmarkTable theo hash nội dung đồ thị + LRU các hash đã biết là không có bảng"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._tables: "OrderedDict[str, LandmarkTable]" = OrderedDict()
+        self._misses: "OrderedDict[str, float]" = OrderedDict()  # hash → hết hạn (monotonic)
+        self._lock = threading.Lock()
+
+    def get(self, content_hash: str) -> Optional[LandmarkTable]:
+        with self._lock:
+            table = self._tables.get(content_hash)
+            if table is not None:
+                self._tables.move_to_end(content_hash)
+            return table
+
+    def known_missing(self, content_hash: str) -> bool:
+        """Hash này vừa được tra (bộ nhớ + file) mà không có bảng"""
+        with self._lock:
+            expires_at = self._misses.get(content_hash)
+            if expires_at is None:
+                return False
+            if expires_at > time.monotonic():
+                return True
+            del self._misses[content_hash]
+            return False
+
+    def put_miss(self, content_hash: str) -> None:
+        with self._lock:
+            self._misses[content_hash] = time.monotonic() + MISS_TTL
+            self._misses.move_to_end(content_hash)
+            while len(self._misses) > MISS_CACHE_SIZE:
+                self._misses.popitem(last=False)
+
+    def put(self, table: LandmarkTable) -> None:
+        with self._lock:
+            self._misses.pop(table.content_hash, None)
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._tables[table.content_hash] = table
+            self._tables.move_to_end(table.content_hash)
+            while len(self._tables) > self.max_size:
+                self._tables.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tables.clear()
+            self._misses.clear()
+
+
+landmark_tables = _LandmarkCache(ALT_CACHE_SIZE)
+
+
+def load_landmark_table(G: "nx.Graph", content_hash: str) -> Optional[LandmarkTable]:
+    """Bảng mốc của đồ thị: bộ nhớ → file đã lưu (GraphStorage) → None"""
+    table = landmark_tables.get(content_hash)
+    if table is not None or landmark_tables.known_missing(content_hash):
+        return table
+    from graph_storage import graph_storage
+    data = graph_storage.load_landmarks(content_hash)
+    try:
+        table = LandmarkTable.from_bytes(data, list(G)) if data is not None else None
+    except (ValueError, KeyError, struct.error):
+        table = None
+    if table is None:
+        landmark_tables.put_miss(content_hash)
+        return None
+    landmark_tables.put(table)
+    return table
+
+
+def store_landmark_table(table: LandmarkTable, persist: bool = True) -> bool:
+    """Đưa bảng vào LRU và (nếu persist) ghi file; trả về True nếu đã ghi file"""
+    landmark_tables.put(table)
+    if not persist:
+        return False
+    from graph_storage import graph_storage
+    return graph_storage.save_landmarks(table.content_hash, table.to_bytes())
@@ -16,7 +16,7 @@ CÁCH HOẠT ĐỘNG:
         5. Lặp lại cho đến khi có n-1 cạnh
         => Độ phức tạp: O(E log V)
     
-    Kruskal:
+    Kruskal (trên từng thành phần liên thông, song song - partition.py):
         1. Sắp xếp tất cả cạnh theo trọng số tăng dần
         2. Duyệt từng cạnh, kiểm tra có tạo chu trình không (UnionFind)
         3. Nếu không tạo chu trình → thêm cạnh vào MST
@@ -27,6 +27,8 @@ CÁCH HOẠT ĐỘNG:
         - find(x): Tìm đại diện của tập chứa x (path compression)
         - union(x,y): Hợp 2 tập chứa x và y (union by rank)
         - Độ phức tạp: gần O(1) cho mỗi thao tác
+        - Worker Kruskal (partition.kruskal_part) dùng cùng ý tưởng trên mảng
+          int theo chỉ số đỉnh cục bộ
 
 ĐẦU VÀO:
     - graph_data: Đồ thị vô hướng, có trọng số
@@ -36,15 +38,19 @@ CÁCH HOẠT ĐỘNG:
     - Dictionary chứa:
         + mst_edges: Danh sách cạnh trong MST
         + total_weight: Tổng trọng số của MST
+        + component_count: Số thành phần liên thông (> 1 → rừng khung)
         + steps: Các bước thực thi
 
 ĐIỀU KIỆN:
     - Đồ thị phải VÔ HƯỚNG
-    - Đồ thị phải LIÊN THÔNG
+    - Không liên thông → trả RỪNG khung nhỏ nhất (mỗi thành phần một cây) và
+      báo rõ component_count (nhãn thành phần lấy từ components.py, đã cache)
 """
 import heapq
-from typing import Dict, Any, Optional
-from models import AlgorithmStep
+from typing import Dict, Any, List, Optional
+from models import AlgorithmStep, trusted_step
+
+from .partition import kruskal_part, plan_bins, run_per_component
 
 
 class UnionFind:
@@ -52,8 +58,9 @@ class UnionFind:
     
     def __init__(self, nodes):
         """Khởi tạo Union-Find với danh sách nodes"""
-        # TODO: Triển khai khởi tạo
-        pass
+        self.parent = {node: node for node in nodes}
+        self.rank = {node: 0 for node in self.parent}
+        self.set_count = len(self.parent)
     
     def find(self, node):
         """Tìm gốc (root) của tập chứa node - với path compression
@@ -63,8 +70,12 @@ class UnionFind:
         - Làm phẳng cây → Tăng tốc thao tác tiếp theo
         - Độ phức tạp: gần O(1) amortized
         """
-        # TODO: Triển khai find với path compression
-        pass
+        root = node
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[node] != root:
+            self.parent[node], node = root, self.parent[node]
+        return root
     
     def union(self, node1, node2):
         """Hợp hai tập chứa node1 và node2 - với union by rank
@@ -73,14 +84,28 @@ class UnionFind:
         - rank = độ sâu tối đa của cây (xấp xỉ)
         - Luôn nối cây nhỏ hơn vào cây lớn hơn → tránh cây quá cao
         - Giữ cây cân bằng → thao tác nhanh hơn
+
+        Trả về:
+            True nếu đã hợp (hai đỉnh trước đó thuộc hai tập khác nhau)
         """
-        # TODO: Triển khai union với rank
-        pass
+        root1, root2 = self.find(node1), self.find(node2)
+        if root1 == root2:
+            return False
+        if self.rank[root1] < self.rank[root2]:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        if self.rank[root1] == self.rank[root2]:
+            self.rank[root1] += 1
+        self.set_count -= 1
+        return True
     
     def count_sets(self):
         """Đếm số lượng tập hợp rời rạc"""
-        # TODO: Triển khai đếm tập hợp
-        pass
+        return self.set_count
+
+
+def _mst_edge(u: str, v: str, weight: float) -> Dict[str, Any]:
+    return {"source": u, "target": v, "weight": weight}
 
 
 class MSTMixin:
@@ -96,16 +121,94 @@ class MSTMixin:
         Trả về:
             Dictionary với MST edges, tổng trọng số, và các bước
         """
-        # TODO: Triển khai thuật toán Prim
-        pass
+        self._require_undirected_mst()
+        adj = self.G.adj
+        node_ids = [node.id for node in self.graph_data.nodes]
+        if start_node is not None:
+            node_ids.insert(0, start_node)
+        in_tree = set()
+        mst_edges: List[Dict[str, Any]] = []
+        steps: List[AlgorithmStep] = []
+        total = 0.0
+        pushed = 0
+        # Mỗi đỉnh chưa vào cây là gốc của một thành phần mới (đồ thị không liên thông)
+        for root in node_ids:
+            if root in in_tree:
+                continue
+            in_tree.add(root)
+            steps.append(trusted_step(len(steps), "start", f"Bắt đầu cây mới từ {root}", node=root))
+            heap = []
+            for v, attrs in adj[root].items():
+                heap.append((attrs.get("weight", 1.0), pushed, root, v))
+                pushed += 1
+            heapq.heapify(heap)
+            while heap:
+                w, _, u, v = heapq.heappop(heap)
+                if v in in_tree:
+                    continue
+                in_tree.add(v)
+                mst_edges.append(_mst_edge(u, v, w))
+                total += w
+                steps.append(trusted_step(
+                    len(steps), "add", f"Thêm cạnh {u} - {v} (trọng số {w:.2f})",
+                    node=v, edge={"source": u, "target": v}
+                ))
+                for x, attrs in adj[v].items():
+                    if x not in in_tree:
+                        heapq.heappush(heap, (attrs.get("weight", 1.0), pushed, v, x))
+                        pushed += 1
+        return self._mst_result(steps, mst_edges, total)
 
     def kruskal_mst(self) -> Dict[str, Any]:
         """
         Thuật toán Kruskal cho Cây Khung Nhỏ Nhất với theo dõi từng bước
         Sử dụng cấu trúc dữ liệu Union-Find
+
+        Chạy riêng trên từng thành phần liên thông (partition.py, song song khi
+        đáng), ghép cạnh và trace theo thứ tự thành phần
         
         Trả về:
             Dictionary với MST edges, tổng trọng số, và các bước
         """
-        # TODO: Triển khai thuật toán Kruskal
-        pass
+        self._require_undirected_mst()
+        parts = self.component_parts()
+        outputs, parallel = run_per_component(kruskal_part, parts, plan_bins(parts))
+        mst_edges: List[Dict[str, Any]] = []
+        steps: List[AlgorithmStep] = []
+        total = 0.0
+        for part, (events, part_total) in zip(parts, outputs):
+            ids = part.node_ids
+            for added, u, v, w in events:
+                edge = {"source": ids[u], "target": ids[v]}
+                if added:
+                    mst_edges.append(_mst_edge(ids[u], ids[v], w))
+                    steps.append(trusted_step(
+                        len(steps), "add", f"Thêm cạnh {ids[u]} - {ids[v]} (trọng số {w:.2f})", edge=edge
+                    ))
+                else:
+                    steps.append(trusted_step(
+                        len(steps), "skip", f"Bỏ cạnh {ids[u]} - {ids[v]}: tạo chu trình", edge=edge
+                    ))
+            total += part_total
+        result = self._mst_result(steps, mst_edges, total)
+        result["parallel"] = parallel
+        return result
+
+    def _require_undirected_mst(self) -> None:
+        if self.graph_data.directed:
+            raise ValueError("MST requires an undirected graph")
+
+    def _mst_result(self, steps: List[AlgorithmStep], mst_edges: List[Dict[str, Any]],
+                    total: float) -> Dict[str, Any]:
+        component_count = self.components().count
+        kind = "cây khung" if component_count <= 1 else f"rừng khung ({component_count} thành phần)"
+        steps.append(trusted_step(
+            len(steps), "complete", f"Hoàn tất {kind}: {len(mst_edges)} cạnh, tổng {total:.2f}",
+            mst_edges=mst_edges
+        ))
+        return {
+            "steps": steps,
+            "mst_edges": mst_edges,
+            "total_weight": total,
+            "component_count": component_count
+        }
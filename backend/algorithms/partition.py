@@ -0,0 +1,254 @@
+"""
+FILE: partition.py
+MÔ TẢ: Chia đồ thị theo thành phần liên thông và chạy thuật toán trên từng phần song song
+
+CHỨC NĂNG:
+    - partition_graph: tách GraphData thành các ComponentPart (mỗi thành phần
+      liên thông yếu một phần, chỉ số đỉnh cục bộ, cạnh dạng array) - gọn để
+      gửi sang tiến trình khác
+    - run_per_component: chạy một hàm worker trên mọi phần, trong process pool
+      khi đáng (nhiều thành phần đủ lớn), ngược lại chạy tuần tự tại chỗ
+    - Worker: kruskal_part (rừng khung), bipartite_part (tô hai màu),
+      euler_degrees_part (kiểm tra bậc cho Euler)
+
+CÁCH HOẠT ĐỘNG:
+    1. Nhãn thành phần lấy từ components.py (đã cache trên đồ thị)
+    2. Mỗi phần giữ đỉnh theo thứ tự graph_data.nodes và cạnh theo thứ tự
+       graph_data.edges → kết quả mỗi phần giống hệt chạy trên cả đồ thị
+    3. Chia phần vào các gói theo LPT (phần nặng nhất vào gói nhẹ nhất),
+       tải = số đỉnh + số cạnh; mỗi gói là một lần gọi sang worker
+    4. Kết quả ghép lại theo thứ tự nhãn thành phần → tất định, không phụ
+       thuộc số worker hay thứ tự hoàn thành
+    => Thời gian ≈ gói nặng nhất thay vì tổng cả đồ thị
+
+CẤU HÌNH:
+    GRAPH_API_PARTITION_WORKERS    Số tiến trình (mặc định min(4, số CPU); 1 = tuần tự)
+    GRAPH_API_PARTITION_MIN_EDGES  Chỉ dùng pool khi tổng tải >= ngưỡng (50000)
+
+LƯU Ý:
+    - Pool dùng "spawn" (tiến trình cha nhiều luồng) và được tạo lười một lần,
+      dùng lại giữa các request; worker chết (BrokenProcessPool) → bỏ pool,
+      thử lại một lần với pool mới, vẫn hỏng thì chạy tuần tự
+    - Không dùng pool khi một thành phần chiếm phần lớn đồ thị (gói nặng nhất
+      > MAX_SHARE tổng tải): chi phí gửi dữ liệu không bù được
+"""
+import heapq
+import os
+import threading
+from array import array
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from models import GraphData
+from .components import component_labels
+from .traversal_engine import adjacency_from_pairs, two_color
+from .validation import graph_index
+
+PARTITION_WORKERS = int(os.environ.get("GRAPH_API_PARTITION_WORKERS", min(4, os.cpu_count() or 1)))
+PARALLEL_MIN_EDGES = int(os.environ.get("GRAPH_API_PARTITION_MIN_EDGES", 50000))
+# Gói nặng nhất vượt tỉ lệ này của tổng tải → chạy tuần tự
+MAX_SHARE = 0.75
+
+
+class ComponentPart:
+    """Một thành phần liên thông với chỉ số đỉnh cục bộ (0..len(node_ids)-1)"""
+
+    __slots__ = ("label", "node_ids", "indices", "sources", "targets", "weights", "directed")
+
+    def __init__(self, label: int, directed: bool):
+        self.label = label
+        self.node_ids: List[str] = []
+        self.indices = array("q")  # Chỉ số đỉnh trong graph_data.nodes
+        self.sources = array("q")
+        self.targets = array("q")
+        self.weights = array("d")
+        self.directed = directed
+
+    @property
+    def load(self) -> int:
+        return len(self.node_ids) + len(self.sources)
+
+
+def partition_graph(graph_data: GraphData) -> List[ComponentPart]:
+    """
+    Tách đồ thị theo thành phần liên thông yếu - O(V + E)
+
+    Trả về:
+        Danh sách ComponentPart theo nhãn thành phần (bỏ cạnh treo, giữ cạnh
+        song song và khuyên - mỗi worker tự quyết định cách xử lý)
+    """
+    index = graph_index(graph_data)
+    components = component_labels(graph_data, "weak")
+    labels = components.labels
+    parts = [ComponentPart(c, graph_data.directed) for c in range(components.count)]
+    local = array("q", [0]) * len(graph_data.nodes)
+    for i, node in enumerate(graph_data.nodes):
+        part = parts[labels[i]]
+        local[i] = len(part.node_ids)
+        part.node_ids.append(node.id)
+        part.indices.append(i)
+    node_index = index.node_index
+    dangling = index.dangling_edge_indices
+    for k, edge in enumerate(graph_data.edges):
+        if k in dangling:
+            continue
+        i, j = node_index[edge.source], node_index[edge.target]
+        part = parts[labels[i]]
+        part.sources.append(local[i])
+        part.targets.append(local[j])
+        part.weights.append(edge.weight)
+    return parts
+
+
+def plan_bins(parts: Sequence[ComponentPart], workers: Optional[int] = None) -> Optional[List[List[int]]]:
+    """
+    Chia phần vào các gói cho worker (LPT)
+
+    Trả về:
+        Danh sách gói (chỉ số phần), hoặc None nếu nên chạy tuần tự
+    """
+    workers = PARTITION_WORKERS if workers is None else workers
+    total = sum(part.load for part in parts)
+    if workers <= 1 or len(parts) < 2 or total < PARALLEL_MIN_EDGES:
+        return None
+    order = sorted(range(len(parts)), key=lambda i: -parts[i].load)
+    bins: List[List[int]] = [[] for _ in range(min(workers, len(parts)))]
+    heap = [(0, b) for b in range(len(bins))]
+    for i in order:
+        load, b = heapq.heappop(heap)
+        bins[b].append(i)
+        heapq.heappush(heap, (load + parts[i].load, b))
+    if max(load for load, _ in heap) > MAX_SHARE * total:
+        return None
+    return bins
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    """Process pool dùng chung, tạo lười ở lần đầu cần"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn: tiến trình cha có nhiều luồng (uvicorn/threadpool) → fork không an toàn
+            _pool = ProcessPoolExecutor(PARTITION_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _discard_executor(pool) -> None:
+    """Bỏ pool đã hỏng (chỉ khi nó vẫn là pool dùng chung hiện tại)"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_batch(fn: Callable[[ComponentPart], Any], parts: List[ComponentPart]) -> List[Any]:
+    return [fn(part) for part in parts]
+
+
+def run_per_component(fn: Callable[[ComponentPart], Any], parts: Sequence[ComponentPart],
+                      bins: Optional[List[List[int]]] = None) -> Tuple[List[Any], bool]:
+    """
+    Chạy fn (hàm cấp module, pickle được) trên từng phần
+
+    Tham số:
+        bins: Kết quả plan_bins(); None → chạy tuần tự tại chỗ
+
+    Trả về:
+        (kết quả theo đúng thứ tự parts, True nếu đã chạy song song)
+    """
+    if bins is None:
+        return [fn(part) for part in parts], False
+    for attempt in range(2):
+        pool = _executor()
+        try:
+            futures = [pool.submit(_run_batch, fn, [parts[i] for i in b]) for b in bins]
+            results: List[Any] = [None] * len(parts)
+            for b, future in zip(bins, futures):
+                for i, result in zip(b, future.result()):
+                    results[i] = result
+            return results, True
+        except BrokenProcessPool:
+            # Worker chết (OOM, bị kill...) → pool hỏng vĩnh viễn: bỏ đi, thử pool mới một lần
+            _discard_executor(pool)
+    # Pool mới cũng hỏng → chạy tuần tự tại chỗ
+    return [fn(part) for part in parts], False
+
+
+# ==================== Worker (chạy trong tiến trình con) ====================
+
+def kruskal_part(part: ComponentPart) -> Tuple[List[Tuple[bool, int, int, float]], float]:
+    """
+    Kruskal trên một thành phần (vô hướng)
+
+    Cạnh song song: giữ trọng số cạnh sau cùng như NetworkX; bỏ khuyên
+
+    Trả về:
+        (sự kiện (thêm?, u, v, w) theo thứ tự xét, tổng trọng số)
+    """
+    weights: Dict[Tuple[int, int], float] = {}
+    for u, v, w in zip(part.sources, part.targets, part.weights):
+        if u != v:
+            weights[(u, v) if u < v else (v, u)] = w
+    edges = sorted((w, k, u, v) for k, ((u, v), w) in enumerate(weights.items()))
+    parent = array("q", range(len(part.node_ids)))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    events: List[Tuple[bool, int, int, float]] = []
+    needed, added, total = len(part.node_ids) - 1, 0, 0.0
+    for w, _, u, v in edges:
+        if added == needed:
+            break
+        a, b = find(u), find(v)
+        if a != b:
+            parent[b] = a
+            added += 1
+            total += w
+        events.append((a != b, u, v, w))
+    return events, total
+
+
+def bipartite_part(part: ComponentPart) -> Tuple[array, Optional[Tuple[int, int]], array]:
+    """Tô hai màu một thành phần - cùng kết quả với two_color() trên cả đồ thị"""
+    adj = adjacency_from_pairs(part.node_ids, zip(part.sources, part.targets), part.directed)
+    return two_color(adj)
+
+
+def euler_degrees_part(part: ComponentPart) -> Dict[str, Any]:
+    """
+    Bậc của các đỉnh trong một thành phần cho điều kiện Euler (đa đồ thị)
+
+    Trả về:
+        {"edges": số cạnh (tính cả song song, khuyên)} cùng với
+        - vô hướng: "odd" = các đỉnh bậc lẻ
+        - có hướng: "plus" (out - in = 1), "minus" (in - out = 1),
+          "unbalanced" = số đỉnh lệch nhiều hơn 1
+    """
+    n = len(part.node_ids)
+    result: Dict[str, Any] = {"edges": len(part.sources)}
+    if not part.directed:
+        degree = array("q", [0]) * n
+        for u, v in zip(part.sources, part.targets):
+            degree[u] += 1
+            degree[v] += 1  # Khuyên cộng 2
+        result["odd"] = [v for v in range(n) if degree[v] & 1]
+        return result
+    balance = array("q", [0]) * n
+    for u, v in zip(part.sources, part.targets):
+        balance[u] += 1
+        balance[v] -= 1
+    result["plus"] = [v for v in range(n) if balance[v] == 1]
+    result["minus"] = [v for v in range(n) if balance[v] == -1]
+    result["unbalanced"] = sum(1 for b in balance if abs(b) > 1)
+    return result
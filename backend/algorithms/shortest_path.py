@@ -1,9 +1,14 @@
 """
-FILE: shortest_path.py  
-MÔ TẢ: Thuật toán Tìm Đường Đi Ngắn Nhất (Dijkstra)
+FILE: shortest_path.py
+MÔ TẢ: Thuật toán Tìm Đường Đi Ngắn Nhất (Dijkstra, A* với mốc ALT)
 
 CHỨC NĂNG:
     - Dijkstra: Tìm đường đi ngắn nhất từ một đỉnh đến tất cả các đỉnh khác
+    - Giữ lại cây đường đi ngắn nhất (đang dựng dở) cho mỗi (đồ thị, nguồn):
+      cùng nguồn, đích khác → trả ngay nếu đích đã được chốt, ngược lại
+      tiếp tục tìm từ hàng đợi ưu tiên còn lại chứ không chạy lại từ đầu
+    - A* + ALT: khi đồ thị đã có bảng mốc (landmarks.py), heuristic là cận
+      dưới theo bất đẳng thức tam giác → chốt ít đỉnh hơn nhiều so với Dijkstra
 
 CÁCH HOẠT ĐỘNG:
     1. Khởi tạo khoảng cách = ∞ cho tất cả đỉnh (trừ đỉnh nguồn = 0)
@@ -13,9 +18,30 @@ CÁCH HOẠT ĐỘNG:
     5. Truy vết ngược để tìm đường đi
     => Độ phức tạp: O((V + E) log V)
 
+    Tái sử dụng (DijkstraSearch):
+        - Trạng thái (dist, parent, heap, các bước) được giữ trong một LRU
+          khóa theo (hash nội dung đồ thị, đỉnh nguồn)
+        - LRU giới hạn theo số cây VÀ tổng kích thước: mỗi đồ thị có cây trong
+          cache tính V + E một lần (cây giữ G.adj sống), mỗi cây thêm số đỉnh
+          đã gặp; vượt SEARCH_CACHE_ELEMENTS → bỏ cây cũ nhất
+        - Thứ tự chốt đỉnh là tất định (heap xếp theo (dist, thứ tự đẩy vào))
+          nên trace cho đích t = các bước đến lúc chốt t, giống hệt chạy mới
+
+    A* (ALT):
+        - Ưu tiên theo d(s, v) + h(v), h(v) = max cận dưới của các mốc active
+          (mốc cho cận lớn nhất tại nguồn); h nhất quán → đỉnh đã chốt có
+          khoảng cách đúng, cắt nhánh khi h(v) = inf (chắc chắn không tới được đích)
+        - method="auto": dùng ALT nếu bảng mốc có sẵn (bộ nhớ/file), ngược lại Dijkstra
+          method="alt": dựng bảng mốc nếu chưa có; method="dijkstra": luôn Dijkstra
+
+    Khác thành phần liên thông (components.py):
+        - Nguồn và đích khác thành phần liên thông yếu → trả "unreachable" ngay
+          (method="components"), không duyệt, không cần dựng NetworkX
+
 ĐẦU VÀO:
     - start_node: Đỉnh bắt đầu
     - end_node: Đỉnh đích
+    - method: "auto" | "dijkstra" | "alt"
     - self.G: Đồ thị có trọng số (phải >= 0)
 
 ĐẦU RA:
@@ -23,28 +49,350 @@ CÁCH HOẠT ĐỘNG:
         + path: Danh sách đỉnh trong đường đi
         + distance: Khoảng cách tổng
         + steps: Các bước thực thi
+        + method: thuật toán đã dùng ("dijkstra" | "alt" | "components");
+          settled_nodes: số đỉnh đã chốt (không gian tìm kiếm)
+        + expanded_path / path_coords: chỉ khi đồ thị đã rút gọn
+          (simplification.py) - đường đi đầy đủ qua các đỉnh đã bị co
 
 ĐIỀU KIỆN:
     - Trọng số các cạnh phải >= 0
     - Nếu có trọng số âm, dùng Bellman-Ford
 """
 import heapq
-from models import AlgorithmResponse, AlgorithmStep
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from metrics import record_cache
+from models import AlgorithmResponse, AlgorithmStep, trusted_step
+from .landmarks import (
+    DEFAULT_LANDMARKS, INF, LandmarkTable, build_landmark_table, load_landmark_table,
+    store_landmark_table
+)
+from .simplification import expand_path, expand_path_coords, is_simplified
+from .validation import graph_content_hash
+
+# Số cây đường đi ngắn nhất giữ lại (mỗi cây O(V) bộ nhớ)
+SEARCH_CACHE_SIZE = int(os.environ.get("GRAPH_API_SPT_CACHE_SIZE", 32))
+# Tổng kích thước tối đa: V + E của các đồ thị được giữ + số đỉnh trong các cây
+SEARCH_CACHE_ELEMENTS = int(os.environ.get("GRAPH_API_SPT_CACHE_ELEMENTS", 2_000_000))
+
+
+class DijkstraSearch:
+    """Trạng thái Dijkstra từ một nguồn, có thể tiếp tục cho đích mới"""
+
+    def __init__(self, adj, source: str, graph_size: int = 0):
+        self.source = source
+        self.adj = adj                                  # G.adj (kề ra với đồ thị có hướng)
+        self.graph_size = graph_size                    # V + E của đồ thị (giới hạn cache)
+        self.dist: Dict[str, float] = {source: 0.0}
+        self.parent: Dict[str, Optional[str]] = {source: None}
+        self.heap: List[Tuple[float, int, str]] = [(0.0, 0, source)]
+        self.settle_index: Dict[str, int] = {}          # đỉnh → chỉ số bước chốt đỉnh đó
+        self.steps: List[AlgorithmStep] = [trusted_step(
+            0, "start", f"Bắt đầu từ {source}, khoảng cách = 0", node=source,
+            distance={source: 0.0}, parent={source: None}
+        )]
+        self.lock = threading.Lock()
+        self._pushed = 1
+
+    @property
+    def exhausted(self) -> bool:
+        return not self.heap
+
+    def settle_until(self, target: str) -> bool:
+        """
+        Chốt đỉnh cho đến khi chốt được target hoặc hết hàng đợi
+
+        Trả về:
+            True nếu target đến được từ nguồn
+        """
+        if target in self.settle_index:
+            return True
+        heap, dist, parent, adj = self.heap, self.dist, self.parent, self.adj
+        settled, steps = self.settle_index, self.steps
+        while heap:
+            d, _, u = heap[0]
+            if u in settled:
+                heapq.heappop(heap)
+                continue  # Bản ghi cũ, đỉnh đã được chốt với khoảng cách nhỏ hơn
+            # Tính các cập nhật và dựng bước TRƯỚC khi sửa trạng thái: trusted_step có
+            # thể ném JobCancelled (jobs.py) mà search này được dùng chung qua cache
+            relaxed_dist: Dict[str, float] = {}
+            relaxed_parent: Dict[str, Optional[str]] = {}
+            for v, attrs in adj[u].items():
+                if v in settled:
+                    continue
+                nd = d + attrs.get("weight", 1.0)
+                if nd < dist.get(v, float("inf")):
+                    relaxed_dist[v] = nd
+                    relaxed_parent[v] = u
+            step = trusted_step(
+                len(steps), "visit",
+                f"Chốt {u} (khoảng cách {d:.2f}), cập nhật {len(relaxed_dist)} đỉnh kề",
+                node=u, distance=relaxed_dist or None, parent=relaxed_parent or None
+            )
+            heapq.heappop(heap)
+            for v, nd in relaxed_dist.items():
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(heap, (nd, self._pushed, v))
+                self._pushed += 1
+            settled[u] = len(steps)
+            steps.append(step)
+            if u == target:
+                return True
+        return False
+
+    def path_to(self, target: str) -> List[str]:
+        path = []
+        node: Optional[str] = target
+        while node is not None:
+            path.append(node)
+            node = self.parent[node]
+        path.reverse()
+        return path
+
+
+class _SearchCache:
+    """LRU các DijkstraSearch theo (hash đồ thị, nguồn), giới hạn số cây và kích thước"""
+
+    def __init__(self, max_size: int, max_elements: int = SEARCH_CACHE_ELEMENTS):
+        self.max_size = max_size
+        self.max_elements = max_elements
+        self._searches: "OrderedDict[Tuple[str, str], DijkstraSearch]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key: Tuple[str, str], adj, source: str,
+                      graph_size: int = 0) -> Tuple[DijkstraSearch, bool]:
+        """Trả về (search, True nếu tái sử dụng); graph_size = V + E của đồ thị"""
+        with self._lock:
+            search = self._searches.get(key)
+            if search is not None:
+                self._searches.move_to_end(key)
+                return search, True
+            search = DijkstraSearch(adj, source, graph_size)
+            if self.max_size > 0:
+                self._searches[key] = search
+                while len(self._searches) > self.max_size:
+                    self._searches.popitem(last=False)
+                self._trim()
+            return search, False
+
+    def trim(self) -> None:
+        """Bỏ cây cũ nhất đến khi tổng kích thước <= max_elements (gọi sau khi cây lớn lên)"""
+        with self._lock:
+            self._trim()
+
+    def _trim(self) -> None:
+        # Cây vừa tạo cũng có thể bị bỏ (đồ thị quá lớn): request vẫn giữ tham chiếu riêng
+        while self._searches and self._elements() > self.max_elements:
+            self._searches.popitem(last=False)
+
+    def _elements(self) -> int:
+        graphs: Dict[str, int] = {}
+        total = 0
+        for (graph_hash, _), search in self._searches.items():
+            graphs[graph_hash] = search.graph_size
+            total += len(search.dist)  # Đọc không cần search.lock: chỉ để ước lượng
+        return total + sum(graphs.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._searches.clear()
+
+
+shortest_path_trees = _SearchCache(SEARCH_CACHE_SIZE)
+
+
+def _alt_search(adj, table: LandmarkTable, source: str, target: str):
+    """
+    A* từ source tới target với heuristic ALT
+
+    Trả về:
+        (khoảng cách hoặc None, đường đi, các bước, số đỉnh đã chốt)
+    """
+    index = table.index
+    t = index[target]
+    h_index = table.heuristic(t, table.active_landmarks(index[source], t))
+    potential: Dict[str, float] = {}
+
+    def h(node: str) -> float:
+        value = potential.get(node)
+        if value is None:
+            value = potential[node] = h_index(index[node])
+        return value
+
+    dist: Dict[str, float] = {source: 0.0}
+    parent: Dict[str, Optional[str]] = {source: None}
+    settled = set()
+    steps: List[AlgorithmStep] = [trusted_step(
+        0, "start", f"Bắt đầu từ {source}, khoảng cách = 0, cận dưới tới đích = {h(source):.2f}",
+        node=source, distance={source: 0.0}, parent={source: None}
+    )]
+    heap: List[Tuple[float, int, str]] = []
+    if h(source) < INF:
+        heap.append((h(source), 0, source))
+    pushed = 1
+    while heap:
+        _, _, u = heapq.heappop(heap)
+        if u in settled:
+            continue
+        settled.add(u)
+        d = dist[u]
+        relaxed_dist: Dict[str, float] = {}
+        relaxed_parent: Dict[str, Optional[str]] = {}
+        if u != target:
+            for v, attrs in adj[u].items():
+                if v in settled:
+                    continue
+                nd = d + attrs.get("weight", 1.0)
+                if nd < dist.get(v, INF):
+                    hv = h(v)
+                    if hv == INF:
+                        continue  # Cận = inf: v không tới được đích
+                    dist[v] = nd
+                    parent[v] = u
+                    relaxed_dist[v] = nd
+                    relaxed_parent[v] = u
+                    heapq.heappush(heap, (nd + hv, pushed, v))
+                    pushed += 1
+        steps.append(trusted_step(
+            len(steps), "visit",
+            f"Chốt {u} (khoảng cách {d:.2f}), cập nhật {len(relaxed_dist)} đỉnh kề",
+            node=u, distance=relaxed_dist or None, parent=relaxed_parent or None
+        ))
+        if u == target:
+            path = []
+            node: Optional[str] = target
+            while node is not None:
+                path.append(node)
+                node = parent[node]
+            path.reverse()
+            return d, path, steps, len(settled)
+    return None, [], steps, len(settled)
 
 
 class ShortestPathMixin:
     """Mixin cung cấp thuật toán tìm đường đi ngắn nhất"""
-    
-    def shortest_path(self, start_node: str, end_node: str) -> AlgorithmResponse:
+
+    def landmark_table(self, build: bool = False, persist: bool = False) -> Optional[LandmarkTable]:
+        """
+        Bảng mốc ALT của đồ thị hiện tại (bộ nhớ → file đã lưu)
+
+        Tham số:
+            build: True → chưa có thì chọn mốc mặc định và tính
+            persist: Lưu bảng vừa tính xuống đĩa; mặc định chỉ giữ trong LRU vì
+                     request có thể gửi đồ thị bất kỳ (lưu đĩa là việc của
+                     /api/landmarks hoặc warmup cho bản đồ mặc định)
+        """
+        content_hash = graph_content_hash(self.graph_data)
+        table = load_landmark_table(self.G, content_hash)
+        if table is None and build:
+            table = self.precompute_landmarks(persist=persist)
+        return table
+
+    def precompute_landmarks(self, count: int = DEFAULT_LANDMARKS, strategy: str = "avoid",
+                             persist: bool = True) -> LandmarkTable:
+        """
+        Chọn mốc và tính bảng khoảng cách cho ALT (luôn tính lại)
+
+        Tham số:
+            count: Số mốc
+            strategy: "avoid" | "farthest" (xem landmarks.py)
+            persist: Lưu bảng vào GraphStorage để dùng lại sau khi khởi động lại
+        """
+        table = build_landmark_table(self.G, graph_content_hash(self.graph_data), count, strategy)
+        store_landmark_table(table, persist)
+        return table
+
+    def shortest_path(self, start_node: str, end_node: str, method: str = "auto") -> AlgorithmResponse:
         """
         Tìm đường đi ngắn nhất sử dụng thuật toán Dijkstra với theo dõi từng bước
-        
+
         Tham số:
             start_node: ID đỉnh bắt đầu
             end_node: ID đỉnh đích
-            
+            method: "auto" (ALT nếu đã có bảng mốc) | "dijkstra" | "alt"
+
         Trả về:
-            AlgorithmResponse với các bước thực thi
+            AlgorithmResponse với các bước thực thi (việc dùng lại cây đã dựng
+            chỉ ghi vào metrics: kết quả được result_cache lưu và phát lại)
         """
-        # TODO: Triển khai thuật toán Dijkstra
-        pass
+        if start_node != end_node and self.unreachable(start_node, end_node):
+            return self._path_response([
+                trusted_step(0, "start", f"Bắt đầu từ {start_node}", node=start_node),
+                trusted_step(1, "unreachable",
+                             f"Không có đường đi từ {start_node} đến {end_node} (khác thành phần liên thông)",
+                             node=end_node)
+            ], {
+                "path": [],
+                "distance": None,
+                "reachable": False,
+                "method": "components",
+                "settled_nodes": 0
+            })
+        if method != "dijkstra":
+            table = self.landmark_table(build=(method == "alt"))
+            if table is not None:
+                return self._shortest_path_alt(table, start_node, end_node)
+        key = (graph_content_hash(self.graph_data), start_node)
+        graph_size = len(self.graph_data.nodes) + len(self.graph_data.edges)
+        search, reused = shortest_path_trees.get_or_create(key, self.G.adj, start_node, graph_size)
+        record_cache("shortest_path_tree", reused)
+        with search.lock:
+            reachable = search.settle_until(end_node)
+            if reachable:
+                settled_count = search.settle_index[end_node]  # bước 0 là "start"
+                steps = search.steps[:settled_count + 1]
+                path = search.path_to(end_node)
+                distance = search.dist[end_node]
+                description = f"Đường đi ngắn nhất {start_node} → {end_node}: {distance:.2f}"
+            else:
+                # Hết hàng đợi: toàn bộ thành phần liên thông của nguồn đã được duyệt
+                steps = list(search.steps)
+                settled_count = len(search.settle_index)
+                path, distance = [], None
+                description = f"Không có đường đi từ {start_node} đến {end_node}"
+        shortest_path_trees.trim()  # Cây vừa lớn thêm
+
+        steps.append(trusted_step(len(steps), "found" if reachable else "unreachable",
+                                  description, node=end_node))
+        result = {
+            "path": path,
+            "distance": distance,
+            "reachable": reachable,
+            "method": "dijkstra",
+            "settled_nodes": settled_count
+        }
+        return self._path_response(steps, result)
+
+    def _shortest_path_alt(self, table: LandmarkTable, start_node: str, end_node: str) -> AlgorithmResponse:
+        """A* với heuristic ALT; kết quả cùng dạng với Dijkstra"""
+        distance, path, steps, settled_count = _alt_search(self.G.adj, table, start_node, end_node)
+        reachable = distance is not None
+        if reachable:
+            description = f"Đường đi ngắn nhất {start_node} → {end_node}: {distance:.2f}"
+        else:
+            description = f"Không có đường đi từ {start_node} đến {end_node}"
+        steps.append(trusted_step(len(steps), "found" if reachable else "unreachable",
+                                  description, node=end_node))
+        return self._path_response(steps, {
+            "path": path,
+            "distance": distance,
+            "reachable": reachable,
+            "method": "alt",
+            "settled_nodes": settled_count,
+            "landmarks": len(table.landmarks)
+        })
+
+    def _path_response(self, steps: List[AlgorithmStep], result: dict) -> AlgorithmResponse:
+        if is_simplified(self.graph_data):
+            result["expanded_path"] = expand_path(self.graph_data, result["path"])
+            result["path_coords"] = expand_path_coords(self.graph_data, result["path"])
+        return AlgorithmResponse(
+            success=True,
+            algorithm="shortest_path",
+            steps=steps,
+            result=result
+        )
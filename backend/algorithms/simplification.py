@@ -0,0 +1,267 @@
+"""
+FILE: simplification.py
+MÔ TẢ: Rút gọn đồ thị - co các chuỗi đỉnh bậc 2 thành một cạnh
+
+CHỨC NĂNG:
+    - Way của OSM nối với nhau tạo ra chuỗi đỉnh bậc 2 (chỉ nối tiếp hai
+      đoạn đường) làm tăng V, E nhưng không thay đổi kết quả tìm đường
+    - simplify_graph(): co mỗi chuỗi a - x1 - x2 - ... - b thành cạnh a - b
+        + weight = tổng trọng số, capacity = min capacity của chuỗi
+        + Hình học gốc (id + tọa độ các đỉnh bị co) lưu trong
+          metadata["chains"] của đồ thị rút gọn → client gửi lại đồ thị rút
+          gọn thì server vẫn mở rộng được kết quả, không cần trạng thái
+    - expand_path(): mở rộng đường đi trên đồ thị rút gọn về đầy đủ các đỉnh gốc
+
+CÁCH HOẠT ĐỘNG:
+    1. Đỉnh co được ("bên trong chuỗi"):
+        - Vô hướng: đúng 2 cạnh vô hướng tới 2 đỉnh kề khác nhau
+        - Có hướng: đúng 1 cạnh vào, 1 cạnh ra, đỉnh trước ≠ đỉnh sau
+        - Không nằm trong keep (vd: đỉnh nguồn/đích người dùng chọn)
+    2. Từ mỗi đỉnh giữ lại (neo), đi theo từng cạnh qua các đỉnh co được
+       đến đỉnh neo tiếp theo → một chuỗi
+    3. Chu trình chỉ gồm đỉnh co được: chọn một đỉnh làm neo
+    4. Chuỗi trùng cặp đỉnh với cạnh đã có → giữ đỉnh giữa chuỗi (tách đôi);
+       chuỗi quay về chính nó (khuyên) → giữ 2 đỉnh thành tam giác
+       → đồ thị rút gọn vẫn là đồ thị đơn như đồ thị gốc, mọi thuật toán chạy
+       trên NetworkX cho kết quả tương đương; rút gọn lần hai không co thêm
+    => O(V + E)
+
+ĐẦU VÀO:
+    - GraphData bất kỳ (cạnh treo được giữ nguyên)
+
+ĐẦU RA:
+    - SimplifiedGraph: đồ thị rút gọn + số đỉnh/cạnh đã co
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from models import Edge, GraphData, trusted_edge, trusted_graph
+from .validation import graph_index
+
+CHAINS_KEY = "chains"
+
+
+def chain_key(source: str, target: str) -> str:
+    """Khóa của một cạnh co trong metadata["chains"]"""
+    return f"{source}|{target}"
+
+
+class SimplifiedGraph:
+    """Kết quả rút gọn"""
+
+    __slots__ = ("graph", "original_node_count", "original_edge_count", "contracted_nodes")
+
+    def __init__(self, graph: GraphData, original_node_count: int, original_edge_count: int,
+                 contracted_nodes: int):
+        self.graph = graph
+        self.original_node_count = original_node_count
+        self.original_edge_count = original_edge_count
+        self.contracted_nodes = contracted_nodes
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "original_node_count": self.original_node_count,
+            "original_edge_count": self.original_edge_count,
+            "node_count": len(self.graph.nodes),
+            "edge_count": len(self.graph.edges),
+            "contracted_nodes": self.contracted_nodes,
+        }
+
+
+def simplify_graph(graph_data: GraphData, keep: Iterable[str] = ()) -> SimplifiedGraph:
+    """
+    Co các chuỗi đỉnh bậc 2
+
+    Tham số:
+        graph_data: Đồ thị gốc
+        keep: Các đỉnh luôn giữ lại (không bị co)
+
+    Trả về:
+        SimplifiedGraph
+    """
+    nodes, edges = graph_data.nodes, graph_data.edges
+    dangling = graph_index(graph_data).dangling_edge_indices
+    node_by_id = {node.id: node for node in nodes}
+
+    # Cạnh đi được từ mỗi đỉnh: (đỉnh kề, chỉ số cạnh)
+    out: Dict[str, List[Tuple[str, int]]] = {node.id: [] for node in nodes}
+    incoming: Dict[str, List[str]] = {node.id: [] for node in nodes}  # Chỉ dùng khi có hướng
+    pinned = set(keep)  # + đỉnh có cạnh có hướng trong đồ thị vô hướng: không co
+    for k, edge in enumerate(edges):
+        if k in dangling:
+            continue
+        out[edge.source].append((edge.target, k))
+        if graph_data.directed:
+            incoming[edge.target].append(edge.source)
+        elif edge.directed:
+            pinned.add(edge.source)
+            pinned.add(edge.target)
+        else:
+            out[edge.target].append((edge.source, k))
+
+    def contractible(node_id: str) -> bool:
+        if node_id in pinned:
+            return False
+        adjacent = out[node_id]
+        if graph_data.directed:
+            if len(adjacent) != 1 or len(incoming[node_id]) != 1:
+                return False
+            before, after = incoming[node_id][0], adjacent[0][0]
+        else:
+            if len(adjacent) != 2:
+                return False
+            before, after = adjacent[0][0], adjacent[1][0]
+        return before != after and node_id not in (before, after)
+
+    inner = {node_id for node_id in out if contractible(node_id)}
+
+    used = set()
+    chains: List[List[Tuple[str, int]]] = []  # [(đỉnh, chỉ số cạnh đi tới đỉnh đó)]
+
+    def walk(anchor: str) -> None:
+        for neighbor, k in out[anchor]:
+            if k in used:
+                continue
+            used.add(k)
+            chain = [(anchor, -1), (neighbor, k)]
+            current, via = neighbor, k
+            while current in inner:
+                current, via = next((n, j) for n, j in out[current] if j != via)
+                used.add(via)
+                chain.append((current, via))
+            chains.append(chain)
+
+    for node in nodes:
+        if node.id not in inner:
+            walk(node.id)
+    # Chu trình chỉ gồm đỉnh bậc 2: chưa được duyệt từ neo nào
+    for node in nodes:
+        if node.id in inner and any(k not in used for _, k in out[node.id]):
+            inner.discard(node.id)
+            walk(node.id)
+
+    # Hình học đã co ở lần rút gọn trước (đồ thị đầu vào đã rút gọn) được ghép tiếp
+    previous = (graph_data.metadata or {}).get(CHAINS_KEY) or {}
+    directed = graph_data.directed
+
+    # Cạnh đơn (không co) trước, rồi các chuỗi - chuỗi trùng cặp đỉnh thì tách đôi
+    chains.sort(key=len)
+    pairs = set()
+    new_edges: List[Edge] = []
+    geometry: Dict[str, Dict[str, list]] = {}
+    kept = {node.id for node in nodes} - inner
+
+    def add_chain(chain: List[Tuple[str, int]], check: bool = True) -> None:
+        source, target = chain[0][0], chain[-1][0]
+        pair = (source, target) if directed or source <= target else (target, source)
+        if check and len(chain) > 3 and source == target:
+            # Khuyên: giữ 2 đỉnh ở 1/3 và 2/3 chuỗi → tam giác, không có cạnh song song
+            last = len(chain) - 1
+            first_cut = max(1, last // 3)
+            second_cut = max(first_cut + 1, 2 * last // 3)
+            for cut in (first_cut, second_cut):
+                kept.add(chain[cut][0])
+            add_chain(chain[:first_cut + 1], False)
+            add_chain([(chain[first_cut][0], -1)] + chain[first_cut + 1:second_cut + 1], False)
+            add_chain([(chain[second_cut][0], -1)] + chain[second_cut + 1:], False)
+            return
+        if check and len(chain) > 2 and pair in pairs:
+            # Trùng cặp đỉnh với cạnh đã có: giữ đỉnh giữa → hai cặp mới
+            middle = len(chain) // 2
+            kept.add(chain[middle][0])
+            add_chain(chain[:middle + 1], False)
+            add_chain([(chain[middle][0], -1)] + chain[middle + 1:], False)
+            return
+        pairs.add(pair)
+        if len(chain) == 2:
+            edge = edges[chain[1][1]]
+            new_edges.append(edge)
+            key = chain_key(edge.source, edge.target)
+            if key in previous:
+                geometry[key] = previous[key]
+            return
+        parts = [edges[k] for _, k in chain[1:]]
+        capacities = [edge.capacity for edge in parts]
+        new_edges.append(trusted_edge(
+            source, target, round(sum(edge.weight for edge in parts), 6),
+            parts[0].directed,
+            min(capacities) if None not in capacities else None
+        ))
+        sequence = [node_id for node_id, _ in chain]
+        interior, coords = [], []
+        for i in range(1, len(sequence)):
+            segment = _segment(previous, sequence[i - 1], sequence[i], directed)
+            if segment:
+                interior.extend(segment["nodes"])
+                coords.extend(segment["coords"])
+            if i < len(sequence) - 1:
+                node = node_by_id[sequence[i]]
+                interior.append(node.id)
+                coords.append([node.lat, node.lon])
+        geometry[chain_key(source, target)] = {"nodes": interior, "coords": coords}
+
+    for chain in chains:
+        add_chain(chain)
+    new_edges.extend(edges[k] for k in sorted(dangling))
+
+    metadata: Dict[str, Any] = dict(graph_data.metadata or {})
+    metadata[CHAINS_KEY] = geometry
+    metadata["simplified"] = True
+
+    new_nodes = [node for node in nodes if node.id in kept]
+    return SimplifiedGraph(
+        trusted_graph(new_nodes, new_edges, directed, graph_data.graph_type, metadata),
+        len(nodes), len(edges), len(nodes) - len(new_nodes)
+    )
+
+
+def _segment(chains: Dict[str, Any], a: str, b: str, directed: bool) -> Optional[Dict[str, list]]:
+    """Hình học của cạnh a → b (đảo chiều nếu chuỗi được lưu theo b → a)"""
+    value = chains.get(chain_key(a, b))
+    if value is not None:
+        return value
+    if directed:
+        return None
+    value = chains.get(chain_key(b, a))
+    if value is None:
+        return None
+    return {"nodes": value["nodes"][::-1], "coords": value["coords"][::-1]}
+
+
+def is_simplified(graph_data: GraphData) -> bool:
+    return bool(graph_data.metadata and graph_data.metadata.get(CHAINS_KEY))
+
+
+def expand_path(graph_data: GraphData, path: List[str]) -> List[str]:
+    """
+    Mở rộng đường đi trên đồ thị rút gọn về đầy đủ các đỉnh gốc
+
+    Tham số:
+        graph_data: Đồ thị rút gọn (có metadata["chains"])
+        path: Danh sách đỉnh của đồ thị rút gọn
+    """
+    chains = (graph_data.metadata or {}).get(CHAINS_KEY) or {}
+    if not chains or len(path) < 2:
+        return list(path)
+    expanded = [path[0]]
+    for a, b in zip(path, path[1:]):
+        segment = _segment(chains, a, b, graph_data.directed)
+        if segment:
+            expanded.extend(segment["nodes"])
+        expanded.append(b)
+    return expanded
+
+
+def expand_path_coords(graph_data: GraphData, path: List[str]) -> List[List[float]]:
+    """Tọa độ [lat, lon] dọc đường đi đã mở rộng (để vẽ đúng hình dạng con đường)"""
+    chains = (graph_data.metadata or {}).get(CHAINS_KEY) or {}
+    index = graph_index(graph_data).node_index
+    nodes = graph_data.nodes
+    coords: List[List[float]] = []
+    for i, node_id in enumerate(path):
+        if i > 0:
+            segment = _segment(chains, path[i - 1], node_id, graph_data.directed)
+            if segment:
+                coords.extend(segment["coords"])
+        node = nodes[index[node_id]]
+        coords.append([node.lat, node.lon])
+    return coords
@@ -7,6 +7,9 @@ CHỨC NĂNG:
     - Depth-First Search (DFS): Duyệt đồ thị theo chiều sâu
     
 CÁCH HOẠT ĐỘNG:
+    Cả hai chạy trên engine mảng số nguyên (traversal_engine.py) thay vì
+    self.G → không cần dựng đồ thị NetworkX, chạy được trên đồ thị 100k đỉnh
+
     BFS:
         1. Bắt đầu từ đỉnh nguồn, thêm vào hàng đợi
         2. Lấy đỉnh đầu hàng đợi, đánh dấu đã thăm
@@ -20,46 +23,91 @@ CÁCH HOẠT ĐỘNG:
         3. Thêm tất cả đỉnh kề chưa thăm vào ngăn xếp
         4. Lặp lại cho đến khi ngăn xếp rỗng
         => Đi sâu vào một nhánh trước khi quay lui
+        (thứ tự tiền thứ tự giống bản đệ quy, nhưng dùng ngăn xếp lặp)
 
 ĐẦU VÀO:
     - start_node (str): ID của đỉnh bắt đầu duyệt
-    - self.G (NetworkX Graph): Đồ thị cần duyệt
+    - include_steps (bool): Ghi trace từng bước; False → chỉ trả kết quả và
+      BFS dùng đường NumPy theo frontier khi có numpy
 
 ĐẦU RA:
     - AlgorithmResponse chứa:
         + success: True/False
         + steps: Danh sách các bước thực thi (để visualization)
-        + result: Thứ tự duyệt và số đỉnh đã thăm
+        + result: Thứ tự duyệt, số đỉnh đã thăm, engine ("python"/"numpy")
 """
-from collections import deque
-from models import AlgorithmResponse, AlgorithmStep
+from typing import List
+from models import AlgorithmResponse, AlgorithmStep, trusted_step
+
+from . import traversal_engine as engine
 
 
 class TraversalMixin:
     """Mixin cung cấp các thuật toán duyệt đồ thị"""
     
-    def bfs(self, start_node: str) -> AlgorithmResponse:
+    def bfs(self, start_node: str, include_steps: bool = True) -> AlgorithmResponse:
         """
         Tìm kiếm theo chiều rộng với theo dõi từng bước thực thi
         
         Tham số:
             start_node: ID đỉnh bắt đầu
+            include_steps: Ghi trace từng bước (False → chỉ kết quả)
             
         Trả về:
             AlgorithmResponse với các bước thực thi
         """
-        # TODO: Triển khai thuật toán BFS
-        pass
+        adj = engine.int_adjacency(self.graph_data)
+        start = self.index.node_index[start_node]
+        if not include_steps and engine.use_numpy(adj):
+            order = engine.bfs_numpy(adj, start).tolist()
+            return self._traversal_response("bfs", adj, order, None, "numpy")
+        order, parent = engine.bfs(adj, start)
+        steps = self._traversal_steps("bfs", adj, order, parent) if include_steps else []
+        return self._traversal_response("bfs", adj, order, steps, "python")
     
-    def dfs(self, start_node: str) -> AlgorithmResponse:
+    def dfs(self, start_node: str, include_steps: bool = True) -> AlgorithmResponse:
         """
         Tìm kiếm theo chiều sâu với theo dõi từng bước thực thi
         
         Tham số:
             start_node: ID đỉnh bắt đầu
+            include_steps: Ghi trace từng bước (False → chỉ kết quả)
             
         Trả về:
             AlgorithmResponse với các bước thực thi
         """
-        # TODO: Triển khai thuật toán DFS
-        pass
+        adj = engine.int_adjacency(self.graph_data)
+        order, parent = engine.dfs(adj, self.index.node_index[start_node])
+        steps = self._traversal_steps("dfs", adj, order, parent) if include_steps else []
+        return self._traversal_response("dfs", adj, order, steps, "python")
+
+    @staticmethod
+    def _traversal_steps(algorithm: str, adj: "engine.IntAdjacency", order, parent) -> List[AlgorithmStep]:
+        """Trace: bước start, một bước visit cho mỗi đỉnh (kèm cạnh cây), bước complete"""
+        ids = adj.node_ids
+        root = ids[order[0]]
+        name = algorithm.upper()
+        steps = [trusted_step(0, "start", f"Bắt đầu {name} từ {root}", node=root)]
+        for v in order[1:]:
+            u = ids[parent[v]]
+            steps.append(trusted_step(
+                len(steps), "visit", f"Thăm {ids[v]} từ {u}",
+                node=ids[v], edge={"source": u, "target": ids[v]}
+            ))
+        steps.append(trusted_step(len(steps), "complete", f"{name} hoàn tất: thăm {len(order)} đỉnh"))
+        return steps
+
+    @staticmethod
+    def _traversal_response(algorithm: str, adj: "engine.IntAdjacency", order, steps,
+                            engine_name: str) -> AlgorithmResponse:
+        ids = adj.node_ids
+        return AlgorithmResponse(
+            success=True,
+            algorithm=algorithm,
+            steps=steps or [],
+            result={
+                "traversal_order": [ids[v] for v in order],
+                "visited_count": len(order),
+                "engine": engine_name
+            }
+        )
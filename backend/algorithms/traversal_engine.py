@@ -0,0 +1,335 @@
+"""
+FILE: traversal_engine.py
+MÔ TẢ: Engine duyệt đồ thị trên mảng chỉ số nguyên (BFS, DFS, tô hai màu)
+
+CHỨC NĂNG:
+    - IntAdjacency: danh sách kề dạng CSR (offsets/targets là array 'q'),
+      dựng một lần và cache trên GraphIndex của đồ thị (validation.py)
+    - register_shared_adjacency(): CSR nằm trong file mmap dùng chung giữa các
+      worker (shared_graphs.py) → request gửi đúng đồ thị đó (cùng hash nội
+      dung) dùng lại, không worker nào phải dựng bản riêng
+    - bfs / dfs / two_color: đánh dấu đã thăm bằng bytearray, hàng đợi/ngăn
+      xếp là mảng int cấp phát sẵn, màu là mảng int8 → không set/dict/deque
+      trên id chuỗi trong vòng lặp nóng
+    - Chế độ chỉ-kết-quả (không trace): BFS theo frontier vector hóa bằng
+      NumPy, tô hai màu = chẵn lẻ theo tầng BFS + kiểm tra mọi cạnh một lần
+
+CÁCH HOẠT ĐỘNG:
+    IntAdjacency (giống ngữ nghĩa NetworkX mà các thuật toán khác dùng):
+        - Bỏ cạnh treo, gộp cạnh song song, giữ thứ tự kề theo thứ tự cạnh
+        - Vô hướng: mỗi cạnh thêm cả hai chiều; có hướng: chỉ kề ra
+    BFS NumPy (cùng thứ tự với BFS hàng đợi):
+        1. Gom đỉnh kề của cả frontier theo đúng thứ tự (np.repeat trên offsets)
+        2. Lọc đỉnh chưa thăm, np.unique(return_index) → lần xuất hiện đầu tiên
+        3. Sắp theo vị trí xuất hiện → frontier tiếp theo
+    Tô hai màu NumPy:
+        - Màu = tầng BFS mod 2 (mỗi thành phần liên thông bắt đầu từ đỉnh nhỏ nhất
+          chưa thăm); đồ thị hai phần ⇔ không cạnh nào có hai đầu cùng màu
+
+CẤU HÌNH:
+    GRAPH_API_NUMPY=0         Tắt đường NumPy (dùng engine thuần Python)
+    GRAPH_API_NUMPY_MIN_NODES Chỉ dùng NumPy khi đồ thị có ít nhất từng này đỉnh (2000)
+
+LƯU Ý:
+    - NumPy là tùy chọn: thiếu thì engine thuần Python vẫn cho cùng kết quả
+"""
+import os
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from models import GraphData
+from .validation import graph_content_hash, graph_index
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - thư viện tùy chọn
+    np = None
+
+NUMPY_ENABLED = os.environ.get("GRAPH_API_NUMPY", "1").lower() not in ("0", "false", "no")
+NUMPY_MIN_NODES = int(os.environ.get("GRAPH_API_NUMPY_MIN_NODES", 2000))
+
+# CSR dùng chung theo hash nội dung (+ kích thước để khỏi hash mọi request)
+_shared_adjacency: Dict[str, "IntAdjacency"] = {}
+_shared_sizes: Set[Tuple[int, int]] = set()
+
+
+class IntAdjacency:
+    """
+    Danh sách kề CSR theo chỉ số đỉnh (thứ tự của graph_data.nodes)
+
+    offsets/targets là array 'q' hoặc memoryview 'q' trên file mmap; node_ids
+    là list hoặc dãy chỉ đọc tương đương (chỉ dùng len() và ids[i])
+    """
+
+    __slots__ = ("node_ids", "offsets", "targets", "directed", "_numpy")
+
+    def __init__(self, node_ids: Sequence[str], offsets: Sequence[int], targets: Sequence[int],
+                 directed: bool):
+        self.node_ids = node_ids
+        self.offsets = offsets
+        self.targets = targets
+        self.directed = directed
+        self._numpy = None
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    def numpy_arrays(self):
+        """(offsets, targets) dạng np.ndarray int64 - dùng chung bộ nhớ với array, cache lại"""
+        if self._numpy is None:
+            self._numpy = (np.frombuffer(self.offsets, dtype=np.int64),
+                           np.frombuffer(self.targets, dtype=np.int64))
+        return self._numpy
+
+
+def adjacency_from_pairs(node_ids: List[str], pairs: Iterable[Tuple[int, int]],
+                         directed: bool) -> IntAdjacency:
+    """
+    Dựng IntAdjacency từ các cặp chỉ số (i, j) theo thứ tự cạnh - O(V + E)
+
+    Gộp cạnh song song (NetworkX cũng chỉ giữ một); vô hướng thêm cả hai chiều
+    """
+    n = len(node_ids)
+    buckets: List[List[int]] = [[] for _ in range(n)]
+    seen = set()
+    for i, j in pairs:
+        key = (i, j) if directed or i <= j else (j, i)
+        if key in seen:
+            continue
+        seen.add(key)
+        buckets[i].append(j)
+        if not directed and i != j:
+            buckets[j].append(i)
+    offsets = array("q", [0]) * (n + 1)
+    targets = array("q")
+    for i, bucket in enumerate(buckets):
+        targets.extend(bucket)
+        offsets[i + 1] = len(targets)
+    return IntAdjacency(node_ids, offsets, targets, directed)
+
+
+def build_int_adjacency(graph_data: GraphData) -> IntAdjacency:
+    """Dựng IntAdjacency của graph_data (không cache - dùng int_adjacency())"""
+    index = graph_index(graph_data)
+    node_index = index.node_index
+    dangling = index.dangling_edge_indices
+    pairs = (
+        (node_index[edge.source], node_index[edge.target])
+        for k, edge in enumerate(graph_data.edges) if k not in dangling
+    )
+    return adjacency_from_pairs([node.id for node in graph_data.nodes], pairs, graph_data.directed)
+
+
+def int_adjacency(graph_data: GraphData) -> IntAdjacency:
+    """IntAdjacency đã cache trên GraphIndex của graph_data (ưu tiên bản dùng chung)"""
+    index = graph_index(graph_data)
+    if index.adjacency is None:
+        adj = None
+        if (len(graph_data.nodes), len(graph_data.edges)) in _shared_sizes:
+            adj = _shared_adjacency.get(graph_content_hash(graph_data))
+        index.adjacency = adj if adj is not None else build_int_adjacency(graph_data)
+    return index.adjacency
+
+
+def register_shared_adjacency(graph_data: GraphData, adj: IntAdjacency) -> None:
+    """
+    Đăng ký CSR dựng sẵn (thường trên mmap, xem shared_graphs.py) cho graph_data
+
+    Tham số:
+        graph_data: Đồ thị mà adj được dựng từ đó (cùng thứ tự đỉnh, cạnh)
+        adj: Kết quả build_int_adjacency() của đồ thị đó
+    """
+    _shared_adjacency[graph_content_hash(graph_data)] = adj
+    _shared_sizes.add((len(graph_data.nodes), len(graph_data.edges)))
+    graph_index(graph_data).adjacency = adj
+
+
+def use_numpy(adj: IntAdjacency) -> bool:
+    """Đường NumPy có sẵn và đáng dùng cho đồ thị này không"""
+    return np is not None and NUMPY_ENABLED and adj.node_count >= NUMPY_MIN_NODES
+
+
+# ==================== Engine thuần Python ====================
+
+def bfs(adj: IntAdjacency, start: int) -> Tuple[array, array]:
+    """
+    BFS từ start
+
+    Trả về:
+        (order, parent): order = các đỉnh theo thứ tự thăm (cũng là hàng đợi
+        cấp phát sẵn), parent[v] = đỉnh phát hiện v (-1 nếu là gốc/chưa thăm)
+    """
+    n = adj.node_count
+    offsets, targets = adj.offsets, adj.targets
+    visited = bytearray(n)
+    parent = array("q", [-1]) * n
+    queue = array("q", [0]) * n
+    queue[0] = start
+    visited[start] = 1
+    head, tail = 0, 1
+    while head < tail:
+        u = queue[head]
+        head += 1
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            if not visited[v]:
+                visited[v] = 1
+                parent[v] = u
+                queue[tail] = v
+                tail += 1
+    return queue[:tail], parent
+
+
+def dfs(adj: IntAdjacency, start: int) -> Tuple[array, array]:
+    """
+    DFS (thứ tự tiền thứ tự như bản đệ quy, đỉnh kề theo thứ tự kề)
+
+    Ngăn xếp gồm hai mảng cấp phát sẵn: đỉnh và con trỏ cạnh kế tiếp của đỉnh đó
+    → không đệ quy, không vượt giới hạn đệ quy trên đồ thị lớn
+    """
+    n = adj.node_count
+    offsets, targets = adj.offsets, adj.targets
+    visited = bytearray(n)
+    parent = array("q", [-1]) * n
+    order = array("q")
+    stack_node = array("q", [0]) * n
+    stack_edge = array("q", [0]) * n
+    stack_node[0], stack_edge[0] = start, offsets[start]
+    visited[start] = 1
+    order.append(start)
+    top = 0
+    while top >= 0:
+        u = stack_node[top]
+        k, end = stack_edge[top], offsets[u + 1]
+        while k < end and visited[targets[k]]:
+            k += 1
+        if k == end:
+            top -= 1
+            continue
+        stack_edge[top] = k + 1
+        v = targets[k]
+        visited[v] = 1
+        parent[v] = u
+        order.append(v)
+        top += 1
+        stack_node[top], stack_edge[top] = v, offsets[v]
+    return order, parent
+
+
+def two_color(adj: IntAdjacency) -> Tuple[array, Optional[Tuple[int, int]], array]:
+    """
+    Tô hai màu bằng BFS trên mọi thành phần liên thông
+
+    Trả về:
+        (color, conflict, order): color[v] ∈ {0, 1}; conflict = cạnh (u, v)
+        cùng màu đầu tiên gặp (None nếu là đồ thị hai phần); order = thứ tự tô
+    """
+    n = adj.node_count
+    offsets, targets = adj.offsets, adj.targets
+    color = array("b", [-1]) * n
+    queue = array("q", [0]) * n
+    tail = 0
+    for root in range(n):
+        if color[root] != -1:
+            continue
+        color[root] = 0
+        head = tail
+        queue[tail] = root
+        tail += 1
+        while head < tail:
+            u = queue[head]
+            head += 1
+            cu = color[u]
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                if color[v] == -1:
+                    color[v] = 1 - cu
+                    queue[tail] = v
+                    tail += 1
+                elif color[v] == cu:
+                    return color, (u, v), queue[:tail]
+    return color, None, queue[:tail]
+
+
+# ==================== Engine NumPy (chỉ kết quả) ====================
+
+def _gather_neighbors(offsets, targets, frontier):
+    """Đỉnh kề của cả frontier, theo đúng thứ tự frontier rồi thứ tự kề"""
+    starts = offsets[frontier]
+    counts = offsets[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return targets[:0]
+    # Vị trí trong targets: starts[i] + (0..counts[i]-1), ghép liền nhau
+    shift = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return targets[shift + np.arange(total, dtype=np.int64)]
+
+
+def bfs_numpy(adj: IntAdjacency, start: int, visited=None, level=None):
+    """
+    BFS theo frontier (vector hóa); cùng thứ tự thăm với bfs()
+
+    Tham số visited/level: dùng lại giữa các thành phần liên thông (two_color_numpy)
+
+    Trả về:
+        order dạng np.ndarray
+    """
+    offsets, targets = adj.numpy_arrays()
+    if visited is None:
+        visited = np.zeros(adj.node_count, dtype=bool)
+    frontier = np.array([start], dtype=np.int64)
+    visited[start] = True
+    depth = 0
+    parts = [frontier]
+    while True:
+        neighbors = _gather_neighbors(offsets, targets, frontier)
+        neighbors = neighbors[~visited[neighbors]]
+        if neighbors.size == 0:
+            break
+        # Lần xuất hiện đầu tiên của mỗi đỉnh, giữ thứ tự xuất hiện
+        _, first = np.unique(neighbors, return_index=True)
+        first.sort()
+        frontier = neighbors[first]
+        visited[frontier] = True
+        depth += 1
+        if level is not None:
+            level[frontier] = depth
+        parts.append(frontier)
+    return np.concatenate(parts)
+
+
+def _next_unvisited(visited, start: int, chunk: int = 1024) -> int:
+    """Đỉnh chưa thăm đầu tiên từ start - quét theo khối nên tổng chi phí O(V)"""
+    n = visited.size
+    while start < n:
+        window = visited[start:start + chunk]
+        if not window.all():
+            return start + int(np.argmin(window))
+        start += chunk
+    return n
+
+
+def two_color_numpy(adj: IntAdjacency):
+    """
+    Tô hai màu theo chẵn lẻ tầng BFS rồi kiểm tra mọi cạnh (vector hóa)
+
+    Trả về:
+        (color np.int8, conflict (u, v) hoặc None)
+    """
+    offsets, targets = adj.numpy_arrays()
+    n = adj.node_count
+    degree = np.diff(offsets)
+    visited = degree == 0  # Đỉnh cô lập: tầng 0, không cần duyệt
+    level = np.zeros(n, dtype=np.int64)
+    root = _next_unvisited(visited, 0)
+    while root < n:
+        bfs_numpy(adj, root, visited, level)
+        root = _next_unvisited(visited, root + 1)
+    color = (level & 1).astype(np.int8)
+    sources = np.repeat(np.arange(n, dtype=np.int64), degree)
+    same = np.flatnonzero(color[sources] == color[targets])
+    if same.size:
+        k = int(same[0])
+        return color, (int(sources[k]), int(targets[k]))
+    return color, None
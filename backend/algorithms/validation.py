@@ -0,0 +1,205 @@
+"""
+FILE: validation.py
+MÔ TẢ: Kiểm Tra Cấu Trúc Đồ Thị - Chỉ mục đỉnh và báo cáo toàn vẹn tham chiếu
+
+CHỨC NĂNG:
+    - Dựng chỉ mục id đỉnh → vị trí MỘT lần cho mỗi GraphData
+    - Phát hiện trong cùng một lượt duyệt:
+        + Id đỉnh trùng lặp
+        + Cạnh treo (source/target không phải đỉnh nào)
+        + Cạnh song song (trùng cặp đỉnh với cạnh trước đó)
+        + Khuyên (self-loop)
+        + Trọng số âm (làm sai Dijkstra/Prim)
+    - Cache kết quả ngay trên GraphData (private attribute `_index`)
+      → các mixin kiểm tra điều kiện đầu vào trong O(1)
+
+CÁCH HOẠT ĐỘNG:
+    1. Duyệt nodes: gán chỉ mục, ghi nhận id trùng - O(V)
+    2. Duyệt edges: tra chỉ mục hai đầu, kiểm tra trùng cặp,
+       khuyên, trọng số âm - O(E)
+    3. Lưu GraphIndex vào graph_data._index (kèm hash nội dung, tính lười)
+    4. Lần gọi sau: so sánh danh sách nodes/edges (cùng đối tượng list) và số
+       phần tử (phát hiện gán list mới, model_copy(update=...), append/xóa)
+       rồi trả lại bản cache
+
+LƯU Ý:
+    - Sửa TẠI CHỖ một đỉnh/cạnh (đổi trọng số, đầu mút, id, thay phần tử cùng
+      vị trí) không đổi list lẫn số phần tử → phải gọi invalidate_graph_index();
+      nếu không, chỉ mục, hash nội dung và mọi thứ cache theo hash (NetworkX,
+      thành phần, result_cache, cây Dijkstra, bảng mốc ALT) sẽ cũ
+
+ĐẦU VÀO:
+    - graph_data: GraphData
+
+ĐẦU RA:
+    - GraphIndex (node_index, report, tập cạnh treo để bỏ qua khi dựng đồ thị)
+"""
+import hashlib
+from typing import Dict, List, Optional, Set, Tuple
+from models import GraphData, GraphValidationReport
+from metrics import record_cache
+
+# Số phần tử tối đa mỗi danh sách chi tiết trong báo cáo
+MAX_REPORTED_ITEMS = 100
+
+
+class GraphIndex:
+    """Chỉ mục đỉnh và báo cáo cấu trúc của một GraphData"""
+
+    __slots__ = ("node_index", "report", "dangling_edge_indices", "content_hash", "adjacency",
+                 "components", "networkx", "parts", "_fingerprint")
+
+    def __init__(self, node_index: Dict[str, int], report: GraphValidationReport,
+                 dangling_edge_indices: Set[int], fingerprint: Tuple[list, list, int, int]):
+        self.node_index = node_index
+        self.report = report
+        self.dangling_edge_indices = dangling_edge_indices
+        # Hash nội dung, tính lười bởi result_cache.graph_content_hash()
+        self.content_hash: Optional[str] = None
+        # Danh sách kề số nguyên, dựng lười bởi traversal_engine.int_adjacency()
+        self.adjacency = None
+        # Nhãn thành phần liên thông theo loại, dựng lười bởi components.component_labels()
+        self.components = None
+        # Đồ thị NetworkX và các phần theo thành phần, dựng lười bởi GraphAlgorithms
+        # → mọi GraphAlgorithms trên cùng GraphData (vd: các job của /api/batch) dùng chung
+        self.networkx = None
+        self.parts = None
+        self._fingerprint = fingerprint
+
+    def has_node(self, node_id: str) -> bool:
+        """Kiểm tra đỉnh tồn tại - O(1)"""
+        return node_id in self.node_index
+
+    def missing_nodes(self, *node_ids: Optional[str]) -> List[str]:
+        """Các id (khác None) không phải là đỉnh của đồ thị"""
+        return [node_id for node_id in node_ids
+                if node_id is not None and node_id not in self.node_index]
+
+
+def _add_limited(items: list, item, counter: List[bool]) -> None:
+    """Thêm phần tử vào danh sách báo cáo, đánh dấu truncated khi vượt giới hạn"""
+    if len(items) < MAX_REPORTED_ITEMS:
+        items.append(item)
+    else:
+        counter[0] = True
+
+
+def build_graph_index(graph_data: GraphData) -> GraphIndex:
+    """
+    Dựng chỉ mục và báo cáo cấu trúc trong một lượt O(V+E)
+
+    Tham số:
+        graph_data: Đồ thị cần kiểm tra
+
+    Trả về:
+        GraphIndex (không cache - dùng graph_index() để có cache)
+    """
+    truncated = [False]
+    node_index: Dict[str, int] = {}
+    duplicates: List[str] = []
+    for i, node in enumerate(graph_data.nodes):
+        if node.id in node_index:
+            _add_limited(duplicates, node.id, truncated)
+        else:
+            node_index[node.id] = i
+
+    dangling: List[dict] = []
+    dangling_indices: Set[int] = set()
+    parallel: List[dict] = []
+    self_loops: List[dict] = []
+    negative: List[dict] = []
+    first_edge: Dict[Tuple[str, str], int] = {}
+    directed = graph_data.directed
+
+    for k, edge in enumerate(graph_data.edges):
+        source, target = edge.source, edge.target
+
+        missing = [n for n in (source, target) if n not in node_index]
+        if missing:
+            dangling_indices.add(k)
+            _add_limited(dangling, {
+                "index": k, "source": source, "target": target, "missing": missing
+            }, truncated)
+
+        if source == target:
+            _add_limited(self_loops, {"index": k, "node": source}, truncated)
+
+        key = (source, target) if directed or source <= target else (target, source)
+        first = first_edge.get(key)
+        if first is None:
+            first_edge[key] = k
+        else:
+            _add_limited(parallel, {
+                "index": k, "source": source, "target": target, "first_index": first
+            }, truncated)
+
+        if edge.weight < 0:
+            _add_limited(negative, {
+                "index": k, "source": source, "target": target, "weight": edge.weight
+            }, truncated)
+
+    report = GraphValidationReport(
+        node_count=len(graph_data.nodes),
+        edge_count=len(graph_data.edges),
+        is_valid=not duplicates and not dangling_indices,
+        has_negative_weights=bool(negative),
+        duplicate_node_ids=duplicates,
+        dangling_edges=dangling,
+        parallel_edges=parallel,
+        self_loops=self_loops,
+        negative_weight_edges=negative,
+        truncated=truncated[0]
+    )
+    return GraphIndex(node_index, report, dangling_indices, _fingerprint(graph_data))
+
+
+def _fingerprint(graph_data: GraphData) -> Tuple[list, list, int, int]:
+    """Danh sách nodes/edges (so theo đối tượng) + số phần tử hiện tại"""
+    return (graph_data.nodes, graph_data.edges, len(graph_data.nodes), len(graph_data.edges))
+
+
+def _same_fingerprint(a: Tuple[list, list, int, int], b: Tuple[list, list, int, int]) -> bool:
+    return a[0] is b[0] and a[1] is b[1] and a[2] == b[2] and a[3] == b[3]
+
+
+def invalidate_graph_index(graph_data: GraphData) -> None:
+    """
+    Bỏ GraphIndex đã cache (và mọi thứ dựng trên nó) sau khi sửa đồ thị tại chỗ
+
+    Lần dùng tiếp theo dựng lại chỉ mục, hash nội dung, danh sách kề, ...
+    """
+    graph_data._index = None
+
+
+def graph_index(graph_data: GraphData) -> GraphIndex:
+    """
+    Lấy GraphIndex đã cache trên graph_data (dựng mới nếu chưa có, list nodes/edges
+    đã bị thay hoặc đổi kích thước)
+    """
+    cached = graph_data._index
+    if cached is not None and _same_fingerprint(cached._fingerprint, _fingerprint(graph_data)):
+        record_cache("graph_index", True)
+        return cached
+    record_cache("graph_index", False)
+    index = build_graph_index(graph_data)
+    graph_data._index = index
+    return index
+
+
+def validate_graph(graph_data: GraphData) -> GraphValidationReport:
+    """Báo cáo cấu trúc của đồ thị (có cache)"""
+    return graph_index(graph_data).report
+
+
+def graph_content_hash(graph_data: GraphData) -> str:
+    """
+    Hash nội dung đồ thị (đỉnh, cạnh, thuộc tính) - O(V+E) lần đầu,
+    sau đó lấy lại từ GraphIndex đã cache trên graph_data
+
+    Dùng làm định danh đồ thị giữa các request (result_cache, cây Dijkstra)
+    """
+    index = graph_index(graph_data)
+    if index.content_hash is None:
+        payload = graph_data.__pydantic_serializer__.to_json(graph_data)
+        index.content_hash = hashlib.blake2b(payload, digest_size=16).hexdigest()
+    return index.content_hash
@@ -0,0 +1,125 @@
+"""
+FILE: batch.py
+MÔ TẢ: Chạy nhiều job thuật toán trên cùng một đồ thị (/api/batch)
+
+CHỨC NĂNG:
+    - prepare_graph: dựng MỘT lần các cấu trúc mà các job cần (chỉ mục, danh
+      sách kề số nguyên, nhãn thành phần, các phần theo thành phần, đồ thị
+      NetworkX) - tất cả cache trên GraphIndex của GraphData
+    - stream_jobs: chạy các job trong thread pool, trả kết quả theo thứ tự
+      HOÀN THÀNH (không phải thứ tự gửi)
+
+CÁCH HOẠT ĐỘNG:
+    1. main.py validate từng job thành request của endpoint tương ứng; field
+       graph là CÙNG một đối tượng GraphData → GraphAlgorithms(request.graph)
+       của mọi job thấy cùng một GraphIndex
+    2. prepare_graph() dựng tuần tự trước khi chạy job → các luồng chỉ đọc
+       cấu trúc đã dựng, không tranh nhau dựng lười
+    3. Mỗi job là một callable không tham số; pool dùng chung giữa các request
+    4. Client ngắt kết nối → generator đóng → hủy các job chưa bắt đầu
+    => Dựng đồ thị một lần thay vì một lần cho mỗi lời gọi HTTP
+
+CẤU HÌNH:
+    GRAPH_API_BATCH_WORKERS  Số luồng chạy job (mặc định min(4, số CPU))
+
+LƯU Ý:
+    - Dùng luồng (không phải tiến trình) để chia sẻ cấu trúc đã dựng mà không
+      phải gửi đồ thị sang tiến trình khác; phần nặng CPU vẫn song song được
+      qua NumPy và process pool theo thành phần (algorithms/partition.py)
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from algorithms import GraphAlgorithms
+from algorithms.traversal_engine import int_adjacency
+from models import GraphData
+
+BATCH_WORKERS = int(os.environ.get("GRAPH_API_BATCH_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Cấu trúc dùng chung mà mỗi thuật toán cần (tên theo đường dẫn endpoint)
+PREPARE_NEEDS = {
+    "bfs": ("adjacency",),
+    "dfs": ("adjacency",),
+    "check-bipartite": ("parts",),
+    "shortest-path": ("components", "networkx"),
+    "isochrone": ("networkx",),
+    "components": ("components",),
+    "prim": ("components", "networkx"),
+    "kruskal": ("components", "parts"),
+    "ford-fulkerson": ("components",),
+    "fleury": ("parts",),
+    "hierholzer": ("parts",),
+}
+# Thứ tự dựng: cấu trúc sau dùng lại cấu trúc trước
+PREPARE_ORDER = ("adjacency", "components", "parts", "networkx")
+
+
+def prepare_graph(graph_data: GraphData, algorithms: Iterable[str]) -> List[str]:
+    """
+    Dựng trước các cấu trúc mà các thuật toán sẽ dùng
+
+    Tham số:
+        graph_data: Đồ thị chung của batch
+        algorithms: Tên thuật toán của các job
+
+    Trả về:
+        Tên các cấu trúc đã dựng (theo PREPARE_ORDER)
+    """
+    algo = GraphAlgorithms(graph_data)
+    needs = set()
+    for name in algorithms:
+        needs.update(PREPARE_NEEDS.get(name, ()))
+    builders = {
+        "adjacency": lambda: int_adjacency(graph_data),
+        "components": algo.components,
+        "parts": algo.component_parts,
+        "networkx": lambda: algo.G,
+    }
+    prepared = [name for name in PREPARE_ORDER if name in needs]
+    for name in prepared:
+        builders[name]()
+    return prepared
+
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    """Thread pool dùng chung, tạo lười ở lần đầu cần"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max(BATCH_WORKERS, 1), thread_name_prefix="batch")
+        return _pool
+
+
+def _timed(job: Callable[[], Any]) -> Tuple[Any, float, Optional[str]]:
+    started = time.perf_counter()
+    try:
+        result, error = job(), None
+    except Exception as e:  # Runner thường tự bắt lỗi; đây là lưới an toàn
+        result, error = None, str(e)
+    return result, (time.perf_counter() - started) * 1000, error
+
+
+def stream_jobs(jobs: List[Callable[[], Any]]) -> Iterator[Tuple[int, Any, float, Optional[str]]]:
+    """
+    Chạy các job trong pool, sinh kết quả ngay khi từng job xong
+
+    Trả về:
+        Iterator (chỉ số job, kết quả, thời gian ms, lỗi hoặc None)
+    """
+    pool = _executor()
+    futures = {pool.submit(_timed, job): i for i, job in enumerate(jobs)}
+    try:
+        for future in as_completed(futures):
+            result, elapsed_ms, error = future.result()
+            yield futures[future], result, elapsed_ms, error
+    finally:
+        # Generator bị đóng sớm (client ngắt kết nối) → bỏ các job chưa chạy
+        for future in futures:
+            future.cancel()
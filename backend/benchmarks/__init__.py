@@ -0,0 +1 @@
+"""Benchmarks cho backend (chạy như script từ thư mục backend/)"""
@@ -0,0 +1,280 @@
+"""
+FILE: benchmarks/bench_algorithms.py
+MÔ TẢ: Benchmark các thuật toán đồ thị và đường lưu trữ/parse OSM
+
+CHỨC NĂNG:
+    - Đo mọi mixin: BFS/DFS, Dijkstra, bipartite, Prim/Kruskal,
+      Ford-Fulkerson, Fleury/Hierholzer, chuyển đổi biểu diễn
+    - Đo dựng GraphAlgorithms, GraphStorage (save/load), parser OSM
+    - Đồ thị từ benchmarks/generators.py (grid, road, sample) có seed
+    - Mỗi case báo: thời gian (trung vị), bộ nhớ đỉnh (tracemalloc),
+      số bước trace và kích thước JSON của kết quả
+    - Lưu baseline và so sánh để phát hiện regression
+
+CÁCH CHẠY (từ thư mục backend/):
+    python -m benchmarks.bench_algorithms
+    python -m benchmarks.bench_algorithms --generators road --sizes 1000 10000
+    python -m benchmarks.bench_algorithms --cases bfs shortest_path --repeat 5
+    python -m benchmarks.bench_algorithms --save-baseline main
+    python -m benchmarks.bench_algorithms --compare main --threshold 1.2
+
+CÁCH HOẠT ĐỘNG:
+    1. Sinh đồ thị cho mỗi (generator, size)
+    2. Mỗi case chạy `repeat` lần lấy trung vị thời gian,
+       sau đó chạy thêm một lần dưới tracemalloc để đo bộ nhớ đỉnh;
+       SETUPS (không tính giờ) chạy trước MỖI lần để bỏ cache:
+        - build: GraphData mới (không có GraphIndex) → đo dựng thật
+        - shortest_path: xóa shortest_path_trees → Dijkstra nguội;
+          shortest_path_warm đo lại cùng truy vấn khi cây đã được cache
+    3. Case lỗi (ngoại lệ hoặc chưa triển khai) được ghi status="error"
+    4. Baseline lưu ở benchmarks/baselines/<tên>.json;
+       --compare đánh dấu REGRESSION khi thời gian > baseline × threshold
+"""
+import argparse
+import gc
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from algorithms import GraphAlgorithms
+from algorithms.shortest_path import shortest_path_trees
+from algorithms.traversal_engine import int_adjacency
+from algorithms.validation import invalidate_graph_index
+from graph_storage import GraphStorage
+from map_data import osm_fetcher
+from models import GraphData
+from pydantic import BaseModel
+
+from benchmarks.generators import GENERATORS, osm_elements
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+
+def _first_last(graph: GraphData):
+    return graph.nodes[0].id, graph.nodes[-1].id
+
+
+def _fresh_graph(graph: GraphData, algo: GraphAlgorithms) -> Tuple[GraphData, None]:
+    """Bản sao không mang GraphIndex đã cache → case "build" dựng lại từ đầu"""
+    fresh = graph.model_copy()
+    invalidate_graph_index(fresh)
+    return fresh, None
+
+
+def _build(graph: GraphData) -> GraphAlgorithms:
+    """Dựng GraphAlgorithms cùng các cấu trúc lười mà thuật toán dùng"""
+    algo = GraphAlgorithms(graph)
+    algo.G
+    int_adjacency(graph)
+    return algo
+
+
+def _cold_search(graph: GraphData, algo: GraphAlgorithms) -> Tuple[GraphData, GraphAlgorithms]:
+    shortest_path_trees.clear()
+    return graph, algo
+
+
+def _warm_search(graph: GraphData, algo: GraphAlgorithms) -> Tuple[GraphData, GraphAlgorithms]:
+    algo.shortest_path(*_first_last(graph))  # Bảo đảm cây của nguồn đã có trong cache
+    return graph, algo
+
+
+def _storage_roundtrip(graph: GraphData):
+    """Lưu rồi tải lại đồ thị trong thư mục tạm"""
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = GraphStorage()
+        storage.save_dir = Path(tmp)
+        storage.save_graph("bench", graph)
+        return storage.load_graph("bench.json")
+
+
+# Mỗi case: (graph, algo) -> kết quả. `algo` là GraphAlgorithms dựng sẵn
+CASES: Dict[str, Callable[[GraphData, GraphAlgorithms], Any]] = {
+    "build": lambda g, a: _build(g),
+    "bfs": lambda g, a: a.bfs(g.nodes[0].id),
+    "dfs": lambda g, a: a.dfs(g.nodes[0].id),
+    "shortest_path": lambda g, a: a.shortest_path(*_first_last(g)),
+    "shortest_path_warm": lambda g, a: a.shortest_path(*_first_last(g)),
+    "bipartite": lambda g, a: a.check_bipartite(),
+    "prim": lambda g, a: a.prim_mst(g.nodes[0].id),
+    "kruskal": lambda g, a: a.kruskal_mst(),
+    "ford_fulkerson": lambda g, a: a.ford_fulkerson(*_first_last(g)),
+    "fleury": lambda g, a: a.fleury_algorithm(g.nodes[0].id),
+    "hierholzer": lambda g, a: a.hierholzer_algorithm(g.nodes[0].id),
+    "convert_adjacency_list": lambda g, a: a.convert_representation(g, "adjacency_list"),
+    "convert_csr": lambda g, a: a.convert_representation(g, "adjacency_matrix", "csr"),
+    "convert_edge_list": lambda g, a: a.convert_representation(g, "edge_list"),
+    "storage_roundtrip": lambda g, a: _storage_roundtrip(g),
+}
+
+# Chuẩn bị (không tính giờ) trước mỗi lần chạy: (graph, algo) -> (graph, algo) truyền cho case
+SETUPS: Dict[str, Callable[[GraphData, GraphAlgorithms], Tuple[Any, Any]]] = {
+    "build": _fresh_graph,
+    "shortest_path": _cold_search,
+    "shortest_path_warm": _warm_search,
+}
+
+# Case chạy trên dữ liệu OSM tổng hợp thay vì GraphData
+OSM_CASE = "osm_parse"
+
+# Các thuật toán O(E²) trở lên bị bỏ qua khi đồ thị lớn hơn ngưỡng này
+SLOW_CASES = {"fleury": 2000, "ford_fulkerson": 20000}
+
+
+def _trace_size(result: Any) -> Dict[str, Optional[int]]:
+    """Số bước trace và kích thước JSON của kết quả"""
+    if not isinstance(result, (BaseModel, dict)):
+        return {"steps": None, "bytes": None}
+    if isinstance(result, BaseModel):
+        steps = getattr(result, "steps", None)
+        payload = result.model_dump_json().encode()
+    else:
+        steps = result.get("steps") if isinstance(result, dict) else None
+        payload = json.dumps(result, default=lambda o: o.model_dump() if isinstance(o, BaseModel) else str(o)).encode()
+    return {"steps": len(steps) if steps is not None else None, "bytes": len(payload)}
+
+
+def _measure(fn: Callable[..., Any], repeat: int,
+             setup: Callable[[], Tuple] = tuple) -> Dict[str, Any]:
+    """
+    Chạy fn: trung vị thời gian, bộ nhớ đỉnh, kích thước trace
+
+    Tham số:
+        fn: Hàm được đo, nhận các đối số do setup trả về
+        setup: Chạy trước mỗi lần gọi fn, không tính vào thời gian/bộ nhớ
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        args = setup()
+        gc.collect()
+        started = time.perf_counter()
+        result = fn(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+    if result is None:
+        raise RuntimeError("not implemented (returned None)")
+
+    args = setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "status": "ok",
+        "time_ms": round(statistics.median(timings), 3),
+        "peak_kb": round(peak / 1024, 1),
+        **_trace_size(result)
+    }
+
+
+def run(generators: List[str], sizes: List[int], cases: List[str],
+        repeat: int, seed: int) -> List[Dict[str, Any]]:
+    """Chạy toàn bộ ma trận (generator × size × case), trả về danh sách kết quả"""
+    results = []
+    for gen_name in generators:
+        for size in sizes:
+            graph = GENERATORS[gen_name](size, seed)
+            algo = GraphAlgorithms(graph)
+            shape = {"generator": gen_name, "size": size,
+                     "nodes": len(graph.nodes), "edges": len(graph.edges)}
+
+            for case in cases:
+                record = {**shape, "case": case}
+                limit = SLOW_CASES.get(case)
+                if limit is not None and len(graph.nodes) > limit:
+                    record.update(status="skipped", error=f"graph larger than {limit} nodes")
+                    results.append(record)
+                    _print_record(record)
+                    continue
+                try:
+                    if case == OSM_CASE:
+                        osm_data = osm_elements(graph)
+                        record.update(_measure(lambda: osm_fetcher._parse_osm_to_graph(osm_data), repeat))
+                    else:
+                        setup = SETUPS.get(case)
+                        record.update(_measure(
+                            CASES[case], repeat,
+                            (lambda: setup(graph, algo)) if setup else (lambda: (graph, algo))
+                        ))
+                except Exception as e:
+                    record.update(status="error", error=str(e) or type(e).__name__)
+                results.append(record)
+                _print_record(record)
+    return results
+
+
+def _key(record: Dict[str, Any]) -> str:
+    return f"{record['generator']}/{record['size']}/{record['case']}"
+
+
+def _print_record(record: Dict[str, Any]) -> None:
+    if record["status"] != "ok":
+        print(f"{_key(record):<40} {record['status']:>8}  {record.get('error', '')}")
+        return
+    steps = "-" if record["steps"] is None else record["steps"]
+    print(f"{_key(record):<40} {record['time_ms']:>10.2f} ms {record['peak_kb']:>10.1f} KB "
+          f"steps={steps} bytes={record['bytes']}")
+
+
+def save_baseline(name: str, results: List[Dict[str, Any]]) -> Path:
+    """Lưu kết quả làm baseline"""
+    BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+    path = BASELINE_DIR / f"{name}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"created_at": time.time(), "results": results}, f, indent=2)
+    return path
+
+
+def compare(name: str, results: List[Dict[str, Any]], threshold: float) -> int:
+    """So sánh với baseline; trả về số case bị regression"""
+    with open(BASELINE_DIR / f"{name}.json", "r", encoding="utf-8") as f:
+        baseline = {_key(r): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    print(f"\n{'case':<40} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for record in results:
+        old = baseline.get(_key(record))
+        if not old or old.get("status") != "ok" or record["status"] != "ok":
+            continue
+        ratio = record["time_ms"] / old["time_ms"] if old["time_ms"] else float("inf")
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{_key(record):<40} {old['time_ms']:>10.2f} {record['time_ms']:>10.2f} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark graph algorithms")
+    parser.add_argument("--generators", nargs="+", default=list(GENERATORS), choices=list(GENERATORS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 2500, 10000])
+    parser.add_argument("--cases", nargs="+", default=list(CASES) + [OSM_CASE],
+                        choices=list(CASES) + [OSM_CASE])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save-baseline", metavar="NAME")
+    parser.add_argument("--compare", metavar="NAME")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Tỉ lệ thời gian so với baseline bị coi là regression")
+    args = parser.parse_args()
+
+    results = run(args.generators, args.sizes, args.cases, args.repeat, args.seed)
+    if args.save_baseline:
+        print(f"\nBaseline saved: {save_baseline(args.save_baseline, results)}")
+    if args.compare:
+        regressions = compare(args.compare, results, args.threshold)
+        if regressions:
+            raise SystemExit(f"{regressions} regression(s) over x{args.threshold}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+FILE: benchmarks/bench_landmarks.py
+MÔ TẢ: Benchmark ALT - thời gian tiền xử lý mốc và mức thu hẹp không gian tìm kiếm
+
+CHỨC NĂNG:
+    - Tiền xử lý: thời gian chọn mốc + tính bảng, kích thước bảng (byte)
+      cho từng chiến lược ("avoid", "farthest") và số mốc
+    - Truy vấn: với các cặp (nguồn, đích) ngẫu nhiên có seed, so sánh
+      Dijkstra và A* ALT về số đỉnh đã chốt và thời gian
+    - Kiểm tra chéo: khoảng cách ALT phải bằng Dijkstra (báo MISMATCH nếu lệch)
+
+CÁCH CHẠY (từ thư mục backend/):
+    python -m benchmarks.bench_landmarks
+    python -m benchmarks.bench_landmarks --generators road --sizes 10000 --landmarks 4 8 16
+    python -m benchmarks.bench_landmarks --queries 200 --output alt.json
+
+CÁCH HOẠT ĐỘNG:
+    1. Sinh đồ thị cho mỗi (generator, size) từ benchmarks/generators.py
+    2. Mỗi (strategy, k): dựng bảng mốc (persist=False), chạy cùng bộ truy vấn
+       bằng Dijkstra (không dùng lại cây cũ) và ALT
+    3. reduction = tổng số đỉnh chốt Dijkstra / tổng số đỉnh chốt ALT
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+
+from algorithms import GraphAlgorithms
+from algorithms.landmarks import STRATEGIES
+from algorithms.shortest_path import shortest_path_trees
+
+from benchmarks.generators import GENERATORS
+
+
+def _queries(algo: GraphAlgorithms, count: int, seed: int) -> List[tuple]:
+    rng = random.Random(seed)
+    nodes = [node.id for node in algo.graph_data.nodes]
+    return [(rng.choice(nodes), rng.choice(nodes)) for _ in range(count)]
+
+
+def _run_queries(algo: GraphAlgorithms, queries: List[tuple], method: str) -> Dict[str, Any]:
+    settled, timings, distances = [], [], []
+    for source, target in queries:
+        shortest_path_trees.clear()  # Dijkstra luôn chạy từ đầu → so sánh công bằng
+        started = time.perf_counter()
+        result = algo.shortest_path(source, target, method).result
+        timings.append((time.perf_counter() - started) * 1000)
+        settled.append(result["settled_nodes"])
+        distances.append(result["distance"])
+    return {"settled": settled, "timings": timings, "distances": distances}
+
+
+def run(generators: List[str], sizes: List[int], strategies: List[str], landmark_counts: List[int],
+        queries: int, seed: int) -> List[Dict[str, Any]]:
+    results = []
+    for gen_name in generators:
+        for size in sizes:
+            graph = GENERATORS[gen_name](size, seed)
+            algo = GraphAlgorithms(graph)
+            pairs = _queries(algo, queries, seed)
+            baseline = _run_queries(algo, pairs, "dijkstra")
+            for strategy in strategies:
+                for k in landmark_counts:
+                    started = time.perf_counter()
+                    table = algo.precompute_landmarks(k, strategy, persist=False)
+                    build_ms = (time.perf_counter() - started) * 1000
+                    alt = _run_queries(algo, pairs, "alt")
+                    mismatches = sum(
+                        1 for a, b in zip(alt["distances"], baseline["distances"])
+                        if (a is None) != (b is None) or (a is not None and abs(a - b) > 1e-6)
+                    )
+                    record = {
+                        "generator": gen_name, "size": size,
+                        "nodes": len(graph.nodes), "edges": len(graph.edges),
+                        "strategy": strategy, "landmarks": k,
+                        "build_ms": round(build_ms, 3), "table_bytes": table.nbytes,
+                        "dijkstra_settled": round(statistics.mean(baseline["settled"]), 1),
+                        "alt_settled": round(statistics.mean(alt["settled"]), 1),
+                        "reduction": round(sum(baseline["settled"]) / max(sum(alt["settled"]), 1), 2),
+                        "dijkstra_ms": round(statistics.median(baseline["timings"]), 3),
+                        "alt_ms": round(statistics.median(alt["timings"]), 3),
+                        "mismatches": mismatches,
+                    }
+                    results.append(record)
+                    _print_record(record)
+    return results
+
+
+def _print_record(record: Dict[str, Any]) -> None:
+    key = f"{record['generator']}/{record['size']}/{record['strategy']}/k={record['landmarks']}"
+    flag = f"  MISMATCH x{record['mismatches']}" if record["mismatches"] else ""
+    print(f"{key:<32} build {record['build_ms']:>9.1f} ms {record['table_bytes'] / 1024:>8.1f} KB | "
+          f"settled {record['dijkstra_settled']:>9.1f} → {record['alt_settled']:>8.1f} "
+          f"(x{record['reduction']:.2f}) | {record['dijkstra_ms']:.2f} → {record['alt_ms']:.2f} ms{flag}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ALT landmark preprocessing")
+    parser.add_argument("--generators", nargs="+", default=["road", "grid"], choices=list(GENERATORS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2500, 10000])
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGIES), choices=list(STRATEGIES))
+    parser.add_argument("--landmarks", type=int, nargs="+", default=[8])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", metavar="FILE", help="Lưu kết quả JSON")
+    args = parser.parse_args()
+
+    results = run(args.generators, args.sizes, args.strategies, args.landmarks, args.queries, args.seed)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"created_at": time.time(), "results": results}, f, indent=2)
+        print(f"\nSaved: {args.output}")
+    if any(record["mismatches"] for record in results):
+        raise SystemExit("ALT distances differ from Dijkstra")
+
+
+if __name__ == "__main__":
+    main()
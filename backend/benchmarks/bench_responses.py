@@ -0,0 +1,119 @@
+"""
+FILE: benchmarks/bench_responses.py
+MÔ TẢ: Benchmark thời gian response end-to-end theo kích thước đồ thị
+
+CHỨC NĂNG:
+    - So sánh đường serialize mặc định của FastAPI với fast response mode
+    - Đo cho AlgorithmResponse (nhiều AlgorithmStep) và LoadGraphResponse (nhiều Edge)
+    - Các chế độ: default, fast JSON, fast msgpack, fast + gzip, fast + zstd
+
+CÁCH CHẠY (từ thư mục backend/):
+    python -m benchmarks.bench_responses
+    python -m benchmarks.bench_responses --sizes 1000 10000 --repeat 5
+
+CÁCH HOẠT ĐỘNG:
+    1. Dựng sẵn payload hợp lệ (không tính thời gian chạy thuật toán)
+    2. Gắn tạm route /bench/... vào app, route trả payload qua respond()
+    3. Gửi request qua TestClient (đi hết ASGI stack) và lấy trung vị thời gian
+"""
+import argparse
+import statistics
+import time
+
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+from main import app
+from fast_response import respond, msgpack, zstandard
+from models import (
+    AlgorithmResponse, AlgorithmStep, LoadGraphResponse, GraphData, Node, Edge
+)
+
+MODES = {
+    "default": {},
+    "fast-json": {"X-Response-Mode": "fast", "Accept-Encoding": "identity"},
+    "fast-msgpack": {"Accept": "application/msgpack", "Accept-Encoding": "identity"},
+    "fast-gzip": {"X-Response-Mode": "fast", "Accept-Encoding": "gzip"},
+    "fast-zstd": {"X-Response-Mode": "fast", "Accept-Encoding": "zstd"},
+}
+
+
+def make_steps_response(size: int) -> AlgorithmResponse:
+    """AlgorithmResponse giống kết quả BFS với `size` bước"""
+    steps = [
+        AlgorithmStep(
+            step=i,
+            action="visit",
+            node=str(i),
+            visited=[str(j) for j in range(max(0, i - 8), i + 1)],
+            queue=[str(i + 1), str(i + 2)],
+            description=f"Visit node {i}"
+        )
+        for i in range(size)
+    ]
+    return AlgorithmResponse(
+        success=True, algorithm="bfs", steps=steps,
+        result={"order": [str(i) for i in range(size)]}
+    )
+
+
+def make_graph_response(size: int) -> LoadGraphResponse:
+    """LoadGraphResponse với `size` đỉnh và khoảng 2*size cạnh"""
+    nodes = [Node(id=str(i), lat=10.8 + i * 1e-5, lon=106.7 + i * 1e-5) for i in range(size)]
+    edges = []
+    for i in range(size):
+        for j in (i + 1, i + 7):
+            if j < size:
+                edges.append(Edge(source=str(i), target=str(j), weight=float(j - i)))
+    return LoadGraphResponse(success=True, graph=GraphData(nodes=nodes, edges=edges))
+
+
+def _register_routes(payloads: dict) -> None:
+    """Gắn route trả payload dựng sẵn, đi qua respond() như endpoint thật"""
+    @app.get("/bench/steps/{size}")
+    async def bench_steps(size: int, http_request: Request) -> AlgorithmResponse:
+        return respond(http_request, payloads[("steps", size)])
+
+    @app.get("/bench/graph/{size}")
+    async def bench_graph(size: int, http_request: Request) -> LoadGraphResponse:
+        return respond(http_request, payloads[("graph", size)])
+
+
+def run(sizes, repeat: int) -> None:
+    payloads = {}
+    for size in sizes:
+        payloads[("steps", size)] = make_steps_response(size)
+        payloads[("graph", size)] = make_graph_response(size)
+    _register_routes(payloads)
+
+    client = TestClient(app)
+    modes = dict(MODES)
+    if msgpack is None:
+        modes.pop("fast-msgpack")
+    if zstandard is None:
+        modes.pop("fast-zstd")
+
+    print(f"{'payload':<8} {'size':>8} {'mode':<14} {'median ms':>10} {'bytes':>12}")
+    for kind in ("steps", "graph"):
+        for size in sizes:
+            for mode, headers in modes.items():
+                timings = []
+                body_size = 0
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    response = client.get(f"/bench/{kind}/{size}", headers=headers)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    body_size = int(response.headers.get("content-length", len(response.content)))
+                print(f"{kind:<8} {size:>8} {mode:<14} {statistics.median(timings):>10.2f} {body_size:>12}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark response serialization")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+FILE: benchmarks/generators.py
+MÔ TẢ: Sinh đồ thị tổng hợp có seed cho benchmark
+
+CHỨC NĂNG:
+    - grid_graph: lưới rows×cols (giống khu phố ô bàn cờ)
+    - road_network: đồ thị hình học ngẫu nhiên giống mạng đường OSM
+      (điểm rải trong bbox Bình Thạnh, nối k láng giềng gần nhất)
+    - scaled_sample: ghép nhiều bản sao đồ thị mẫu 16 đỉnh thành lưới lớn
+    - osm_elements: dựng JSON kiểu Overpass từ một đồ thị (để đo parser OSM)
+
+CÁCH HOẠT ĐỘNG:
+    - Mọi generator nhận `seed` → cùng tham số luôn cho cùng đồ thị
+    - Trọng số là khoảng cách Haversine (mét), capacity là số nguyên 1..20
+    - Dựng bằng trusted_node/trusted_edge (không tốn thời gian validate)
+"""
+import math
+import random
+from typing import Dict, List, Tuple
+
+from map_data import BINH_THANH_BBOX, osm_fetcher
+from models import GraphData, Node, Edge, trusted_node, trusted_edge, trusted_graph
+
+_distance = osm_fetcher._calculate_distance
+
+
+def _edge(rng: random.Random, a: Node, b: Node) -> Edge:
+    weight = round(_distance(a.lat, a.lon, b.lat, b.lon), 2)
+    return trusted_edge(a.id, b.id, weight, capacity=float(rng.randint(1, 20)))
+
+
+def grid_graph(rows: int, cols: int, seed: int = 0, spacing: float = 0.0005) -> GraphData:
+    """Lưới rows×cols, mỗi ô cách nhau `spacing` độ, tọa độ có nhiễu nhỏ"""
+    rng = random.Random(seed)
+    south, west = BINH_THANH_BBOX["south"], BINH_THANH_BBOX["west"]
+    nodes = [
+        trusted_node(
+            f"g{r}_{c}",
+            south + r * spacing + rng.uniform(-0.1, 0.1) * spacing,
+            west + c * spacing + rng.uniform(-0.1, 0.1) * spacing
+        )
+        for r in range(rows) for c in range(cols)
+    ]
+    edges = []
+    for r in range(rows):
+        for c in range(cols):
+            node = nodes[r * cols + c]
+            if c + 1 < cols:
+                edges.append(_edge(rng, node, nodes[r * cols + c + 1]))
+            if r + 1 < rows:
+                edges.append(_edge(rng, node, nodes[(r + 1) * cols + c]))
+    return trusted_graph(nodes, edges, metadata={"generator": "grid", "seed": seed})
+
+
+def road_network(n: int, seed: int = 0, k: int = 3) -> GraphData:
+    """
+    Đồ thị hình học ngẫu nhiên giống mạng đường: n điểm trong bbox,
+    mỗi điểm nối tới k điểm gần nhất (tra theo ô lưới, gần O(n))
+    """
+    rng = random.Random(seed)
+    bbox = BINH_THANH_BBOX
+    # Mở rộng bbox theo căn bậc hai của n để mật độ giống khu đô thị thật
+    scale = max(1.0, math.sqrt(n / 400))
+    lat_span = (bbox["north"] - bbox["south"]) * scale
+    lon_span = (bbox["east"] - bbox["west"]) * scale
+    nodes = [
+        trusted_node(
+            f"r{i}",
+            bbox["south"] + rng.random() * lat_span,
+            bbox["west"] + rng.random() * lon_span
+        )
+        for i in range(n)
+    ]
+
+    cells_per_side = max(1, int(math.sqrt(n / 2)))
+    cell_lat = lat_span / cells_per_side
+    cell_lon = lon_span / cells_per_side
+    buckets: Dict[Tuple[int, int], List[int]] = {}
+
+    def cell_of(node: Node) -> Tuple[int, int]:
+        return (int((node.lat - bbox["south"]) / cell_lat), int((node.lon - bbox["west"]) / cell_lon))
+
+    for i, node in enumerate(nodes):
+        buckets.setdefault(cell_of(node), []).append(i)
+
+    seen = set()
+    edges = []
+    for i, node in enumerate(nodes):
+        cr, cc = cell_of(node)
+        candidates = []
+        radius = 1
+        while len(candidates) <= k and radius <= cells_per_side:
+            candidates = [
+                j for dr in range(-radius, radius + 1) for dc in range(-radius, radius + 1)
+                for j in buckets.get((cr + dr, cc + dc), ()) if j != i
+            ]
+            radius += 1
+        candidates.sort(key=lambda j: (nodes[j].lat - node.lat) ** 2 + (nodes[j].lon - node.lon) ** 2)
+        for j in candidates[:k]:
+            key = (i, j) if i < j else (j, i)
+            if key not in seen:
+                seen.add(key)
+                edges.append(_edge(rng, node, nodes[j]))
+    return trusted_graph(nodes, edges, metadata={"generator": "road_network", "seed": seed})
+
+
+def scaled_sample(factor: int, seed: int = 0) -> GraphData:
+    """
+    Ghép factor×factor bản sao đồ thị mẫu Bình Thạnh (16 đỉnh, 24 cạnh)
+    thành một lưới lớn; các bản sao kề nhau nối ở biên
+    """
+    rng = random.Random(seed)
+    sample = osm_fetcher._create_sample_graph()
+    lat_span = BINH_THANH_BBOX["north"] - BINH_THANH_BBOX["south"]
+    lon_span = BINH_THANH_BBOX["east"] - BINH_THANH_BBOX["west"]
+    size = 4  # Đồ thị mẫu là lưới 4×4
+
+    nodes: List[Node] = []
+    edges: List[Edge] = []
+    by_id: Dict[str, Node] = {}
+    for tr in range(factor):
+        for tc in range(factor):
+            prefix = f"t{tr}_{tc}_"
+            for node in sample.nodes:
+                copy = trusted_node(prefix + node.id, node.lat + tr * lat_span,
+                                    node.lon + tc * lon_span, node.label)
+                nodes.append(copy)
+                by_id[copy.id] = copy
+            for edge in sample.edges:
+                edges.append(trusted_edge(prefix + edge.source, prefix + edge.target, edge.weight,
+                                          capacity=float(rng.randint(1, 20))))
+            # Nối với bản sao bên phải và bên trên qua các đỉnh biên
+            for i in range(size):
+                if tc + 1 < factor:
+                    a = by_id[f"{prefix}N{i * size + size}"]
+                    b_id = f"t{tr}_{tc + 1}_N{i * size + 1}"
+                    edges.append((a, b_id))
+                if tr + 1 < factor:
+                    a = by_id[f"{prefix}N{(size - 1) * size + i + 1}"]
+                    b_id = f"t{tr + 1}_{tc}_N{i + 1}"
+                    edges.append((a, b_id))
+    resolved = [
+        edge if isinstance(edge, Edge) else _edge(rng, edge[0], by_id[edge[1]])
+        for edge in edges
+    ]
+    return trusted_graph(nodes, resolved, metadata={"generator": "scaled_sample", "factor": factor})
+
+
+def osm_elements(graph: GraphData, way_length: int = 8) -> Dict:
+    """
+    Dựng JSON kiểu Overpass từ đồ thị: mỗi cạnh thành một way có các điểm
+    trung gian (giống dữ liệu thật, nơi đường gồm nhiều node hình học)
+    """
+    elements = []
+    index = {}
+    for i, node in enumerate(graph.nodes):
+        index[node.id] = i + 1
+        elements.append({"type": "node", "id": i + 1, "lat": node.lat, "lon": node.lon})
+    next_id = len(graph.nodes) + 1
+    for w, edge in enumerate(graph.edges):
+        a = graph.nodes[index[edge.source] - 1]
+        b = graph.nodes[index[edge.target] - 1]
+        refs = [index[edge.source]]
+        for step in range(1, way_length):
+            t = step / way_length
+            elements.append({
+                "type": "node", "id": next_id,
+                "lat": a.lat + (b.lat - a.lat) * t, "lon": a.lon + (b.lon - a.lon) * t
+            })
+            refs.append(next_id)
+            next_id += 1
+        refs.append(index[edge.target])
+        elements.append({"type": "way", "id": w + 1, "nodes": refs, "tags": {"highway": "primary"}})
+    return {"elements": elements}
+
+
+GENERATORS = {
+    "grid": lambda size, seed: grid_graph(int(math.sqrt(size)), int(math.sqrt(size)), seed),
+    "road": lambda size, seed: road_network(size, seed),
+    "sample": lambda size, seed: scaled_sample(max(1, int(math.sqrt(size / 16))), seed),
+}
@@ -0,0 +1,268 @@
+"""
+FILE: benchmarks/load_test.py
+MÔ TẢ: Load test HTTP end-to-end cho FastAPI app
+
+CHỨC NĂNG:
+    - Chạy in-process (ASGI, không cần server) hoặc bắn vào server đang chạy
+    - Hỗn hợp request thực tế: thuật toán, chuyển đổi, chỉnh sửa đồ thị, map-data
+    - Nhiều kích thước đồ thị trong cùng một lần chạy
+    - Đo throughput (req/s), latency p50/p95/p99 theo từng endpoint
+    - Xuất báo cáo JSON để so sánh giữa các lần chạy / cấu hình worker
+
+CÁCH CHẠY (từ thư mục backend/):
+    # In-process, 8 client đồng thời trong 20 giây
+    python -m benchmarks.load_test --concurrency 8 --duration 20
+
+    # Server thật (vd: uvicorn main:app --workers 4)
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --label workers-4 \\
+        --output reports/workers-4.json
+
+    # So sánh với báo cáo trước
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --compare reports/workers-1.json
+
+CÁCH HOẠT ĐỘNG:
+    1. Sinh đồ thị road_network cho mỗi kích thước, encode sẵn body JSON
+    2. `concurrency` client chạy song song (asyncio), mỗi client chọn
+       kịch bản theo trọng số trong MIX và gửi request liên tục
+    3. Ghi latency từng request, mã HTTP, lỗi ứng dụng (success=false)
+    4. Tổng hợp theo endpoint và toàn cục → in bảng + lưu JSON
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.generators import road_network
+
+# (tên kịch bản, trọng số) - phản ánh tỉ lệ sử dụng thực tế của frontend
+MIX: List[Tuple[str, int]] = [
+    ("shortest_path", 30),
+    ("bfs", 12),
+    ("dfs", 8),
+    ("check_bipartite", 4),
+    ("kruskal", 4),
+    ("convert_adjacency_list", 8),
+    ("validate_graph", 4),
+    ("add_edge", 12),
+    ("delete_edge", 6),
+    ("delete_node", 4),
+    ("map_data", 8),
+]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentile theo nội suy tuyến tính trên danh sách đã sắp xếp"""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class Scenario:
+    """Dựng request (method, path, body) cho các kịch bản trên một đồ thị"""
+
+    def __init__(self, size: int, seed: int):
+        graph = road_network(size, seed)
+        self.size = size
+        # JSON đồ thị encode một lần, mỗi request chỉ ghép thêm vài trường nhỏ
+        self.graph_json = json.dumps(graph.model_dump(mode="json"), separators=(",", ":")).encode()
+        self.node_ids = [node.id for node in graph.nodes]
+        self.edges = [(edge.source, edge.target) for edge in graph.edges]
+
+    def build(self, name: str, rng: random.Random) -> Tuple[str, str, Optional[bytes]]:
+        a, b = rng.sample(self.node_ids, 2)
+        if name == "map_data":
+            return "GET", "/api/map-data?major_roads_only=true", None
+        if name in ("shortest_path", "bfs", "dfs", "check_bipartite"):
+            path = {"shortest_path": "shortest-path", "check_bipartite": "check-bipartite"}.get(name, name)
+            algorithm = "bipartite" if name == "check_bipartite" else name
+            body = {"algorithm": algorithm, "start_node": a, "end_node": b}
+            return "POST", f"/api/{path}", self._with_graph(body)
+        if name == "kruskal":
+            return "POST", "/api/kruskal", self._with_graph({"algorithm": "kruskal"})
+        if name == "convert_adjacency_list":
+            body = {"from_format": "graph", "to_format": "adjacency_list"}
+            return "POST", "/api/convert-representation", self._with_graph(body)
+        if name == "validate_graph":
+            return "POST", "/api/validate-graph", self.graph_json
+        if name == "add_edge":
+            body = {"source": a, "target": b, "weight": round(rng.uniform(10, 500), 2)}
+            return "POST", "/api/add-edge", self._with_graph(body)
+        if name == "delete_edge":
+            source, target = rng.choice(self.edges)
+            return "POST", "/api/delete-edge", self._with_graph({"source": source, "target": target})
+        if name == "delete_node":
+            return "POST", "/api/delete-node", self._with_graph({"node_id": a})
+        raise ValueError(f"Unknown scenario: {name}")
+
+    def _with_graph(self, fields: Dict[str, Any]) -> bytes:
+        """Ghép JSON đồ thị đã encode sẵn với các trường còn lại"""
+        rest = json.dumps(fields, separators=(",", ":"))[1:-1].encode()
+        return b'{"graph":' + self.graph_json + b"," + rest + b"}"
+
+
+class LoadTest:
+    """Chạy load test và tổng hợp kết quả"""
+
+    def __init__(self, client: httpx.AsyncClient, scenarios: List[Scenario],
+                 concurrency: int, duration: float, max_requests: Optional[int], seed: int):
+        self.client = client
+        self.scenarios = scenarios
+        self.concurrency = concurrency
+        self.duration = duration
+        self.max_requests = max_requests
+        self.seed = seed
+        self.samples: List[Dict[str, Any]] = []
+        self._issued = 0
+
+    async def _worker(self, worker_id: int, deadline: float) -> None:
+        rng = random.Random(self.seed * 1000 + worker_id)
+        names = [name for name, _ in MIX]
+        weights = [weight for _, weight in MIX]
+        while time.perf_counter() < deadline:
+            if self.max_requests is not None:
+                if self._issued >= self.max_requests:
+                    return
+                self._issued += 1
+            scenario = rng.choice(self.scenarios)
+            name = rng.choices(names, weights)[0]
+            method, path, body = scenario.build(name, rng)
+            headers = {"Content-Type": "application/json"} if body else None
+            started = time.perf_counter()
+            status, app_error = 0, False
+            try:
+                response = await self.client.request(method, path, content=body, headers=headers)
+                status = response.status_code
+                if status == 200 and response.headers.get("content-type", "").startswith("application/json"):
+                    payload = response.json()
+                    app_error = isinstance(payload, dict) and payload.get("success") is False
+            except httpx.HTTPError:
+                status = -1
+            self.samples.append({
+                "scenario": name, "size": scenario.size, "status": status, "app_error": app_error,
+                "latency_ms": (time.perf_counter() - started) * 1000
+            })
+
+    async def run(self) -> float:
+        started = time.perf_counter()
+        deadline = started + self.duration
+        await asyncio.gather(*(self._worker(i, deadline) for i in range(self.concurrency)))
+        return time.perf_counter() - started
+
+
+def summarize(samples: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    """Tổng hợp latency/throughput toàn cục và theo (kịch bản, kích thước)"""
+    def stats(group: List[Dict[str, Any]]) -> Dict[str, Any]:
+        latencies = sorted(s["latency_ms"] for s in group)
+        return {
+            "count": len(group),
+            "throughput_rps": round(len(group) / elapsed, 2) if elapsed else 0.0,
+            "http_errors": sum(1 for s in group if s["status"] != 200),
+            "app_errors": sum(1 for s in group if s["app_error"]),
+            "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+            "p50_ms": round(_percentile(latencies, 50), 2),
+            "p95_ms": round(_percentile(latencies, 95), 2),
+            "p99_ms": round(_percentile(latencies, 99), 2),
+            "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        }
+
+    groups: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for sample in samples:
+        groups[f"{sample['scenario']}@{sample['size']}"].append(sample)
+    return {
+        "overall": stats(samples),
+        "by_scenario": {key: stats(group) for key, group in sorted(groups.items())},
+    }
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    header = f"{'scenario@size':<32} {'count':>6} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}"
+    print(header)
+    print("-" * len(header))
+    rows = list(summary["by_scenario"].items()) + [("OVERALL", summary["overall"])]
+    for key, s in rows:
+        errors = s["http_errors"] + s["app_errors"]
+        print(f"{key:<32} {s['count']:>6} {s['throughput_rps']:>8.1f} {s['p50_ms']:>8.1f} "
+              f"{s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} {errors:>5}")
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]) -> None:
+    """In chênh lệch throughput và p95 so với báo cáo trước"""
+    print(f"\nSo sánh với '{previous['config'].get('label')}':")
+    print(f"{'scenario@size':<32} {'rps old':>9} {'rps new':>9} {'p95 old':>9} {'p95 new':>9}")
+    old_rows = dict(previous["summary"]["by_scenario"], OVERALL=previous["summary"]["overall"])
+    new_rows = dict(current["summary"]["by_scenario"], OVERALL=current["summary"]["overall"])
+    for key, new in new_rows.items():
+        old = old_rows.get(key)
+        if old is None:
+            continue
+        print(f"{key:<32} {old['throughput_rps']:>9.1f} {new['throughput_rps']:>9.1f} "
+              f"{old['p95_ms']:>9.1f} {new['p95_ms']:>9.1f}")
+
+
+async def _main(args) -> Dict[str, Any]:
+    scenarios = [Scenario(size, args.seed) for size in args.sizes]
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    else:
+        from main import app
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app, raise_app_exceptions=False), base_url="http://loadtest", timeout=args.timeout
+        )
+    async with client:
+        test = LoadTest(client, scenarios, args.concurrency, args.duration, args.requests, args.seed)
+        elapsed = await test.run()
+
+    return {
+        "config": {
+            "label": args.label,
+            "target": args.url or "in-process",
+            "concurrency": args.concurrency,
+            "duration_s": round(elapsed, 3),
+            "sizes": args.sizes,
+            "seed": args.seed,
+            "mix": dict(MIX),
+            "python": platform.python_version(),
+            "created_at": time.time(),
+        },
+        "summary": summarize(test.samples, elapsed),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HTTP load test for the graph API")
+    parser.add_argument("--url", help="Base URL của server; bỏ trống để chạy in-process")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="Giây")
+    parser.add_argument("--requests", type=int, help="Giới hạn tổng số request")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--label", default="default", help="Tên cấu hình (vd: workers-4)")
+    parser.add_argument("--output", help="Đường dẫn lưu báo cáo JSON")
+    parser.add_argument("--compare", help="Báo cáo JSON trước đó để so sánh")
+    args = parser.parse_args()
+
+    report = asyncio.run(_main(args))
+    print_summary(report["summary"])
+    if args.output:
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nReport saved: {path}")
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text(encoding="utf-8")), report)
+
+
+if __name__ == "__main__":
+    main()
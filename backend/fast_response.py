@@ -0,0 +1,181 @@
+"""
+FILE: fast_response.py
+MÔ TẢ: Fast Response Mode - Serialize kết quả đã validate thẳng ra bytes
+
+CHỨC NĂNG:
+    - Bỏ qua bước validate lại response_model của FastAPI
+      (model → dict → validate → jsonable_encoder → JSON)
+    - Serialize trực tiếp bằng pydantic-core / orjson / msgpack
+    - Content negotiation theo header Accept (JSON hoặc MessagePack)
+    - Nén gzip/zstd theo Accept-Encoding cho payload lớn (tôn trọng q-value:
+      "gzip;q=0" nghĩa là KHÔNG nhận gzip; "*" áp cho mã hóa không được nêu)
+
+CÁCH BẬT (opt-in):
+    - Header "X-Response-Mode: fast" trên từng request, hoặc
+    - Header "Accept: application/msgpack" (ngầm bật fast mode), hoặc
+    - Biến môi trường GRAPH_API_FAST_RESPONSE=1 (bật cho mọi request)
+
+CÁCH HOẠT ĐỘNG:
+    1. Endpoint tính kết quả (Pydantic model đã được tạo hợp lệ)
+    2. respond(request, result):
+        - Không bật fast mode → trả model, FastAPI xử lý như cũ
+        - Bật fast mode → encode thành bytes, nén nếu cần, trả Response
+    3. Thư viện tùy chọn: orjson, msgpack, zstandard
+       Thiếu thư viện nào thì bỏ qua tính năng đó (không lỗi)
+"""
+import gzip
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - thư viện tùy chọn
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - thư viện tùy chọn
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - thư viện tùy chọn
+    zstandard = None
+
+# Chỉ nén payload lớn hơn ngưỡng này (bytes)
+COMPRESSION_THRESHOLD = int(os.environ.get("GRAPH_API_COMPRESSION_THRESHOLD", 32 * 1024))
+GZIP_LEVEL = 5
+ZSTD_LEVEL = 3
+
+FAST_MODE_ENV = os.environ.get("GRAPH_API_FAST_RESPONSE", "").lower() in ("1", "true", "yes")
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def wants_fast_response(request: Request) -> bool:
+    """Kiểm tra request có yêu cầu fast response mode không"""
+    if FAST_MODE_ENV:
+        return True
+    if request.headers.get("x-response-mode", "").lower() == "fast":
+        return True
+    return _accepts_msgpack(request)
+
+
+def _accepts_msgpack(request: Request) -> bool:
+    accept = request.headers.get("accept", "").lower()
+    return msgpack is not None and any(media in accept for media in MSGPACK_MEDIA_TYPES)
+
+
+def encode_json(payload: Any) -> bytes:
+    """Serialize payload sang JSON bytes theo đường nhanh nhất hiện có"""
+    if isinstance(payload, BaseModel):
+        # pydantic-core serialize thẳng ra bytes, không validate lại
+        return payload.__pydantic_serializer__.to_json(payload)
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def encode_msgpack(payload: Any) -> bytes:
+    """Serialize payload sang MessagePack"""
+    if isinstance(payload, BaseModel):
+        payload = payload.model_dump(mode="json")
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def encode_body(request: Request, payload: Any) -> Tuple[bytes, str]:
+    """Chọn định dạng theo header Accept và trả về (body, media_type)"""
+    if _accepts_msgpack(request):
+        return encode_msgpack(payload), MSGPACK_MEDIA_TYPES[0]
+    return encode_json(payload), JSON_MEDIA_TYPE
+
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    """Accept-Encoding → {mã hóa: q}; q không hợp lệ coi như 0"""
+    accepted: Dict[str, float] = {}
+    for item in header.lower().split(","):
+        name, *params = [part.strip() for part in item.split(";")]
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def _choose_encoding(header: str) -> Optional[str]:
+    """Mã hóa có q cao nhất trong các mã hóa hỗ trợ (ngang nhau thì ưu tiên zstd)"""
+    accepted = _accepted_encodings(header)
+    wildcard = accepted.get("*", 0.0)
+    supported = (("zstd",) if zstandard is not None else ()) + ("gzip",)
+    best, best_q = None, 0.0
+    for name in supported:
+        q = accepted.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compress_body(request: Request, body: bytes) -> Tuple[bytes, Optional[str]]:
+    """Nén body theo Accept-Encoding nếu đủ lớn; trả về (body, content-encoding)"""
+    if len(body) < COMPRESSION_THRESHOLD:
+        return body, None
+    encoding = _choose_encoding(request.headers.get("accept-encoding", ""))
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body), "zstd"
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL), "gzip"
+    return body, None
+
+
+def fast_response(request: Request, payload: Any, status_code: int = 200) -> Response:
+    """Dựng Response từ payload đã validate, bỏ qua serialize mặc định của FastAPI"""
+    body, media_type = encode_body(request, payload)
+    body, content_encoding = compress_body(request, body)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
+
+
+def json_bytes_response(request: Request, body: bytes) -> Response:
+    """
+    Response từ JSON đã encode sẵn (vd: map-data trong shared_graphs.py)
+
+    Client yêu cầu msgpack → giải mã rồi encode lại; ngược lại trả thẳng bytes
+    """
+    if _accepts_msgpack(request):
+        return fast_response(request, json.loads(body))
+    body, content_encoding = compress_body(request, body)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+
+def respond(request: Request, payload: Any) -> Any:
+    """
+    Trả payload theo chế độ được yêu cầu
+
+    Tham số:
+        request: HTTP request hiện tại (để đọc header)
+        payload: Pydantic model hoặc dict đã hợp lệ
+
+    Trả về:
+        payload (đường mặc định) hoặc Response đã encode (fast mode)
+    """
+    if wants_fast_response(request):
+        return fast_response(request, payload)
+    return payload
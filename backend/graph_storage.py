@@ -11,47 +11,204 @@ CHỨC NĂNG:
 CÁCH HOẠT ĐỘNG:
     Lưu đồ thị:
         1. Nhận GraphData từ API
-        2. Serialize thành JSON (dùng model_dump())
-        3. Lưu vào file: saved_graphs/<name>.json
-        4. Trả về đường dẫn file
+        2. Ghi dạng luồng (format 2): dòng đầu là thông tin file + thuộc tính
+           đồ thị, sau đó MỖI ĐỈNH/CẠNH MỘT DÒNG, ghi theo khối → không dựng
+           chuỗi JSON (hay dict model_dump) của cả đồ thị trong bộ nhớ;
+           graph.metadata (có thể lớn: hình học chuỗi của đồ thị rút gọn) nằm
+           ở dòng cuối, sau các cạnh → dòng đầu luôn nhỏ
+        3. Ghi vào file tạm cùng thư mục rồi os.replace sang
+           saved_graphs/<name>.json → người đọc không bao giờ thấy file ghi dở
+        4. Trả về tên file
 
     Tải đồ thị:
         1. Nhận tên file từ API
-        2. Đọc file JSON từ saved_graphs/
-        3. Parse JSON → GraphData object
-        4. Trả về đồ thị đã tải
+        2. Format 2: đọc dòng đầu, rồi giải mã đỉnh/cạnh theo khối dòng
+           (trusted_node/trusted_edge: file do chính server ghi ra nên không
+           validate lại); file cũ (một dòng JSON) → json.load như trước
+        3. Trả về đồ thị đã tải
+
+    Bảng mốc ALT (algorithms/landmarks.py):
+        - save_landmarks / load_landmarks: bytes nhị phân theo hash nội dung đồ thị
+        - File: saved_graphs/landmarks/<hash>.alt (cũng ghi file tạm rồi os.replace)
 
     Liệt kê đồ thị:
         1. Scan thư mục saved_graphs/
         2. Lọc các file .json
-        3. Trả về danh sách tên file
+        3. Format 2 chỉ đọc dòng đầu (metadata) thay vì parse cả file
+
+ĐỒNG THỜI:
+    - Mỗi tên file một khóa: hai lần lưu cùng tên chạy lần lượt; khác tên
+      chạy song song
+    - *_async(): chạy thao tác file trong luồng (asyncio.to_thread) → endpoint
+      async không chặn event loop
+    - Nhiều tiến trình (GRAPH_API_WORKERS > 1): khóa chỉ trong một tiến trình,
+      nhưng os.replace vẫn đảm bảo file luôn nguyên vẹn (lần ghi sau cùng thắng)
 
 THƯ MỤC LƯU TRỮ:
     - Đường dẫn: backend/saved_graphs/
-    - Format: <name>.json
+    - Format: <name>.json (JSON hợp lệ, cùng cấu trúc {"name", ..., "graph": {...}})
     - Auto-create nếu chưa tồn tại
 """
+import asyncio
 import json
 import os
+import re
+import tempfile
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import List
-from models import GraphData, SaveGraphResponse, LoadGraphResponse
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional
+from models import (
+    GraphData, GraphType, SaveGraphResponse, LoadGraphResponse, trusted_edge, trusted_graph,
+    trusted_graph_from_dict, trusted_node, _gc_paused
+)
 
 # Thư mục lưu trữ đồ thị
 SAVE_DIR = "saved_graphs"
+LANDMARK_DIR = "landmarks"  # Thư mục con chứa bảng mốc ALT
+# Format file dạng luồng (một đỉnh/cạnh mỗi dòng); file cũ không có trường này
+STREAM_FORMAT = 2
+STREAM_PREFIX = '{"format": 2'
+# Số dòng ghi/giải mã mỗi lần
+CHUNK_LINES = 4096
+
+
+def _atomic_write(path: Path, write: Callable[[IO], None], binary: bool = False) -> None:
+    """Ghi vào file tạm (tên duy nhất, cùng thư mục) rồi os.replace sang path"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with (os.fdopen(fd, "wb") if binary else os.fdopen(fd, "w", encoding="utf-8")) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)  # mkstemp tạo 0600 - giữ quyền như file ghi bằng open()
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _write_lines(f: IO, rows: Iterator[Any]) -> None:
+    """Mỗi phần tử một dòng JSON, cách nhau bởi dấu phẩy, ghi theo khối"""
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    chunk: List[str] = []
+    first = True
+    for row in rows:
+        chunk.append(("\n" if first else ",\n") + dumps(row))
+        first = False
+        if len(chunk) >= CHUNK_LINES:
+            f.write("".join(chunk))
+            chunk.clear()
+    f.write("".join(chunk))
+
+
+def _write_graph(f: IO, header: Dict[str, Any], graph_data: GraphData) -> None:
+    """
+    Ghi đồ thị dạng luồng - kết quả vẫn là JSON hợp lệ:
+        {"format": 2, "name": ..., "graph": {"directed": ..., "nodes": [
+        {đỉnh},
+        ...
+        ], "edges": [
+        {cạnh},
+        ...
+        ], "metadata": {...}}}
+    """
+    graph_type = graph_data.graph_type
+    graph_meta = {
+        "directed": graph_data.directed,
+        "graph_type": graph_type.value if isinstance(graph_type, GraphType) else graph_type,
+    }
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    f.write(dumps(header)[:-1] + ', "graph": ' + dumps(graph_meta)[:-1] + ', "nodes": [')
+    _write_lines(f, (
+        {"id": n.id, "lat": n.lat, "lon": n.lon, "label": n.label} for n in graph_data.nodes
+    ))
+    f.write('\n], "edges": [')
+    _write_lines(f, (
+        {"source": e.source, "target": e.target, "weight": e.weight,
+         "directed": e.directed, "capacity": e.capacity}
+        for e in graph_data.edges
+    ))
+    f.write("\n], \"metadata\": " + dumps(graph_data.metadata) + "}}\n")
+
+
+def _read_header(f: IO) -> Dict[str, Any]:
+    """Dòng đầu của file format 2 → payload (graph chưa có nodes/edges)"""
+    line = f.readline().rstrip("\n")
+    return json.loads(line + "]}}")  # Dòng đầu kết thúc ở '"nodes": ['
+
+
+def _read_section(f: IO, closing: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+    """Các dòng đỉnh/cạnh tới dòng đóng mảng "]", giải mã theo khối; dòng đóng → closing"""
+    chunk: List[str] = []
+    for line in f:
+        if line.startswith("]"):
+            if closing is not None:
+                closing.append(line)
+            break
+        chunk.append(line)
+        if len(chunk) >= CHUNK_LINES:
+            yield from json.loads("[" + "".join(chunk).rstrip().rstrip(",") + "]")
+            chunk.clear()
+    if chunk:
+        yield from json.loads("[" + "".join(chunk).rstrip().rstrip(",") + "]")
+
+
+def _read_trailer(line: str) -> Dict[str, Any]:
+    """
+    Dòng đóng mảng cạnh → các trường còn lại của graph
+
+    '], "metadata": {...}}}' → {"metadata": {...}}; file ghi trước khi
+    metadata được tách khỏi dòng đầu kết thúc bằng ']}}' → {}
+    """
+    rest = line.strip()[1:].lstrip(" ,")
+    return json.loads("{" + rest[:-1])
+
+
+def _is_stream_file(f: IO) -> bool:
+    prefix = f.read(len(STREAM_PREFIX))
+    f.seek(0)
+    return prefix == STREAM_PREFIX
+
 
 class GraphStorage:
     """Xử lý lưu và tải đồ thị"""
     
     def __init__(self):
         """Tạo thư mục lưu trữ nếu chưa tồn tại"""
-        # TODO: Triển khai khởi tạo
-        pass
+        self.save_dir = Path(__file__).resolve().parent / SAVE_DIR
+        self.save_dir.mkdir(parents=True, exist_ok=True)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+    
+    def _path_for(self, filename: str) -> Path:
+        """Đường dẫn file trong thư mục lưu trữ (chặn path traversal)"""
+        name = os.path.basename(filename)
+        if not name.endswith(".json"):
+            name += ".json"
+        return self.save_dir / name
+    
+    def _lock_for(self, path: Path) -> threading.Lock:
+        """Khóa riêng cho từng file (tạo lười)"""
+        with self._locks_guard:
+            lock = self._locks.get(path.name)
+            if lock is None:
+                lock = self._locks[path.name] = threading.Lock()
+            return lock
+    
+    @staticmethod
+    def _safe_name(name: str) -> str:
+        """Chuẩn hóa tên đồ thị thành tên file hợp lệ"""
+        safe = re.sub(r"[^\w\-]+", "_", name.strip(), flags=re.UNICODE).strip("_")
+        return safe or "graph"
     
     def save_graph(self, name: str, graph_data: GraphData) -> SaveGraphResponse:
         """
-        Lưu đồ thị vào file
+        Lưu đồ thị vào file (ghi luồng, nguyên tử, tuần tự theo tên)
         
         Tham số:
             name: Tên cho đồ thị được lưu
@@ -60,8 +217,21 @@ class GraphStorage:
         Trả về:
             SaveGraphResponse với trạng thái thành công
         """
-        # TODO: Triển khai lưu đồ thị
-        pass
+        filename = f"{self._safe_name(name)}.json"
+        path = self._path_for(filename)
+        try:
+            header = {
+                "format": STREAM_FORMAT,
+                "name": name,
+                "saved_at": datetime.now().isoformat(),
+                "node_count": len(graph_data.nodes),
+                "edge_count": len(graph_data.edges),
+            }
+            with self._lock_for(path):
+                _atomic_write(path, lambda f: _write_graph(f, header, graph_data))
+            return SaveGraphResponse(success=True, filename=filename)
+        except Exception as e:
+            return SaveGraphResponse(success=False, filename=filename, error=str(e))
     
     def load_graph(self, filename: str) -> LoadGraphResponse:
         """
@@ -73,8 +243,72 @@ class GraphStorage:
         Trả về:
             LoadGraphResponse với dữ liệu đồ thị
         """
-        # TODO: Triển khai tải đồ thị
-        pass
+        path = self._path_for(filename)
+        if not path.exists():
+            return LoadGraphResponse(success=False, error=f"Graph not found: {filename}")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if _is_stream_file(f):
+                    graph = self._read_stream_graph(f)
+                else:
+                    graph = trusted_graph_from_dict(json.load(f)["graph"])
+            return LoadGraphResponse(success=True, graph=graph)
+        except Exception as e:
+            return LoadGraphResponse(success=False, error=str(e))
+    
+    @staticmethod
+    def _read_stream_graph(f: IO) -> GraphData:
+        """Đọc file format 2: đỉnh/cạnh giải mã theo khối, dựng model tin cậy ngay"""
+        meta = _read_header(f)["graph"]
+        with _gc_paused():
+            nodes = [
+                trusted_node(n["id"], n["lat"], n["lon"], n.get("label"))
+                for n in _read_section(f)
+            ]
+            closing: List[str] = []
+            edges = [
+                trusted_edge(e["source"], e["target"], e.get("weight", 1.0),
+                             e.get("directed", False), e.get("capacity"))
+                for e in _read_section(f, closing)
+            ]
+        if closing:
+            meta.update(_read_trailer(closing[0]))
+        return trusted_graph(
+            nodes, edges, meta.get("directed", False),
+            meta.get("graph_type", GraphType.UNDIRECTED), meta.get("metadata")
+        )
+    
+    def _landmark_path(self, content_hash: str) -> Path:
+        return self.save_dir / LANDMARK_DIR / f"{os.path.basename(content_hash)}.alt"
+    
+    def save_landmarks(self, content_hash: str, data: bytes) -> bool:
+        """
+        Lưu bảng mốc ALT (đã serialize) của đồ thị có hash nội dung content_hash
+        
+        Trả về:
+            True nếu ghi thành công
+        """
+        path = self._landmark_path(content_hash)
+        try:
+            with self._lock_for(path):
+                _atomic_write(path, lambda f: f.write(data), binary=True)
+            return True
+        except OSError:
+            return False
+    
+    def load_landmarks(self, content_hash: str) -> Optional[bytes]:
+        """Bảng mốc ALT đã lưu (None nếu chưa có)"""
+        try:
+            return self._landmark_path(content_hash).read_bytes()
+        except OSError:
+            return None
+    
+    def modified_time(self, filename: str) -> Optional[float]:
+        """Thời điểm sửa file của đồ thị đã lưu (None nếu không tồn tại)"""
+        try:
+            return self._path_for(filename).stat().st_mtime
+        except OSError:
+            return None
     
     def list_saved_graphs(self) -> List[dict]:
         """
@@ -83,8 +317,36 @@ class GraphStorage:
         Trả về:
             Danh sách metadata của các đồ thị đã lưu
         """
-        # TODO: Triển khai liệt kê đồ thị
-        pass
+        graphs = []
+        for path in sorted(self.save_dir.glob("*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    payload = _read_header(f) if _is_stream_file(f) else json.load(f)
+            except (OSError, ValueError):
+                continue
+            graphs.append({
+                "filename": path.name,
+                "name": payload.get("name", path.stem),
+                "saved_at": payload.get("saved_at"),
+                "node_count": payload.get("node_count", len(payload.get("graph", {}).get("nodes", []))),
+                "edge_count": payload.get("edge_count", len(payload.get("graph", {}).get("edges", [])))
+            })
+        graphs.sort(key=lambda g: g["saved_at"] or "", reverse=True)
+        return graphs
+    
+    # ==================== Phiên bản async (không chặn event loop) ====================
+    
+    async def save_graph_async(self, name: str, graph_data: GraphData) -> SaveGraphResponse:
+        return await asyncio.to_thread(self.save_graph, name, graph_data)
+    
+    async def load_graph_async(self, filename: str) -> LoadGraphResponse:
+        return await asyncio.to_thread(self.load_graph, filename)
+    
+    async def list_saved_graphs_async(self) -> List[dict]:
+        return await asyncio.to_thread(self.list_saved_graphs)
+    
+    async def modified_time_async(self, filename: str) -> Optional[float]:
+        return await asyncio.to_thread(self.modified_time, filename)
 
 # Singleton instance
 graph_storage = GraphStorage()
@@ -0,0 +1,228 @@
+"""
+FILE: jobs.py
+MÔ TẢ: Hàng đợi job nền cho thuật toán chạy lâu (/api/jobs)
+
+CHỨC NĂNG:
+    - Nhận một request thuật toán bất kỳ, trả job_id ngay (không giữ kết nối
+      HTTP trong lúc Fleury/max-flow chạy trên đồ thị lớn)
+    - Tiến độ: số bước thuật toán đã sinh, thời gian chờ, thời gian chạy
+    - Kết quả giữ lại sau khi xong để client lấy sau
+    - Độ ưu tiên, giới hạn số job chờ, hủy job (đang chờ hoặc đang chạy)
+    - Chạy hoàn toàn trong tiến trình: luồng worker + heap, không cần broker
+
+CÁCH HOẠT ĐỘNG:
+    1. submit(): job vào heap theo (-priority, thứ tự gửi) → ưu tiên cao chạy
+       trước, cùng ưu tiên thì FIFO; đủ MAX_QUEUED job chờ → QueueFull
+    2. Worker (luồng daemon, tạo lười) lấy job đầu heap, đặt step_listener
+       (models.py) rồi gọi runner → mỗi trusted_step() tăng steps_done
+    3. Hủy:
+        - Job đang chờ: đánh dấu "cancelled" ngay, worker bỏ qua khi lấy ra
+        - Job đang chạy: đặt cờ, step_listener ném JobCancelled ở bước kế tiếp
+    4. Job đã xong giữ trong bộ nhớ, quá RETAIN_FINISHED thì bỏ job xong sớm nhất
+
+CẤU HÌNH:
+    GRAPH_API_JOB_WORKERS     Số luồng worker (mặc định min(4, số CPU))
+    GRAPH_API_JOB_QUEUE_SIZE  Số job chờ tối đa (64)
+    GRAPH_API_JOB_RETAIN      Số job đã xong được giữ kết quả (256)
+
+LƯU Ý:
+    - Hủy job đang chạy là hợp tác: thuật toán không sinh bước (include_steps=False,
+      components, ...) chạy đến hết rồi mới dừng
+    - JobCancelled có thể ném ra ở bất kỳ trusted_step() nào: trạng thái dùng chung
+      giữa các request (DijkstraSearch trong shortest_path_trees) phải dựng bước
+      TRƯỚC khi sửa trạng thái; trạng thái cục bộ của thuật toán thì bỏ đi được
+    - Job và kết quả chỉ nằm trong bộ nhớ của tiến trình: với GRAPH_API_WORKERS > 1
+      client phải hỏi đúng worker đã nhận job (sticky session)
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from models import JobStatus, step_listener
+
+JOB_WORKERS = int(os.environ.get("GRAPH_API_JOB_WORKERS", min(4, os.cpu_count() or 1)))
+MAX_QUEUED = int(os.environ.get("GRAPH_API_JOB_QUEUE_SIZE", 64))
+RETAIN_FINISHED = int(os.environ.get("GRAPH_API_JOB_RETAIN", 256))
+# Chu kỳ gửi tiến độ của /api/jobs/{id}/events (giây)
+EVENT_INTERVAL = 0.5
+TERMINAL = ("done", "failed", "cancelled")
+
+
+class QueueFull(Exception):
+    """Hàng đợi đã có đủ MAX_QUEUED job chờ"""
+
+
+class JobCancelled(BaseException):
+    """
+    Ném từ step_listener khi job đang chạy bị hủy
+
+    BaseException: các runner trong main.py bắt Exception để trả response lỗi,
+    hủy phải đi xuyên qua chúng (giống KeyboardInterrupt)
+    """
+
+
+class Job:
+    """Một job nền: runner + trạng thái + kết quả"""
+
+    __slots__ = ("job_id", "algorithm", "priority", "run", "status", "steps_done", "submitted_at",
+                 "started_at", "finished_at", "result", "error", "cancel_requested")
+
+    def __init__(self, algorithm: str, run: Callable[[], Any], priority: int):
+        self.job_id = uuid.uuid4().hex
+        self.algorithm = algorithm
+        self.priority = priority
+        self.run: Optional[Callable[[], Any]] = run
+        self.status = "queued"
+        self.steps_done = 0
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.cancel_requested = False
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL
+
+    def on_step(self) -> None:
+        """step_listener của job: đếm bước, dừng nếu đã bị hủy"""
+        self.steps_done += 1
+        if self.cancel_requested:
+            raise JobCancelled()
+
+    def snapshot(self) -> JobStatus:
+        """Trạng thái hiện tại dạng JobStatus"""
+        end = self.finished_at or time.time()
+        started = self.started_at
+        return JobStatus(
+            job_id=self.job_id, algorithm=self.algorithm, priority=self.priority,
+            status=self.status, steps_done=self.steps_done,
+            wait_ms=round(((started or end) - self.submitted_at) * 1000, 3),
+            elapsed_ms=round((end - started) * 1000, 3) if started else 0,
+            submitted_at=self.submitted_at, started_at=started, finished_at=self.finished_at,
+            cancel_requested=self.cancel_requested, error=self.error
+        )
+
+
+class JobQueue:
+    """Hàng đợi ưu tiên có giới hạn + các luồng worker"""
+
+    def __init__(self, workers: int = JOB_WORKERS, max_queued: int = MAX_QUEUED,
+                 retain: int = RETAIN_FINISHED):
+        self.workers = max(workers, 1)
+        self.max_queued = max_queued
+        self.retain = retain
+        self._jobs: Dict[str, Job] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self._heap: List[Tuple[int, int, Job]] = []
+        self._queued = 0
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+
+    def submit(self, algorithm: str, run: Callable[[], Any], priority: int = 0) -> Job:
+        """
+        Đưa job vào hàng đợi
+
+        Tham số:
+            algorithm: Tên thuật toán (để hiển thị)
+            run: Hàm không tham số trả về response của thuật toán
+            priority: Lớn hơn chạy trước
+
+        Trả về:
+            Job vừa tạo (status "queued")
+        """
+        job = Job(algorithm, run, priority)
+        with self._cond:
+            if self._queued >= self.max_queued:
+                raise QueueFull(f"Job queue is full ({self.max_queued} jobs waiting)")
+            self._jobs[job.job_id] = job
+            heapq.heappush(self._heap, (-priority, next(self._seq), job))
+            self._queued += 1
+            self._start_workers()
+            self._cond.notify()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> List[Job]:
+        """Mọi job còn giữ, theo thứ tự gửi"""
+        with self._cond:
+            return sorted(self._jobs.values(), key=lambda job: job.submitted_at)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Hủy job (None nếu không tồn tại); job đã xong giữ nguyên"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+            if job.status == "queued":
+                # Vẫn nằm trong heap - worker bỏ qua khi lấy ra
+                self._queued -= 1
+                self._finish(job, "cancelled", None, "Job cancelled")
+            else:
+                job.cancel_requested = True
+            return job
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            running = sum(1 for job in self._jobs.values() if job.status == "running")
+            return {"queued": self._queued, "running": running, "finished": len(self._finished)}
+
+    def _finish(self, job: Job, status: str, result: Any, error: Optional[str]) -> None:
+        """Chuyển job sang trạng thái kết thúc (gọi khi đang giữ self._cond)"""
+        job.status, job.result, job.error = status, result, error
+        job.finished_at = time.time()
+        job.run = None  # Thả request (và đồ thị) của job
+        self._finished[job.job_id] = None
+        while len(self._finished) > self.retain:
+            oldest, _ = self._finished.popitem(last=False)
+            self._jobs.pop(oldest, None)
+
+    def _start_workers(self) -> None:
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"job-worker-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next(self) -> Job:
+        """Chờ và lấy job ưu tiên cao nhất còn ở trạng thái "queued" """
+        with self._cond:
+            while True:
+                while not self._heap:
+                    self._cond.wait()
+                _, _, job = heapq.heappop(self._heap)
+                if job.status == "queued":
+                    self._queued -= 1
+                    job.status = "running"
+                    job.started_at = time.time()
+                    return job
+
+    def _work(self) -> None:
+        while True:
+            job = self._next()
+            token = step_listener.set(job.on_step)
+            try:
+                result = job.run()
+                success = getattr(result, "success", True)
+                outcome = ("done" if success else "failed", result,
+                           None if success else getattr(result, "error", None))
+            except JobCancelled:
+                outcome = ("cancelled", None, "Job cancelled")
+            except Exception as e:
+                outcome = ("failed", None, str(e))
+            finally:
+                step_listener.reset(token)
+            with self._cond:
+                self._finish(job, *outcome)
+
+
+# Singleton instance
+job_queue = JobQueue()
@@ -15,12 +15,16 @@ CÁC ENDPOINTS:
     1. Tải Bản Đồ:
         GET /api/map-data
         → Tải dữ liệu đồ thị từ OpenStreetMap
+        GET /api/viewport
+        → Chỉ phần đồ thị trong khung nhìn, chi tiết theo zoom (viewport.py)
     
     2. Thuật Toán Cơ Bản (4 endpoints):
         POST /api/bfs                    # Breadth-First Search
         POST /api/dfs                    # Depth-First Search
         POST /api/shortest-path          # Dijkstra
         POST /api/check-bipartite        # Kiểm tra đồ thị 2 phần
+        POST /api/isochrone              # Vùng đến được trong bán kính (nhiều nguồn)
+        POST /api/components             # Thành phần liên thông (yếu/mạnh)
     
     3. Thuật Toán Nâng Cao (5 endpoints):
         POST /api/prim                   # Prim's MST
@@ -39,31 +43,101 @@ CÁC ENDPOINTS:
         GET  /api/load-graph/{name}      # Tải đồ thị đã lưu
         GET  /api/saved-graphs           # Liệt kê đồ thị đã lưu
         POST /api/convert-representation # Chuyển đổi biểu diễn
+        POST /api/validate-graph         # Kiểm tra cấu trúc đồ thị
+        POST /api/simplify-graph         # Co chuỗi đỉnh bậc 2 (giữ hình học gốc)
+        POST /api/landmarks              # Tiền xử lý mốc ALT cho shortest-path
+
+    6. Chạy Hàng Loạt & Job Nền:
+        POST /api/batch                  # Nhiều job thuật toán trên một đồ thị (NDJSON)
+        POST /api/jobs/{algo}            # Đưa request thuật toán vào hàng đợi nền (jobs.py)
+        GET  /api/jobs[/{id}]            # Trạng thái, tiến độ các job
+        GET  /api/jobs/{id}/events       # Theo dõi tiến độ (Server-Sent Events)
+        GET  /api/jobs/{id}/result       # Kết quả job đã xong
+        DELETE /api/jobs/{id}            # Hủy job
+
+    7. Giám Sát & Chẩn Đoán:
+        GET  /api/health                 # Trạng thái + tiến độ khởi động ấm (warmup.py)
+        GET  /api/metrics                # Số liệu Prometheus (metrics.py)
+        POST /api/admin/profile/{algo}   # Chạy thuật toán dưới profiler (profiling.py)
+        GET  /api/admin/profiles/{file}  # Tải profile đã lưu
+
+FAST RESPONSE MODE:
+    Các endpoint thuật toán, /api/map-data và /api/load-graph trả kết quả qua
+    respond() (fast_response.py). Gửi header "X-Response-Mode: fast" hoặc
+    "Accept: application/msgpack" để serialize thẳng ra bytes và nén gzip/zstd.
+
+RESULT CACHE:
+    Endpoint thuật toán cache kết quả theo (nội dung đồ thị, thuật toán, tham số)
+    và trả header ETag; gửi lại If-None-Match để nhận 304 (xem result_cache.py).
+    Khóa dùng hash NỘI DUNG đồ thị: đồ thị bị chỉnh sửa có khóa mới, entry của
+    nội dung cũ vẫn đúng nên không bị xóa mà tự hết hạn theo LRU/TTL.
+
+NHIỀU WORKER:
+    GRAPH_API_WORKERS=4 python main.py → nạp bản đồ một lần vào file mmap
+    (shared_graphs.py) rồi fork 4 worker uvicorn dùng chung file đó.
+    Với `uvicorn main:app --workers N` hãy chạy `python -m shared_graphs` trước.
+
+KHỞI ĐỘNG ẤM:
+    Server nhận kết nối ngay; luồng nền (warmup.py) nạp bản đồ mặc định và dựng
+    sẵn chỉ mục/NetworkX/chỉ mục không gian. GET /api/health?ready=true trả 503
+    cho đến khi xong (dùng làm readiness probe).
+
+INSTRUMENTATION:
+    Mọi response có header Server-Timing (parse, index, build_graph, algorithm,
+    handler, serialize, total). Tắt bằng GRAPH_API_METRICS=0.
 """
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from typing import List, Optional
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+from typing import Any, Callable, Dict, List, Literal, Optional, Iterator, Type
+from functools import partial
+import asyncio
+import json
 import os
-import uvicorn
+import time
 
 from models import (
     AlgorithmRequest, ConversionRequest, SaveGraphRequest,
     AlgorithmResponse, ConversionResponse, SaveGraphResponse, LoadGraphResponse,
     MSTRequest, MSTResponse, MaxFlowRequest, MaxFlowResponse,
     EulerianRequest, EulerianResponse, AddEdgeRequest, 
-    DeleteNodeRequest, DeleteEdgeRequest, GraphData, Edge
+    DeleteNodeRequest, DeleteEdgeRequest, GraphData, Edge, ColumnarGraphData,
+    GraphInput, GraphValidationReport, ProfileResponse, SimplifyRequest, SimplifyResponse,
+    ViewportResponse, LandmarkRequest, LandmarkResponse, IsochroneRequest, ComponentsRequest,
+    ComponentsResponse, BatchRequest, JobStatus, trusted_graph_from_dict
 )
-from map_data import osm_fetcher
 from algorithms import GraphAlgorithms
+from algorithms import conversion_engine
+from algorithms.conversion_engine import GraphArrays
+from algorithms.validation import validate_graph, graph_index
+from algorithms.simplification import simplify_graph
+from algorithms.landmarks import store_landmark_table
 from graph_storage import graph_storage
+from batch import prepare_graph, stream_jobs
+from jobs import EVENT_INTERVAL, Job, QueueFull, job_queue
+from fast_response import respond, fast_response, json_bytes_response, encode_json
+from metrics import (
+    METRICS_ENABLED, PROMETHEUS_MEDIA_TYPE, TimedRoute, TimingMiddleware,
+    phase, record_steps, render_prometheus
+)
+from result_cache import result_cache
+from shared_graphs import preload as preload_shared_graphs, shared_map_graph_async
+from profiling import check_token, profile_call, profiling_enabled, stored_profile_path
+from warmup import lifespan, warm_state
+from viewport import MAX_FEATURES, graph_lods, map_lod_key, parse_bbox, saved_lod_key, shared_columns
 
 app = FastAPI(
     title="Graph Visualization API",
     description="API for graph algorithms with OSM data from Bình Thạnh wards",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
+# Đo mốc vào/ra endpoint cho Server-Timing (metrics.py) - phải đặt trước các route
+app.router.route_class = TimedRoute
 
 # Cấu hình CORS
 app.add_middleware(
@@ -74,6 +148,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Middleware thêm sau cùng là lớp ngoài cùng → đo được cả CORS
+if METRICS_ENABLED:
+    app.add_middleware(TimingMiddleware)
+
 # Phục vụ frontend static files
 frontend_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend")
 if os.path.exists(frontend_path):
@@ -98,47 +176,279 @@ async def get_js():
     pass
 
 @app.get("/api/health")
-async def health_check():
-    """Endpoint kiểm tra sức khỏe"""
-    # TODO: Triển khai health check
-    pass
+async def health_check(response: Response, ready: bool = False):
+    """
+    Endpoint kiểm tra sức khỏe
+
+    Tham số:
+        ready: True → trả 503 khi chưa khởi động ấm xong (readiness probe)
+    """
+    if ready and not warm_state.ready:
+        response.status_code = 503
+    return {
+        "status": "ok",
+        "ready": warm_state.ready,
+        "warmup": warm_state.snapshot()
+    }
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """Số liệu thời gian/kích thước/cache theo định dạng Prometheus (xem metrics.py)"""
+    return Response(content=render_prometheus(), media_type=PROMETHEUS_MEDIA_TYPE)
 
 @app.get("/api/map-data")
-async def get_map_data(major_roads_only: bool = True):
-    """Lấy dữ liệu OpenStreetMap cho các phường  cụ thể ở Bình Thạnh"""
-    # TODO: Triển khai lấy dữ liệu OSM
-    pass
+async def get_map_data(http_request: Request, major_roads_only: bool = True, columnar: bool = False,
+                       simplified: bool = False):
+    """
+    Lấy dữ liệu OpenStreetMap cho các phường  cụ thể ở Bình Thạnh
+
+    columnar=True: trả đồ thị dạng cột (ColumnarGraphData) - gọn hơn và được
+    validate theo khối khi client gửi lại trong các request thuật toán
+
+    simplified=True: đồ thị đã co chuỗi đỉnh bậc 2 (algorithms/simplification.py);
+    kết quả đường đi trên đồ thị này có thêm expanded_path để vẽ đầy đủ
+
+    Đồ thị được tải một lần và dùng chung giữa các worker (shared_graphs.py);
+    response là bytes JSON dựng sẵn trong file mmap; lần tải OSM đầu tiên
+    chạy bằng client async nên không chặn các request khác
+    """
+    shared = await shared_map_graph_async(major_roads_only, simplified)
+    return json_bytes_response(http_request, bytes(shared.map_json(columnar)))
+
+@app.get("/api/viewport")
+async def get_viewport(http_request: Request,
+                       bbox: str = Query(..., description="south,west,north,east"),
+                       zoom: int = Query(..., ge=0, le=22),
+                       major_roads_only: bool = True,
+                       graph: Optional[str] = Query(None, description="Tên đồ thị đã lưu; bỏ trống = bản đồ OSM"),
+                       limit: int = Query(MAX_FEATURES, ge=1, le=50000)) -> ViewportResponse:
+    """
+    Phần đồ thị trong khung nhìn, mức chi tiết theo zoom (xem viewport.py)
+
+    zoom >= 16: đồ thị đầy đủ; 14-15: đồ thị rút gọn, hình học thô hơn;
+    < 14: đỉnh gộp thành cụm. Frontend gọi lại mỗi khi pan/zoom bản đồ thay vì
+    vẽ toàn bộ đồ thị. Các mức được dựng một lần cho mỗi đồ thị rồi giữ trong LRU.
+    """
+    try:
+        box = parse_bbox(bbox)
+    except ValueError as e:
+        return ViewportResponse(success=False, error=str(e))
+
+    if graph:
+        mtime = await graph_storage.modified_time_async(graph)
+        if mtime is None:
+            return ViewportResponse(success=False, error=f"Graph not found: {graph}")
+
+        def load() -> GraphData:
+            loaded = graph_storage.load_graph(graph)
+            if not loaded.success:
+                raise RuntimeError(loaded.error)
+            return loaded.graph
+        key, columns = saved_lod_key(graph, mtime), None
+    else:
+        shared = await shared_map_graph_async(major_roads_only)
+
+        def load() -> GraphData:
+            return trusted_graph_from_dict(json.loads(bytes(shared.map_json()))["graph"])
+        key = map_lod_key(shared)
+        columns = shared_columns(shared)
+
+    try:
+        lod = await run_in_threadpool(graph_lods.get_or_build, key, load, columns)
+    except Exception as e:
+        return ViewportResponse(success=False, error=str(e))
+    return respond(http_request, ViewportResponse(success=True, **lod.query(box, zoom, limit)))
+
+def _dump_graph(graph: GraphData, columnar: bool) -> dict:
+    """Serialize đồ thị theo dạng đối tượng (mặc định) hoặc dạng cột"""
+    if columnar:
+        return ColumnarGraphData.from_graph_data(graph).model_dump(mode="json")
+    return graph.model_dump(mode="json")
+
+# ==================== Hàm hỗ trợ chạy thuật toán ====================
+
+def _algorithm_error(algorithm: str, error: str) -> AlgorithmResponse:
+    """Response lỗi chung cho các thuật toán cơ bản"""
+    return AlgorithmResponse(success=False, algorithm=algorithm, steps=[], result=None, error=error)
+
+def _run_basic_algorithm(request: AlgorithmRequest, algorithm: str) -> AlgorithmResponse:
+    """
+    Chạy một thuật toán cơ bản (BFS, DFS, Dijkstra, bipartite) trên đồ thị của request
+
+    Các mixin tương ứng trả về AlgorithmResponse đã hợp lệ.
+    """
+    try:
+        algo = GraphAlgorithms(request.graph)
+        error = algo.check_preconditions(
+            request.start_node, request.end_node,
+            non_negative_weights=(algorithm == "shortest_path")
+        )
+        if error:
+            return _algorithm_error(algorithm, error)
+        if algorithm == "bipartite":
+            run = partial(algo.check_bipartite, request.include_steps)
+        elif not request.start_node:
+            return _algorithm_error(algorithm, "start_node is required")
+        elif algorithm == "bfs":
+            run = partial(algo.bfs, request.start_node, request.include_steps)
+        elif algorithm == "dfs":
+            run = partial(algo.dfs, request.start_node, request.include_steps)
+        elif not request.end_node:
+            return _algorithm_error(algorithm, "end_node is required")
+        else:
+            run = partial(algo.shortest_path, request.start_node, request.end_node, request.method)
+        with phase("algorithm"):
+            result = run()
+        if not request.include_steps:
+            result.steps = []
+        record_steps(algorithm, result)
+        return result
+    except Exception as e:
+        return _algorithm_error(algorithm, str(e))
+
+def _etag_matches(http_request: Request, etag: str, exists: bool = False) -> bool:
+    """
+    So khớp If-None-Match (so sánh yếu, hỗ trợ danh sách và "*")
+
+    "*" chỉ khớp khi exists=True: đã có kết quả thành công cho khóa này
+    (RFC 9110 - "*" nghĩa là "có bản hiện tại", không phải "mọi ETag")
+    """
+    header = http_request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return (exists and "*" in tags) or any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in tags)
+
+def _compute_and_store(key, compute: Callable[[], BaseModel]) -> BaseModel:
+    result = compute()
+    result_cache.put(key, result)
+    return result
+
+async def _cached_result(http_request: Request, response: Response, request: BaseModel, algorithm: str,
+                         model: Type[BaseModel], compute: Callable[[], BaseModel]):
+    """
+    Chạy thuật toán qua result_cache (xem result_cache.py)
+
+    - If-None-Match khớp ETag → 304, không chạy thuật toán
+    - Cache hit → trả kết quả đã lưu (If-None-Match: * → 304)
+    - Cache miss → compute() trong threadpool (Fleury, max-flow, dựng bảng mốc
+      không chặn event loop), lưu nếu success
+    Kết quả thành công luôn kèm header ETag
+    """
+    key = result_cache.make_key(request.graph, algorithm, request.model_dump(exclude={"graph"}))
+    if _etag_matches(http_request, key.etag):
+        return Response(status_code=304, headers={"ETag": key.etag})
+    with phase("cache"):
+        result = await run_in_threadpool(result_cache.get, key, model)  # Có thể đọc đĩa
+    if result is not None and _etag_matches(http_request, key.etag, exists=True):
+        return Response(status_code=304, headers={"ETag": key.etag})
+    if result is None:
+        result = await run_in_threadpool(_compute_and_store, key, compute)
+    output = respond(http_request, result)
+    if getattr(result, "success", False):
+        # respond() trả Response ở fast mode; ngược lại header đi qua Response được inject
+        (output if isinstance(output, Response) else response).headers["ETag"] = key.etag
+    return output
 
 # ==================== Endpoints Thuật Toán Cơ Bản ====================
 
 @app.post("/api/bfs")
-async def run_bfs(request: AlgorithmRequest) -> AlgorithmResponse:
+async def run_bfs(request: AlgorithmRequest, http_request: Request, response: Response) -> AlgorithmResponse:
     """Chạy thuật toán Breadth-First Search"""
-    # TODO: Triển khai BFS endpoint
-    pass
+    return await _cached_result(
+        http_request, response, request, "bfs", AlgorithmResponse,
+        partial(_run_basic_algorithm, request, "bfs")
+    )
 
 @app.post("/api/dfs")
-async def run_dfs(request: AlgorithmRequest) -> AlgorithmResponse:
+async def run_dfs(request: AlgorithmRequest, http_request: Request, response: Response) -> AlgorithmResponse:
     """Chạy thuật toán Depth-First Search"""
-    # TODO: Triển khai DFS endpoint
-    pass
+    return await _cached_result(
+        http_request, response, request, "dfs", AlgorithmResponse,
+        partial(_run_basic_algorithm, request, "dfs")
+    )
 
 @app.post("/api/shortest-path")
-async def find_shortest_path(request: AlgorithmRequest) -> AlgorithmResponse:
+async def find_shortest_path(request: AlgorithmRequest, http_request: Request, response: Response) -> AlgorithmResponse:
     """Tìm đường đi ngắn nhất sử dụng thuật toán Dijkstra"""
-    # TODO: Triển khai shortest path endpoint
-    pass
+    return await _cached_result(
+        http_request, response, request, "shortest_path", AlgorithmResponse,
+        partial(_run_basic_algorithm, request, "shortest_path")
+    )
 
 @app.post("/api/check-bipartite")
-async def check_bipartite(request: AlgorithmRequest) -> AlgorithmResponse:
+async def check_bipartite(request: AlgorithmRequest, http_request: Request, response: Response) -> AlgorithmResponse:
     """Kiểm tra xem đồ thị có phải bipartite"""
-    # TODO: Triển khai bipartite check endpoint
-    pass
+    return await _cached_result(
+        http_request, response, request, "bipartite", AlgorithmResponse,
+        partial(_run_basic_algorithm, request, "bipartite")
+    )
+
+def _run_isochrone(request: IsochroneRequest) -> AlgorithmResponse:
+    """Chạy Dijkstra giới hạn bán kính từ các nguồn của request"""
+    try:
+        algo = GraphAlgorithms(request.graph)
+        error = algo.check_preconditions(*request.sources, non_negative_weights=True)
+        if error:
+            return _algorithm_error("isochrone", error)
+        with phase("algorithm"):
+            result = algo.isochrone(request.sources, request.radius, request.include_steps, request.hull)
+        record_steps("isochrone", result)
+        return result
+    except Exception as e:
+        return _algorithm_error("isochrone", str(e))
+
+@app.post("/api/isochrone")
+async def run_isochrone(request: IsochroneRequest, http_request: Request, response: Response) -> AlgorithmResponse:
+    """
+    Các đỉnh đến được trong bán kính radius từ một hoặc nhiều nguồn
+
+    Một lần Dijkstra dừng ở bán kính (không trace từng bước trừ khi
+    include_steps=True); hull=True trả thêm bao lồi của vùng đến được
+    """
+    return await _cached_result(
+        http_request, response, request, "isochrone", AlgorithmResponse,
+        partial(_run_isochrone, request)
+    )
+
+def _run_components(request: ComponentsRequest) -> ComponentsResponse:
+    """Gán nhãn thành phần liên thông (cache trên đồ thị, xem algorithms/components.py)"""
+    try:
+        algo = GraphAlgorithms(request.graph)
+        duplicates = algo.index.report.duplicate_node_ids
+        if duplicates:
+            # Mỗi bản trùng là một slot riêng khi duyệt → count/sizes/labels sai lệch
+            return ComponentsResponse(success=False, error=f"Duplicate node ids: {', '.join(duplicates)}")
+        with phase("algorithm"):
+            components = algo.components(request.kind)
+        labels = None
+        if request.include_labels:
+            node_ids = [node.id for node in request.graph.nodes]
+            labels = dict(zip(node_ids, components.labels))
+        return ComponentsResponse(
+            success=True, kind=components.kind, count=components.count, sizes=components.sizes,
+            largest=max(components.sizes, default=0), labels=labels
+        )
+    except Exception as e:
+        return ComponentsResponse(success=False, error=str(e))
+
+@app.post("/api/components")
+async def connected_components(request: ComponentsRequest, http_request: Request, response: Response) -> ComponentsResponse:
+    """
+    Thành phần liên thông yếu/mạnh của đồ thị
+
+    Nhãn được tính một lần và cache cùng đồ thị; shortest-path, ford-fulkerson
+    dùng chúng để trả lời ngay truy vấn giữa hai thành phần khác nhau
+    """
+    return await _cached_result(
+        http_request, response, request, "components", ComponentsResponse,
+        partial(_run_components, request)
+    )
 
 # ==================== Endpoints Thuật Toán Nâng Cao ====================
 
 @app.post("/api/prim")
-async def run_prim(request: MSTRequest) -> MSTResponse:
+async def run_prim(request: MSTRequest, http_request: Request, response: Response) -> MSTResponse:
     """
     Chạy thuật toán Prim cho Cây Khung Nhỏ Nhất
     
@@ -148,11 +458,13 @@ async def run_prim(request: MSTRequest) -> MSTResponse:
     Trả về:
         MST response với các cạnh và tổng trọng số
     """
-    # TODO: Triển khai Prim endpoint
-    pass
+    return await _cached_result(
+        http_request, response, request, "prim", MSTResponse,
+        partial(_run_mst_algorithm, request, "prim")
+    )
 
 @app.post("/api/kruskal")
-async def run_kruskal(request: MSTRequest) -> MSTResponse:
+async def run_kruskal(request: MSTRequest, http_request: Request, response: Response) -> MSTResponse:
     """
     Chạy thuật toán Kruskal cho Cây Khung Nhỏ Nhất
     
@@ -162,11 +474,13 @@ async def run_kruskal(request: MSTRequest) -> MSTResponse:
     Trả về:
         MST response với các cạnh và tổng trọng số
     """
-    # TODO: Triển khai Kruskal endpoint
-    pass
+    return await _cached_result(
+        http_request, response, request, "kruskal", MSTResponse,
+        partial(_run_mst_algorithm, request, "kruskal")
+    )
 
 @app.post("/api/ford-fulkerson")
-async def run_ford_fulkerson(request: MaxFlowRequest) -> MaxFlowResponse:
+async def run_ford_fulkerson(request: MaxFlowRequest, http_request: Request, response: Response) -> MaxFlowResponse:
     """
     Chạy thuật toán Ford-Fulkerson cho luồng cực đại
     
@@ -176,11 +490,13 @@ async def run_ford_fulkerson(request: MaxFlowRequest) -> MaxFlowResponse:
     Trả về:
         Max flow response với giá trị luồng và các cạnh
     """
-    # TODO: Triển khai Ford-Fulkerson endpoint
-    pass
+    return await _cached_result(
+        http_request, response, request, "ford_fulkerson", MaxFlowResponse,
+        partial(_run_max_flow, request)
+    )
 
 @app.post("/api/fleury")
-async def run_fleury(request: EulerianRequest) -> EulerianResponse:
+async def run_fleury(request: EulerianRequest, http_request: Request, response: Response) -> EulerianResponse:
     """
     Chạy thuật toán Fleury cho đường đi Euler
     
@@ -190,11 +506,13 @@ async def run_fleury(request: EulerianRequest) -> EulerianResponse:
     Trả về:
         Euler response với thông tin đường đi
     """
-    # TODO: Triển khai Fleury endpoint
-    pass
+    return await _cached_result(
+        http_request, response, request, "fleury", EulerianResponse,
+        partial(_run_euler_algorithm, request, "fleury")
+    )
 
 @app.post("/api/hierholzer")
-async def run_hierholzer(request: EulerianRequest) -> EulerianResponse:
+async def run_hierholzer(request: EulerianRequest, http_request: Request, response: Response) -> EulerianResponse:
     """
     Chạy thuật toán Hierholzer cho chu trình Euler
     
@@ -204,8 +522,65 @@ async def run_hierholzer(request: EulerianRequest) -> EulerianResponse:
     Trả về:
         Euler response với thông tin chu trình
     """
-    # TODO: Triển khai Hierholzer endpoint
-    pass
+    return await _cached_result(
+        http_request, response, request, "hierholzer", EulerianResponse,
+        partial(_run_euler_algorithm, request, "hierholzer")
+    )
+
+def _run_mst_algorithm(request: MSTRequest, algorithm: str) -> MSTResponse:
+    """Chạy Prim hoặc Kruskal và đóng gói kết quả thành MSTResponse"""
+    try:
+        algo = GraphAlgorithms(request.graph)
+        error = algo.check_preconditions(request.start_node)
+        if error:
+            raise ValueError(error)
+        with phase("algorithm"):
+            if algorithm == "prim":
+                result = algo.prim_mst(request.start_node)
+            else:
+                result = algo.kruskal_mst()
+        record_steps(algorithm, result)
+        return MSTResponse(**{"success": True, "algorithm": algorithm, **result})
+    except Exception as e:
+        return MSTResponse(
+            success=False, algorithm=algorithm, steps=[], mst_edges=[], total_weight=0, error=str(e)
+        )
+
+def _run_max_flow(request: MaxFlowRequest) -> MaxFlowResponse:
+    """Chạy Ford-Fulkerson và đóng gói kết quả thành MaxFlowResponse"""
+    try:
+        algo = GraphAlgorithms(request.graph)
+        error = algo.check_preconditions(request.source_node, request.sink_node)
+        if error:
+            raise ValueError(error)
+        with phase("algorithm"):
+            result = algo.ford_fulkerson(request.source_node, request.sink_node)
+        record_steps("ford_fulkerson", result)
+        return MaxFlowResponse(**{"success": True, "algorithm": "ford_fulkerson", **result})
+    except Exception as e:
+        return MaxFlowResponse(
+            success=False, algorithm="ford_fulkerson", steps=[], max_flow=0, flow_edges=[], error=str(e)
+        )
+
+def _run_euler_algorithm(request: EulerianRequest, algorithm: str) -> EulerianResponse:
+    """Chạy Fleury hoặc Hierholzer và đóng gói kết quả thành EulerianResponse"""
+    try:
+        algo = GraphAlgorithms(request.graph)
+        error = algo.check_preconditions(request.start_node)
+        if error:
+            raise ValueError(error)
+        with phase("algorithm"):
+            if algorithm == "fleury":
+                result = algo.fleury_algorithm(request.start_node)
+            else:
+                result = algo.hierholzer_algorithm(request.start_node)
+        record_steps(algorithm, result)
+        return EulerianResponse(**{"success": True, "algorithm": algorithm, **result})
+    except Exception as e:
+        return EulerianResponse(
+            success=False, algorithm=algorithm, steps=[],
+            has_eulerian_path=False, has_eulerian_circuit=False, error=str(e)
+        )
 
 # ==================== Endpoints Thao Tác Đồ Thị ====================
 
@@ -220,8 +595,18 @@ async def add_edge(request: AddEdgeRequest):
     Trả về:
         Dữ liệu đồ thị đã cập nhật
     """
-    # TODO: Triển khai add edge
-    pass
+    graph = request.graph
+    missing = graph_index(graph).missing_nodes(request.source, request.target)
+    if missing:
+        return {"success": False, "error": f"Node not found: {', '.join(missing)}"}
+    
+    directed = graph.directed if request.directed is None else request.directed
+    new_edge = Edge(
+        source=request.source, target=request.target, weight=request.weight,
+        directed=directed, capacity=request.capacity
+    )
+    updated = graph.model_copy(update={"edges": graph.edges + [new_edge]})
+    return {"success": True, "graph": updated.model_dump(mode="json")}
 
 @app.post("/api/delete-node")
 async def delete_node(request: DeleteNodeRequest):
@@ -234,8 +619,16 @@ async def delete_node(request: DeleteNodeRequest):
     Trả về:
         Dữ liệu đồ thị đã cập nhật
     """
-    # TODO: Triển khai delete node
-    pass
+    graph = request.graph
+    if not graph_index(graph).has_node(request.node_id):
+        return {"success": False, "error": f"Node not found: {request.node_id}"}
+    
+    node_id = request.node_id
+    updated = graph.model_copy(update={
+        "nodes": [node for node in graph.nodes if node.id != node_id],
+        "edges": [edge for edge in graph.edges if node_id not in (edge.source, edge.target)]
+    })
+    return {"success": True, "graph": updated.model_dump(mode="json")}
 
 @app.post("/api/delete-edge")
 async def delete_edge(request: DeleteEdgeRequest):
@@ -248,35 +641,394 @@ async def delete_edge(request: DeleteEdgeRequest):
     Trả về:
         Dữ liệu đồ thị đã cập nhật
     """
-    # TODO: Triển khai delete edge
-    pass
+    graph = request.graph
+    
+    def matches(edge: Edge) -> bool:
+        if edge.source == request.source and edge.target == request.target:
+            return True
+        # Đồ thị vô hướng: cạnh (u, v) cũng là cạnh (v, u)
+        return not graph.directed and edge.source == request.target and edge.target == request.source
+    
+    edges = [edge for edge in graph.edges if not matches(edge)]
+    if len(edges) == len(graph.edges):
+        return {"success": False, "error": f"Edge not found: {request.source} - {request.target}"}
+    updated = graph.model_copy(update={"edges": edges})
+    return {"success": True, "graph": updated.model_dump(mode="json")}
 
 # ==================== Endpoints Chuyển Đổi & Lưu Trữ ====================
 
 @app.post("/api/convert-representation")
 async def convert_representation(request: ConversionRequest) -> ConversionResponse:
-    """Chuyển đổi định dạng biểu diễn đồ thị"""
-    # TODO: Triển khai conversion
-    pass
+    """
+    Chuyển đổi định dạng biểu diễn đồ thị
+
+    Ma trận kề không bao giờ được dựng đầy đủ trong bộ nhớ:
+        - encoding="binary": stream định dạng nhị phân (application/octet-stream)
+        - matrix_layout="dense": stream JSON theo từng hàng
+        - matrix_layout="coo"/"csr": trả về bộ ba thưa trong ConversionResponse
+    """
+    try:
+        arrays = _conversion_source(request)
+
+        if request.to_format == "adjacency_matrix":
+            if request.encoding == "binary":
+                return StreamingResponse(
+                    GraphAlgorithms.encode_matrix_binary(arrays, request.matrix_layout),
+                    media_type="application/octet-stream"
+                )
+            if request.matrix_layout == "dense":
+                return StreamingResponse(
+                    _stream_dense_matrix_json(request, arrays),
+                    media_type="application/json"
+                )
+
+        data = GraphAlgorithms.convert_representation(
+            arrays, request.to_format, request.matrix_layout
+        )
+        return ConversionResponse(
+            success=True,
+            from_format=request.from_format,
+            to_format=request.to_format,
+            data=data
+        )
+    except Exception as e:
+        return ConversionResponse(
+            success=False,
+            from_format=request.from_format,
+            to_format=request.to_format,
+            data=None,
+            error=str(e)
+        )
+
+def _conversion_source(request: ConversionRequest) -> GraphArrays:
+    """Đọc nguồn của ConversionRequest thành GraphArrays (không dựng Node/Edge)"""
+    if request.data is not None and request.from_format != "graph":
+        return conversion_engine.read(request.data, request.from_format, request.directed)
+    if request.graph is None:
+        raise ValueError("Either 'graph' or 'data' must be provided")
+    return conversion_engine.from_graph_data(request.graph)
+
+def _stream_dense_matrix_json(request: ConversionRequest, arrays: GraphArrays) -> Iterator[str]:
+    """Sinh JSON của ConversionResponse (ma trận dày) theo từng hàng"""
+    node_ids, rows = GraphAlgorithms.iter_matrix_rows(arrays)
+    yield (
+        '{"success": true, '
+        f'"from_format": {json.dumps(request.from_format)}, '
+        f'"to_format": {json.dumps(request.to_format)}, '
+        f'"data": {{"layout": "dense", "nodes": {json.dumps(node_ids)}, "matrix": ['
+    )
+    for i, row in enumerate(rows):
+        yield ("," if i else "") + json.dumps(row)
+    yield ']}, "error": null}'
+
+@app.post("/api/validate-graph")
+async def validate_graph_structure(graph: GraphInput) -> GraphValidationReport:
+    """Kiểm tra cấu trúc đồ thị: id trùng, cạnh treo, cạnh song song, trọng số âm"""
+    return validate_graph(graph)
+
+@app.post("/api/simplify-graph")
+async def simplify_graph_structure(request: SimplifyRequest, http_request: Request) -> SimplifyResponse:
+    """
+    Co các chuỗi đỉnh bậc 2 thành một cạnh (trọng số = tổng chuỗi)
+
+    Đồ thị trả về nhỏ hơn nhưng cho cùng kết quả tìm đường; hình học gốc nằm
+    trong graph.metadata["chains"] nên gửi lại đồ thị này vẫn mở rộng được đường đi
+    """
+    missing = graph_index(request.graph).missing_nodes(*request.keep_nodes)
+    if missing:
+        return SimplifyResponse(success=False, error=f"Node not found: {', '.join(missing)}")
+    simplified = await run_in_threadpool(simplify_graph, request.graph, request.keep_nodes)
+    return respond(http_request, SimplifyResponse(success=True, graph=simplified.graph, **simplified.stats()))
+
+def _precompute_landmarks(request: LandmarkRequest) -> LandmarkResponse:
+    try:
+        algo = GraphAlgorithms(request.graph)
+        error = algo.check_preconditions(non_negative_weights=True)
+        if error:
+            return LandmarkResponse(success=False, error=error)
+        if not request.graph.nodes:
+            return LandmarkResponse(success=False, error="Graph is empty")
+        started = time.perf_counter()
+        table = algo.precompute_landmarks(request.count, request.strategy, persist=False)
+        build_ms = round((time.perf_counter() - started) * 1000, 3)
+        persisted = store_landmark_table(table, request.persist)
+        return LandmarkResponse(
+            success=True, landmarks=table.landmark_ids, strategy=table.strategy,
+            node_count=len(table.node_ids), table_bytes=table.nbytes,
+            build_ms=build_ms, persisted=persisted
+        )
+    except Exception as e:
+        return LandmarkResponse(success=False, error=str(e))
+
+@app.post("/api/landmarks")
+async def precompute_landmarks(request: LandmarkRequest) -> LandmarkResponse:
+    """
+    Chọn mốc và tính sẵn khoảng cách cho A* ALT (xem algorithms/landmarks.py)
+
+    Sau đó /api/shortest-path trên cùng đồ thị (cùng hash nội dung) tự dùng ALT;
+    persist=True lưu bảng mốc để dùng lại sau khi khởi động lại server
+    """
+    return await run_in_threadpool(_precompute_landmarks, request)
 
 @app.post("/api/save-graph")
 async def save_graph(request: SaveGraphRequest) -> SaveGraphResponse:
     """Lưu đồ thị vào file"""
-    # TODO: Triển khai save graph
-    pass
+    return await graph_storage.save_graph_async(request.name, request.graph)
 
 @app.get("/api/load-graph/{filename}")
-async def load_graph(filename: str) -> LoadGraphResponse:
-    """Tải đồ thị từ file"""
-    # TODO: Triển khai load graph
-    pass
+async def load_graph(filename: str, http_request: Request, columnar: bool = False) -> LoadGraphResponse:
+    """Tải đồ thị từ file (columnar=True: trả đồ thị dạng cột)"""
+    result = await graph_storage.load_graph_async(filename)
+    if columnar and result.graph is not None:
+        # Dạng cột không khớp schema LoadGraphResponse → luôn serialize trực tiếp
+        return fast_response(http_request, {
+            "success": True,
+            "graph": _dump_graph(result.graph, columnar=True),
+            "error": None
+        })
+    return respond(http_request, result)
 
 @app.get("/api/saved-graphs")
 async def list_saved_graphs():
     """Liệt kê tất cả đồ thị đã lưu """
-    # TODO: Triển khai list saved graphs
-    pass
+    return {"success": True, "graphs": await graph_storage.list_saved_graphs_async()}
 
-if __name__ == "__main__":
+# ==================== Chạy Hàng Loạt ====================
+
+# Tên trong URL → (model request, hàm chạy) - trùng với đường dẫn endpoint thuật toán
+# Dùng cho /api/batch và /api/admin/profile/{algo}
+ALGORITHM_RUNNERS = {
+    "bfs": (AlgorithmRequest, lambda r: _run_basic_algorithm(r, "bfs")),
+    "dfs": (AlgorithmRequest, lambda r: _run_basic_algorithm(r, "dfs")),
+    "shortest-path": (AlgorithmRequest, lambda r: _run_basic_algorithm(r, "shortest_path")),
+    "check-bipartite": (AlgorithmRequest, lambda r: _run_basic_algorithm(r, "bipartite")),
+    "isochrone": (IsochroneRequest, _run_isochrone),
+    "components": (ComponentsRequest, _run_components),
+    "prim": (MSTRequest, lambda r: _run_mst_algorithm(r, "prim")),
+    "kruskal": (MSTRequest, lambda r: _run_mst_algorithm(r, "kruskal")),
+    "ford-fulkerson": (MaxFlowRequest, _run_max_flow),
+    "fleury": (EulerianRequest, lambda r: _run_euler_algorithm(r, "fleury")),
+    "hierholzer": (EulerianRequest, lambda r: _run_euler_algorithm(r, "hierholzer")),
+}
+# Giá trị field "algorithm" của request khi khác tên đường dẫn (còn lại trùng tên)
+ALGORITHM_FIELD_VALUES = {"shortest-path": "shortest_path", "check-bipartite": "bipartite"}
+
+def _batch_jobs(request: BatchRequest) -> List[Callable[[], Any]]:
+    """
+    Validate từng job thành request của endpoint tương ứng
+
+    Mọi request dùng chung đối tượng request.graph (pydantic không copy
+    instance) → các job thấy cùng GraphIndex và cấu trúc đã dựng sẵn.
+    Lỗi ở bất kỳ job nào → 422 cho cả batch, loc chỉ rõ job.
+    Request có field "algorithm" (bfs, prim, fleury, ...) được điền từ
+    job.algorithm; params ghi algorithm khác → lỗi thay vì chạy lệch tên.
+    """
+    jobs: List[Callable[[], Any]] = []
+    errors: List[Dict[str, Any]] = []
+    for i, job in enumerate(request.jobs):
+        entry = ALGORITHM_RUNNERS.get(job.algorithm)
+        if entry is None:
+            errors.append({
+                "type": "value_error", "loc": ("body", "jobs", i, "algorithm"),
+                "msg": f"Unknown algorithm: {job.algorithm}", "input": job.algorithm
+            })
+            continue
+        request_model, runner = entry
+        params = job.params
+        if "algorithm" in request_model.model_fields:
+            expected = ALGORITHM_FIELD_VALUES.get(job.algorithm, job.algorithm)
+            given = params.get("algorithm", expected)
+            if given != expected:
+                errors.append({
+                    "type": "value_error", "loc": ("body", "jobs", i, "params", "algorithm"),
+                    "msg": f"algorithm '{given}' does not match job algorithm '{job.algorithm}'",
+                    "input": given
+                })
+                continue
+            params = {**params, "algorithm": expected}
+        try:
+            job_request = request_model.model_validate({**params, "graph": request.graph})
+        except ValidationError as e:
+            for error in e.errors(include_url=False):
+                error["loc"] = ("body", "jobs", i, "params", *error["loc"])
+                if isinstance(error.get("input"), dict) and "graph" in error["input"]:
+                    error["input"] = job.params  # Không lặp lại cả đồ thị trong lỗi
+                errors.append(error)
+            continue
+        jobs.append(partial(runner, job_request))
+    if errors:
+        raise RequestValidationError(errors)
+    return jobs
+
+def _stream_batch(request: BatchRequest, jobs: List[Callable[[], Any]]) -> Iterator[bytes]:
+    """Mỗi job xong → một dòng NDJSON {"index", "id", "algorithm", "elapsed_ms", "result", "error"}"""
+    for i, result, elapsed_ms, error in stream_jobs(jobs):
+        job = request.jobs[i]
+        head = json.dumps({"index": i, "id": job.id, "algorithm": job.algorithm,
+                           "elapsed_ms": round(elapsed_ms, 3), "error": error})
+        body = encode_json(result) if result is not None else b"null"
+        yield head[:-1].encode("utf-8") + b', "result": ' + body + b"}\n"
+
+@app.post("/api/batch")
+async def run_batch(request: BatchRequest) -> StreamingResponse:
+    """
+    Chạy nhiều job thuật toán trên MỘT đồ thị (xem batch.py)
+
+    Body: {"graph": ..., "jobs": [{"id": "j1", "algorithm": "ford-fulkerson",
+    "params": {"source_node": "A", "sink_node": "B"}}, ...]} - params giống body
+    của endpoint tương ứng (bỏ graph; field algorithm lấy từ job). Đồ thị được dựng một lần; kết quả trả
+    dạng NDJSON, mỗi job một dòng theo thứ tự hoàn thành.
+    """
+    jobs = _batch_jobs(request)
+    with phase("build_graph"):
+        await run_in_threadpool(prepare_graph, request.graph, [job.algorithm for job in request.jobs])
+    return StreamingResponse(_stream_batch(request, jobs), media_type="application/x-ndjson")
+
+# ==================== Job Nền ====================
+
+def _job_or_404(job_id: str) -> Job:
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+@app.post("/api/jobs/{algorithm}", status_code=202)
+async def submit_job(algorithm: str, payload: Dict[str, Any],
+                     priority: int = Query(0, ge=-100, le=100)) -> JobStatus:
+    """
+    Đưa một request thuật toán vào hàng đợi nền (xem jobs.py)
+
+    Body giống hệt body của endpoint thuật toán tương ứng, ví dụ:
+        POST /api/jobs/ford-fulkerson?priority=5
+    Trả về ngay job_id; theo dõi bằng GET /api/jobs/{id} hoặc /api/jobs/{id}/events,
+    lấy kết quả bằng GET /api/jobs/{id}/result. Hàng đợi đầy → 429.
+    """
+    entry = ALGORITHM_RUNNERS.get(algorithm)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Unknown algorithm: {algorithm}")
+    request_model, runner = entry
+    try:
+        request = request_model.model_validate(payload)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+    try:
+        job = job_queue.submit(algorithm, partial(runner, request), priority)
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    return job.snapshot()
+
+@app.get("/api/jobs")
+async def list_jobs():
+    """Liệt kê các job còn giữ (đang chờ, đang chạy, đã xong)"""
+    return {
+        "success": True, **job_queue.stats(),
+        "jobs": [job.snapshot() for job in job_queue.jobs()]
+    }
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str) -> JobStatus:
+    """Trạng thái và tiến độ của job"""
+    return _job_or_404(job_id).snapshot()
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str, http_request: Request):
+    """Kết quả của job đã xong (409 nếu job chưa xong hoặc không có kết quả)"""
+    job = _job_or_404(job_id)
+    if not job.finished:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    if job.result is None:
+        raise HTTPException(status_code=409, detail=job.error or f"Job is {job.status}")
+    return respond(http_request, job.result)
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str) -> StreamingResponse:
+    """Server-Sent Events: một JobStatus mỗi EVENT_INTERVAL giây cho đến khi job kết thúc"""
+    job = _job_or_404(job_id)
+
+    async def events():
+        while True:
+            finished = job.finished  # Đọc trước snapshot → sự kiện cuối luôn là trạng thái kết thúc
+            yield f"event: progress\ndata: {job.snapshot().model_dump_json()}\n\n"
+            if finished:
+                return
+            await asyncio.sleep(EVENT_INTERVAL)
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str) -> JobStatus:
+    """Hủy job: đang chờ → hủy ngay; đang chạy → dừng ở bước kế tiếp"""
+    _job_or_404(job_id)
+    return job_queue.cancel(job_id).snapshot()
+
+# ==================== Endpoints Chẩn Đoán (profiling) ====================
+
+def _require_profiling(http_request: Request) -> None:
+    """Guard: 404 khi chưa cấu hình token, 403 khi token sai"""
+    if not profiling_enabled():
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not check_token(http_request.headers.get("x-profile-token")):
+        raise HTTPException(status_code=403, detail="Invalid profile token")
+
+@app.post("/api/admin/profile/{algorithm}")
+async def profile_algorithm(
+    algorithm: str,
+    payload: Dict[str, Any],
+    http_request: Request,
+    mode: Literal["sampling", "deterministic"] = "sampling",
+    allocations: bool = True,
+    store: bool = False
+) -> ProfileResponse:
+    """
+    Chạy một request thuật toán dưới profiler (xem profiling.py)
+
+    Body giống hệt body của endpoint thuật toán tương ứng, ví dụ:
+        POST /api/admin/profile/fleury?mode=sampling&store=true
+        Header: X-Profile-Token: <GRAPH_API_PROFILING_TOKEN>
+    """
+    _require_profiling(http_request)
+    entry = ALGORITHM_RUNNERS.get(algorithm)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Unknown algorithm: {algorithm}")
+    request_model, runner = entry
+    try:
+        request = request_model.model_validate(payload)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+
+    # Chạy trong threadpool: profiler lấy mẫu đúng luồng, không chặn event loop
+    result, report = await run_in_threadpool(
+        profile_call, partial(runner, request), algorithm, mode, allocations, store
+    )
+    return ProfileResponse(
+        success=True, algorithm=algorithm,
+        result_success=getattr(result, "success", None),
+        result_error=getattr(result, "error", None), **report
+    )
+
+@app.get("/api/admin/profiles/{filename}")
+async def download_profile(filename: str, http_request: Request):
+    """Tải file profile đã lưu (.folded hoặc .prof)"""
+    _require_profiling(http_request)
+    path = stored_profile_path(filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Profile not found: {filename}")
+    return FileResponse(path, filename=path.name)
+
+def run_server() -> None:
+    """
+    Chạy server; GRAPH_API_WORKERS > 1 bật chế độ nhiều worker:
+    tiến trình cha nạp bản đồ vào shared_graphs trước, các worker chỉ mmap file
+    """
+    host = os.environ.get("GRAPH_API_HOST", "0.0.0.0")
+    port = int(os.environ.get("GRAPH_API_PORT", 8000))
+    workers = int(os.environ.get("GRAPH_API_WORKERS", 1))
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    if workers > 1:
+        preload_shared_graphs()
+        uvicorn.run("main:app", host=host, port=port, workers=workers)
+    else:
+        uvicorn.run("main:app", host=host, port=port, reload=True)
+
+if __name__ == "__main__":
+    run_server()
@@ -14,18 +14,37 @@ CÁCH HOẠT ĐỘNG:
     3. Parse kết quả:
         - Ways (đường) → tìm giao điểm
         - Nodes (điểm) → đỉnh đồ thị
-    4. Tạo GraphData với nodes và edges
+    4. Tạo GraphData với nodes và edges (trusted_node/trusted_edge: dữ liệu
+       do parser tự tạo nên không cần Pydantic validate lại)
     5. Nếu fail → dùng sample graph (16 nodes)
+    GRAPH_API_OSM_FILE=<file .osm.pbf/.osm>: đọc file trích xuất cục bộ thay cho
+    Overpass (osm_import.py, không cần mạng)
+    6. simplify=True: co các chuỗi đỉnh bậc 2 (nơi hai way nối tiếp nhau)
+       bằng algorithms/simplification.py, hình học gốc giữ trong metadata
+
+HTTP CLIENT (httpx):
+    - Client dùng chung, giữ kết nối keep-alive (pool giới hạn POOL_LIMITS),
+      timeout kết nối/đọc riêng
+    - Thử lại OVERPASS_RETRIES lần khi lỗi mạng/timeout hoặc HTTP 429/502/503/504,
+      chờ theo Retry-After hoặc backoff lũy thừa có jitter
+    - Chỉ fallback sang sample graph khi đã hết lượt thử
+    - fetch_binh_thanh_roads_async(): bản async cho endpoint (không chặn event
+      loop); các request đồng thời cùng query dùng chung MỘT lần tải (single-flight)
+    - fetch_binh_thanh_roads(): bản đồng bộ cho luồng nền/tiến trình nạp trước
+    - httpx được import lười (khởi động nhanh, xem warmup.py)
 
 SAMPLE GRAPH:
     - 16 nodes tại các giao điểm đường chính
     - 24 edges nối các giao điểm
     - Khu vực: 8 đường lớn ở Bình Thạnh
 """
-import requests
+import asyncio
 import json
+import math
+import os
+import random
 from typing import Dict, List, Tuple
-from models import GraphData, Node, Edge
+from models import GraphData, Node, Edge, trusted_node, trusted_edge, trusted_graph
 import time
 
 # Khu vực trung tâm tọa độ đã chỉ định
@@ -39,27 +58,257 @@ BINH_THANH_BBOX = {
     "east": 106.7240
 }
 
+OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+OVERPASS_TIMEOUT = 25  # giây
+OVERPASS_CONNECT_TIMEOUT = 5.0  # giây
+OVERPASS_RETRIES = int(os.environ.get("GRAPH_API_OVERPASS_RETRIES", 3))
+OVERPASS_BACKOFF = 1.0  # giây, nhân đôi sau mỗi lần thử
+OVERPASS_MAX_BACKOFF = 30.0
+RETRY_STATUS = {429, 502, 503, 504}  # Overpass quá tải / gateway lỗi tạm thời
+OSM_FILE = os.environ.get("GRAPH_API_OSM_FILE", "")  # File OSM cục bộ thay cho Overpass
+POOL_LIMITS = {"max_connections": 8, "max_keepalive_connections": 4, "keepalive_expiry": 30.0}
+
+# Loại đường được lấy
+MAJOR_HIGHWAYS = "trunk|primary|secondary|tertiary"
+ALL_HIGHWAYS = MAJOR_HIGHWAYS + "|unclassified|residential|living_street|service"
+
+EARTH_RADIUS_M = 6371000.0
+
+# Đồ thị mẫu: lưới 4×4 giao lộ giữa 4 đường ngang và 4 đường dọc
+SAMPLE_ROW_STREETS = ["Điện Biên Phủ", "Ung Văn Khiêm", "Nguyễn Gia Trí", "Nguyễn Văn Thương"]
+SAMPLE_COL_STREETS = ["Xô Viết Nghệ Tĩnh", "D5", "Võ Oanh", "Tân Cảng"]
+
+
+def _retry_delay(attempt: int, response=None) -> float:
+    """Thời gian chờ trước lần thử thứ attempt + 1 (ưu tiên header Retry-After)"""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), OVERPASS_MAX_BACKOFF)
+    delay = OVERPASS_BACKOFF * (2 ** attempt)
+    return min(delay * (0.5 + random.random()), OVERPASS_MAX_BACKOFF)
+
+
+def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Khoảng cách giữa hai tọa độ theo mét (công thức Haversine)"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+class RoadGraphBuilder:
+    """
+    Dựng GraphData từ các way OSM: đỉnh tại giao lộ (node được tham chiếu > 1
+    lần) và đầu/cuối way, mỗi đoạn giữa hai đỉnh là một cạnh (trọng số = mét)
+
+    Dùng chung cho Overpass (_parse_osm_to_graph) và file OSM (osm_import.py)
+    """
+    
+    def __init__(self, coords, ref_count: Dict[int, int]):
+        """
+        Tham số:
+            coords: node id → (lat, lon); node thiếu tọa độ (ngoài vùng tải) bị bỏ
+            ref_count: node id → số lần được các way tham chiếu
+        """
+        self.coords = coords
+        self.ref_count = ref_count
+        self.nodes: Dict[str, Node] = {}
+        self.edges: List[Edge] = []
+        self._seen_edges = set()
+    
+    def _add_node(self, ref: int, label) -> str:
+        node_id = str(ref)
+        if node_id not in self.nodes:
+            lat, lon = self.coords[ref]
+            self.nodes[node_id] = trusted_node(node_id, lat, lon, label)
+        return node_id
+    
+    def add_way(self, way_refs, name) -> None:
+        """Thêm một way (danh sách node id theo thứ tự) có tên name"""
+        coords, ref_count = self.coords, self.ref_count
+        refs = [ref for ref in way_refs if ref in coords]
+        if len(refs) < 2:
+            return
+        start = refs[0]
+        length = 0.0
+        for prev, ref in zip(refs, refs[1:]):
+            length += haversine_distance(*coords[prev], *coords[ref])
+            is_last = ref == refs[-1]
+            if ref_count[ref] > 1 or is_last:
+                if ref != start:
+                    u, v = self._add_node(start, name), self._add_node(ref, name)
+                    key = (u, v) if u <= v else (v, u)
+                    if key not in self._seen_edges:
+                        self._seen_edges.add(key)
+                        self.edges.append(trusted_edge(u, v, round(length, 2)))
+                start = ref
+                length = 0.0
+    
+    def build(self, metadata: Dict) -> GraphData:
+        return trusted_graph(list(self.nodes.values()), self.edges, metadata=metadata)
+
+
 class OSMDataFetcher:
     """Lấy và parse dữ liệu OpenStreetMap cho khu vực Quận 1"""
     
     def __init__(self):
-        """Khởi tạo OSM fetcher"""
-        # TODO: Triển khai khởi tạo
-        pass
+        """Khởi tạo OSM fetcher (client HTTP tạo khi cần)"""
+        self.overpass_url = OVERPASS_URL
+        self.bbox = BINH_THANH_BBOX
+        self._client = None
+        self._async_client = None
+        self._async_loop = None
+        # query → Future của lần tải đang chạy (single-flight)
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    @staticmethod
+    def _client_options() -> dict:
+        import httpx
+        return {
+            "timeout": httpx.Timeout(OVERPASS_TIMEOUT + 5, connect=OVERPASS_CONNECT_TIMEOUT),
+            "limits": httpx.Limits(**POOL_LIMITS),
+            "headers": {"User-Agent": "graph-visualization-api (Overpass client)"},
+        }
+    
+    @property
+    def client(self):
+        """httpx.Client dùng chung cho bản đồng bộ"""
+        if self._client is None:
+            import httpx
+            self._client = httpx.Client(**self._client_options())
+        return self._client
+    
+    def _get_async_client(self):
+        """httpx.AsyncClient của event loop hiện tại (pool gắn với loop tạo ra nó)"""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            import httpx
+            self._async_client = httpx.AsyncClient(**self._client_options())
+            self._async_loop = loop
+        return self._async_client
+    
+    async def aclose(self) -> None:
+        """Đóng client async (gọi khi tắt server)"""
+        client, self._async_client, self._async_loop = self._async_client, None, None
+        if client is not None:
+            await client.aclose()
+    
+    def _build_query(self, major_roads_only: bool) -> str:
+        """Tạo Overpass QL query cho bounding box"""
+        highways = MAJOR_HIGHWAYS if major_roads_only else ALL_HIGHWAYS
+        bbox = f"{self.bbox['south']},{self.bbox['west']},{self.bbox['north']},{self.bbox['east']}"
+        return (
+            f"[out:json][timeout:{OVERPASS_TIMEOUT}];"
+            f'way["highway"~"^({highways})$"]({bbox});'
+            "(._;>;);out body;"
+        )
+    
+    def _download(self, query: str) -> Dict:
+        """POST query lên Overpass (đồng bộ), thử lại khi lỗi tạm thời"""
+        import httpx
+        for attempt in range(OVERPASS_RETRIES + 1):
+            response = None
+            try:
+                response = self.client.post(self.overpass_url, data={"data": query})
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    return response.json()
+            except httpx.TransportError:
+                if attempt == OVERPASS_RETRIES:
+                    raise
+            if attempt == OVERPASS_RETRIES:
+                response.raise_for_status()
+            time.sleep(_retry_delay(attempt, response))
+    
+    async def _download_async(self, query: str) -> Dict:
+        """POST query lên Overpass (async), cùng chính sách thử lại với _download()"""
+        import httpx
+        client = self._get_async_client()
+        for attempt in range(OVERPASS_RETRIES + 1):
+            response = None
+            try:
+                response = await client.post(self.overpass_url, data={"data": query})
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    return response.json()
+            except httpx.TransportError:
+                if attempt == OVERPASS_RETRIES:
+                    raise
+            if attempt == OVERPASS_RETRIES:
+                response.raise_for_status()
+            await asyncio.sleep(_retry_delay(attempt, response))
+    
+    def _import_file(self, major_roads_only: bool, simplify: bool) -> GraphData:
+        """Đọc đồ thị từ file OSM cục bộ (GRAPH_API_OSM_FILE)"""
+        from osm_import import import_osm_file
+        try:
+            return self._finalize_graph(import_osm_file(OSM_FILE, major_roads_only), simplify)
+        except (OSError, ValueError):
+            return self._create_sample_graph()
+    
+    def _graph_or_sample(self, osm_data: Dict, simplify: bool = False) -> GraphData:
+        return self._finalize_graph(self._parse_osm_to_graph(osm_data), simplify)
+    
+    def _finalize_graph(self, graph: GraphData, simplify: bool) -> GraphData:
+        if not graph.nodes:
+            return self._create_sample_graph()
+        if simplify:
+            from algorithms.simplification import simplify_graph
+            graph = simplify_graph(graph).graph
+        return graph
         
-    def fetch_binh_thanh_roads(self, major_roads_only: bool = True) -> GraphData:
+    def fetch_binh_thanh_roads(self, major_roads_only: bool = True, simplify: bool = False) -> GraphData:
         """
         Lấy mạng đường thực tế từ khu vực Thành Mỹ Tây sử dụng OSM
         Fallback sang sample data nếu API fail
         
         Tham số:
             major_roads_only: Nếu True, chỉ lấy các đường chính
+            simplify: Nếu True, co các chuỗi đỉnh bậc 2 sau khi parse
             
         Trả về:
             GraphData với các nút giao lộ thực tế và đoạn đường
         """
-        # TODO: Triển khai lấy dữ liệu OSM
-        pass
+        if OSM_FILE:
+            return self._import_file(major_roads_only, simplify)
+        import httpx
+        try:
+            osm_data = self._download(self._build_query(major_roads_only))
+            return self._graph_or_sample(osm_data, simplify)
+        except (httpx.HTTPError, ValueError, KeyError):
+            return self._create_sample_graph()
+    
+    async def fetch_binh_thanh_roads_async(self, major_roads_only: bool = True,
+                                           simplify: bool = False) -> GraphData:
+        """
+        Bản async của fetch_binh_thanh_roads()
+        
+        Các lời gọi đồng thời cùng query chờ chung một lần tải; client ngắt
+        kết nối giữa chừng không hủy lần tải của những người chờ khác
+        """
+        query = self._build_query(major_roads_only)
+        key = f"{query}#simplified" if simplify else query
+        loop = asyncio.get_running_loop()
+        future = self._inflight.get(key)
+        if future is None or future.get_loop() is not loop:
+            future = loop.create_task(self._fetch_async(query, major_roads_only, simplify))
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._inflight.pop(key, None)
+                                     if self._inflight.get(key) is done else None)
+        return await asyncio.shield(future)
+    
+    async def _fetch_async(self, query: str, major_roads_only: bool, simplify: bool) -> GraphData:
+        if OSM_FILE:
+            return await asyncio.to_thread(self._import_file, major_roads_only, simplify)
+        import httpx
+        try:
+            osm_data = await self._download_async(query)
+            # Parse tốn CPU với vùng lớn → chạy ngoài event loop
+            return await asyncio.to_thread(self._graph_or_sample, osm_data, simplify)
+        except (httpx.HTTPError, ValueError, KeyError):
+            return self._create_sample_graph()
     
     def _parse_osm_to_graph(self, osm_data: Dict) -> GraphData:
         """
@@ -68,15 +317,36 @@ class OSMDataFetcher:
         Ways của OSM biểu diễn đường, và nodes biểu diễn điểm trên đường.
         Tạo các nút đồ thị tại giao lộ và điểm cuối đường.
         """
-        # TODO: Triển khai parse OSM
-        pass
+        coords: Dict[int, Tuple[float, float]] = {}
+        ways: List[Dict] = []
+        for element in osm_data.get("elements", []):
+            if element["type"] == "node":
+                coords[element["id"]] = (element["lat"], element["lon"])
+            elif element["type"] == "way" and len(element.get("nodes", [])) >= 2:
+                ways.append(element)
+        
+        # Đếm số lần mỗi node được các way tham chiếu → giao lộ khi > 1
+        ref_count: Dict[int, int] = {}
+        for way in ways:
+            for ref in way["nodes"]:
+                ref_count[ref] = ref_count.get(ref, 0) + 1
+        
+        builder = RoadGraphBuilder(coords, ref_count)
+        for way in ways:
+            builder.add_way(way["nodes"], way.get("tags", {}).get("name"))
+        
+        return builder.build({
+            "source": "OpenStreetMap",
+            "area": "Bình Thạnh, TP.HCM",
+            "bbox": dict(self.bbox),
+            "timestamp": time.time()
+        })
     
     def _calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """
         Tính khoảng cách giữa hai tọa độ theo mét (công thức Haversine)
         """
-        # TODO: Triển khai tính khoảng cách Haversine
-        pass
+        return haversine_distance(lat1, lon1, lat2, lon2)
     
     def _create_sample_graph(self) -> GraphData:
         """
@@ -84,8 +354,41 @@ class OSMDataFetcher:
         Đường: Ung Văn Khiêm, Võ Oanh, Xô Viết Nghệ Tĩnh, 
                Nguyễn Gia Trí, Tân Cảng, Nguyễn Văn Thương, Điện Biên Phủ, D5
         """
-        # TODO: Triển khai tạo đồ thị mẫu
-        pass
+        rows, cols = len(SAMPLE_ROW_STREETS), len(SAMPLE_COL_STREETS)
+        lat_step = (self.bbox["north"] - self.bbox["south"]) / (rows + 1)
+        lon_step = (self.bbox["east"] - self.bbox["west"]) / (cols + 1)
+        
+        nodes: List[Node] = []
+        for r, row_street in enumerate(SAMPLE_ROW_STREETS):
+            for c, col_street in enumerate(SAMPLE_COL_STREETS):
+                nodes.append(trusted_node(
+                    f"N{r * cols + c + 1}",
+                    round(self.bbox["south"] + (r + 1) * lat_step, 6),
+                    round(self.bbox["west"] + (c + 1) * lon_step, 6),
+                    f"{row_street} × {col_street}"
+                ))
+        
+        edges: List[Edge] = []
+        for r in range(rows):
+            for c in range(cols):
+                node = nodes[r * cols + c]
+                neighbors = []
+                if c + 1 < cols:
+                    neighbors.append(nodes[r * cols + c + 1])
+                if r + 1 < rows:
+                    neighbors.append(nodes[(r + 1) * cols + c])
+                for other in neighbors:
+                    distance = self._calculate_distance(node.lat, node.lon, other.lat, other.lon)
+                    edges.append(trusted_edge(node.id, other.id, round(distance, 2)))
+        
+        return trusted_graph(
+            nodes, edges,
+            metadata={
+                "source": "Sample Data",
+                "area": "Bình Thạnh, TP.HCM",
+                "timestamp": time.time()
+            }
+        )
 
 # Singleton instance
 osm_fetcher = OSMDataFetcher()
@@ -0,0 +1,353 @@
+"""
+FILE: metrics.py
+MÔ TẢ: Đo thời gian từng request và các điểm nóng - xuất định dạng Prometheus
+
+CHỨC NĂNG:
+    - Chia thời gian mỗi request thành các pha:
+        + parse      : đọc body + validate Pydantic (trước khi vào endpoint)
+        + index      : dựng chỉ mục/báo cáo cấu trúc (validation.py)
+        + build_graph: GraphData → NetworkX (_build_networkx_graph)
+        + algorithm  : chạy thuật toán
+        + handler    : toàn bộ thời gian trong endpoint
+        + serialize  : từ lúc endpoint trả về đến khi gửi header response
+    - Ghi kích thước đồ thị, số bước trace, tỉ lệ cache hit/miss
+    - GET /api/metrics: định dạng text Prometheus (counter + histogram)
+    - Header "Server-Timing" trên mọi response (xem được trong DevTools)
+
+CÁCH BẬT/TẮT:
+    - Mặc định bật; GRAPH_API_METRICS=0 để tắt
+    - Khi tắt: không cài middleware, TimedRoute không bọc endpoint,
+      phase() trả về một context manager rỗng dùng chung → chi phí ~0
+
+CÁCH HOẠT ĐỘNG:
+    1. TimingMiddleware (ASGI thuần) tạo RequestTimings, lưu vào ContextVar
+    2. TimedRoute bọc endpoint: ghi mốc vào/ra endpoint và tên route
+    3. Mã trong endpoint/GraphAlgorithms gọi `with phase("...")`
+       để cộng dồn thời gian vào request hiện tại
+    4. Khi response bắt đầu: tính serialize/total, thêm Server-Timing,
+       đẩy số liệu vào registry (có khóa, an toàn giữa các thread)
+
+LƯU Ý:
+    - Số liệu nằm trong bộ nhớ của từng process; chạy nhiều worker thì
+      mỗi worker có bộ đếm riêng (Prometheus scrape theo từng instance)
+"""
+import functools
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+
+METRICS_ENABLED = os.environ.get("GRAPH_API_METRICS", "1").lower() not in ("0", "false", "no")
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4"
+
+# Bucket (giây) cho latency; bucket số lượng cho kích thước đồ thị / số bước
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+LabelValues = Tuple[str, ...]
+
+
+class Counter:
+    """Bộ đếm tăng dần có nhãn"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def expose(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} {self.kind}"
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Giá trị tăng/giảm (vd: số request đang xử lý)"""
+
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1.0) -> None:
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram:
+    """Histogram tích lũy theo bucket cố định (chuẩn Prometheus)"""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        # nhãn → [đếm theo từng bucket..., +Inf], tổng, số mẫu
+        self._series: Dict[LabelValues, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][slot] += 1
+            series[1] += value
+            series[2] += 1
+
+    def expose(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = sorted((k, ([*v[0]], v[1], v[2])) for k, v in self._series.items())
+        for label_values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                labels = _format_labels((*self.labels, "le"), (*label_values, le))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+# ==================== Registry ====================
+
+REQUESTS = Counter("graph_api_requests_total", "HTTP requests handled",
+                   ("route", "method", "status"))
+IN_PROGRESS = Gauge("graph_api_requests_in_progress", "HTTP requests currently being handled", ())
+REQUEST_DURATION = Histogram("graph_api_request_duration_seconds", "Total request latency",
+                             ("route",), LATENCY_BUCKETS)
+PHASE_DURATION = Histogram("graph_api_phase_duration_seconds", "Time spent per request phase",
+                           ("route", "phase"), LATENCY_BUCKETS)
+GRAPH_NODES = Histogram("graph_api_graph_nodes", "Node count of graphs processed",
+                        ("route",), SIZE_BUCKETS)
+GRAPH_EDGES = Histogram("graph_api_graph_edges", "Edge count of graphs processed",
+                        ("route",), SIZE_BUCKETS)
+ALGORITHM_STEPS = Histogram("graph_api_algorithm_steps", "Trace steps returned per algorithm run",
+                            ("algorithm",), SIZE_BUCKETS)
+CACHE_REQUESTS = Counter("graph_api_cache_requests_total", "Cache lookups by result",
+                         ("cache", "result"))
+
+REGISTRY = [REQUESTS, IN_PROGRESS, REQUEST_DURATION, PHASE_DURATION,
+            GRAPH_NODES, GRAPH_EDGES, ALGORITHM_STEPS, CACHE_REQUESTS]
+
+
+def render_prometheus() -> str:
+    """Xuất toàn bộ registry theo định dạng text của Prometheus"""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.expose())
+    return "\n".join(lines) + "\n"
+
+
+# ==================== Thời gian theo request ====================
+
+class RequestTimings:
+    """Thời gian các pha của một request (giây, cộng dồn nếu pha lặp lại)"""
+
+    __slots__ = ("started", "route", "handler_entered", "handler_exited", "phases")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.route: Optional[str] = None
+        self.handler_entered: Optional[float] = None
+        self.handler_exited: Optional[float] = None
+        self.phases: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        """Giá trị header Server-Timing (mili giây)"""
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.phases.items())
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("graph_api_request_timings", default=None)
+_NULL_PHASE = nullcontext()
+
+
+@contextmanager
+def _timed_phase(timings: RequestTimings, name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def phase(name: str):
+    """
+    Đo một pha trong request hiện tại
+
+    Cách dùng:
+        with phase("algorithm"):
+            result = algo.bfs(start)
+
+    Ngoài request (script, benchmark) hoặc khi tắt metrics: không làm gì
+    """
+    timings = _current.get()
+    if timings is None:
+        return _NULL_PHASE
+    return _timed_phase(timings, name)
+
+
+def _route_label() -> str:
+    timings = _current.get()
+    return (timings.route if timings is not None else None) or "none"
+
+
+def record_graph(node_count: int, edge_count: int) -> None:
+    """Ghi kích thước đồ thị đang xử lý"""
+    if METRICS_ENABLED:
+        route = _route_label()
+        GRAPH_NODES.observe(node_count, route)
+        GRAPH_EDGES.observe(edge_count, route)
+
+
+def record_steps(algorithm: str, result: Any) -> None:
+    """Ghi số bước trace của kết quả (model hoặc dict có trường steps)"""
+    if not METRICS_ENABLED or result is None:
+        return
+    steps = result.get("steps") if isinstance(result, dict) else getattr(result, "steps", None)
+    if steps is not None:
+        ALGORITHM_STEPS.observe(len(steps), algorithm)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Ghi một lần tra cache"""
+    if METRICS_ENABLED:
+        CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+
+# ==================== Tích hợp FastAPI ====================
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute bọc endpoint để biết mốc vào/ra handler và tên route
+
+    Mốc vào endpoint tách được pha parse (đọc body + validate) khỏi
+    pha serialize (validate response_model + encode) mà không cần sửa FastAPI
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        if METRICS_ENABLED:
+            endpoint = _wrap_endpoint(path, endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _wrap_endpoint(path: str, endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    # functools.wraps giữ __wrapped__ → FastAPI đọc đúng chữ ký gốc
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            timings = _enter_handler(path)
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _exit_handler(timings)
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def sync_wrapper(*args, **kwargs):
+        timings = _enter_handler(path)
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            _exit_handler(timings)
+    return sync_wrapper
+
+
+def _enter_handler(path: str) -> Optional[RequestTimings]:
+    timings = _current.get()
+    if timings is not None:
+        timings.route = path
+        timings.handler_entered = time.perf_counter()
+        timings.add("parse", timings.handler_entered - timings.started)
+    return timings
+
+
+def _exit_handler(timings: Optional[RequestTimings]) -> None:
+    if timings is not None:
+        timings.handler_exited = time.perf_counter()
+        timings.add("handler", timings.handler_exited - timings.handler_entered)
+
+
+class TimingMiddleware:
+    """
+    Middleware ASGI thuần (không dùng BaseHTTPMiddleware để không đệm body
+    và giữ được StreamingResponse)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status = [500]
+        IN_PROGRESS.inc()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                now = time.perf_counter()
+                if timings.handler_exited is not None:
+                    timings.add("serialize", now - timings.handler_exited)
+                timings.add("total", now - timings.started)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            IN_PROGRESS.dec()
+            _current.reset(token)
+            self._record(scope, timings, status[0])
+
+    @staticmethod
+    def _record(scope, timings: RequestTimings, status: int) -> None:
+        # Route chưa khớp (404, static) gom chung một nhãn để tránh bùng nổ nhãn
+        route = timings.route or "unmatched"
+        REQUESTS.inc(route, scope.get("method", ""), str(status))
+        REQUEST_DURATION.observe(time.perf_counter() - timings.started, route)
+        for name, seconds in timings.phases.items():
+            if name != "total":
+                PHASE_DURATION.observe(seconds, route, name)
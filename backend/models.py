@@ -15,6 +15,9 @@ CÁC MODELS CHÍNH:
         - Edge: Cạnh đồ thị (source, target, weight, capacity, directed)
         - GraphData: Đồ thị hoàn chỉnh (nodes, edges, directed, graph_type)
         - GraphType: Enum (UNDIRECTED, DIRECTED, FLOW)
+        - ColumnarGraphData: Đồ thị dạng cột (mảng song song), validate theo khối
+        - GraphInput: Kiểu field `graph` của request - nhận cả dạng cột
+        - GraphValidationReport: Báo cáo cấu trúc (id trùng, cạnh treo, ...)
     
     2. Thực thi thuật toán:
         - AlgorithmRequest: Request chung cho các thuật toán
@@ -39,10 +42,34 @@ CÁC MODELS CHÍNH:
     6. Chuyển đổi:
         - ConversionRequest: Chuyển đổi biểu diễn
         - ConversionResponse: Kết quả chuyển đổi
+        - SimplifyRequest/SimplifyResponse: Co chuỗi đỉnh bậc 2
+          (algorithms/simplification.py)
+        - LandmarkRequest/LandmarkResponse: Tiền xử lý mốc ALT
+          (algorithms/landmarks.py)
+        - IsochroneRequest: Vùng đến được trong bán kính (trả AlgorithmResponse)
+        - ComponentsRequest/ComponentsResponse: Thành phần liên thông
+          (algorithms/components.py)
+        - ViewportResponse: Phần đồ thị trong khung nhìn theo mức chi tiết
+          (viewport.py)
+        - BatchJob/BatchRequest: Nhiều job thuật toán trên một đồ thị (batch.py)
+
+    7. Chẩn đoán:
+        - ProfileResponse: Kết quả chạy thuật toán dưới profiler (profiling.py)
+
+    8. Job nền:
+        - JobStatus: Trạng thái/tiến độ của job trong hàng đợi (jobs.py)
+
+DỰNG MODEL TIN CẬY (không validate lại):
+    - trusted_node / trusted_edge / trusted_graph: dùng model_construct
+    - Chỉ dùng cho dữ liệu do chính server tạo ra (OSM parser, file đã lưu)
+    - trusted_step: AlgorithmStep cho trace của thuật toán
 """
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional, Literal
+from pydantic import BaseModel, BeforeValidator, Field, PrivateAttr, model_validator
+from typing import List, Dict, Any, Callable, Optional, Literal, Annotated
+from contextvars import ContextVar
 from enum import Enum
+from contextlib import contextmanager
+import gc
 
 class GraphType(str, Enum):
     """Các loại đồ thị được hỗ trợ"""
@@ -79,17 +106,204 @@ class GraphData(BaseModel):
     directed: bool = False
     graph_type: GraphType = GraphType.UNDIRECTED
     metadata: Optional[Dict[str, Any]] = None
+    # Cache chỉ mục/báo cáo cấu trúc (algorithms/validation.py), không serialize
+    _index: Any = PrivateAttr(default=None)
+
+class GraphValidationReport(BaseModel):
+    """Báo cáo kiểm tra cấu trúc đồ thị (một lượt duyệt, xem algorithms/validation.py)"""
+    node_count: int
+    edge_count: int
+    is_valid: bool  # Không có id trùng và không có cạnh treo
+    has_negative_weights: bool  # Dijkstra/Prim không dùng được
+    duplicate_node_ids: List[str] = []
+    dangling_edges: List[Dict[str, Any]] = []  # Cạnh trỏ tới đỉnh không tồn tại
+    parallel_edges: List[Dict[str, Any]] = []  # Cạnh trùng cặp đỉnh với cạnh trước
+    self_loops: List[Dict[str, Any]] = []
+    negative_weight_edges: List[Dict[str, Any]] = []
+    truncated: bool = False  # True nếu danh sách chi tiết bị cắt bớt
+
+class ColumnarGraphData(BaseModel):
+    """
+    Đồ thị dạng cột - các mảng song song thay cho danh sách Node/Edge
+
+    Mỗi mảng được validate một lần như List[float]/List[str] (nhanh hơn nhiều
+    so với validate từng Node/Edge), sau đó dựng GraphData bằng model_construct.
+    """
+    node_ids: List[str]
+    lats: List[float]
+    lons: List[float]
+    labels: Optional[List[Optional[str]]] = None
+    edge_sources: List[str]
+    edge_targets: List[str]
+    edge_weights: Optional[List[float]] = None  # Mặc định 1.0
+    edge_directed: Optional[List[bool]] = None  # Mặc định False
+    edge_capacities: Optional[List[Optional[float]]] = None
+    directed: bool = False
+    graph_type: GraphType = GraphType.UNDIRECTED
+    metadata: Optional[Dict[str, Any]] = None
+
+    @model_validator(mode="after")
+    def check_lengths(self) -> "ColumnarGraphData":
+        """Các mảng song song phải cùng độ dài"""
+        n = len(self.node_ids)
+        if len(self.lats) != n or len(self.lons) != n:
+            raise ValueError("node_ids, lats and lons must have the same length")
+        if self.labels is not None and len(self.labels) != n:
+            raise ValueError("labels must have the same length as node_ids")
+        m = len(self.edge_sources)
+        if len(self.edge_targets) != m:
+            raise ValueError("edge_sources and edge_targets must have the same length")
+        for name in ("edge_weights", "edge_directed", "edge_capacities"):
+            column = getattr(self, name)
+            if column is not None and len(column) != m:
+                raise ValueError(f"{name} must have the same length as edge_sources")
+        return self
+
+    def to_graph_data(self) -> GraphData:
+        """Dựng GraphData từ các cột đã validate (không validate lại từng phần tử)"""
+        labels = self.labels or [None] * len(self.node_ids)
+        m = len(self.edge_sources)
+        weights = self.edge_weights or [1.0] * m
+        directed = self.edge_directed or [False] * m
+        capacities = self.edge_capacities or [None] * m
+        with _gc_paused():
+            nodes = [
+                trusted_node(node_id, lat, lon, label)
+                for node_id, lat, lon, label in zip(self.node_ids, self.lats, self.lons, labels)
+            ]
+            edges = [
+                trusted_edge(source, target, weight, edge_directed, capacity)
+                for source, target, weight, edge_directed, capacity
+                in zip(self.edge_sources, self.edge_targets, weights, directed, capacities)
+            ]
+        return trusted_graph(nodes, edges, self.directed, self.graph_type, self.metadata)
+
+    @classmethod
+    def from_graph_data(cls, graph: GraphData) -> "ColumnarGraphData":
+        """Chuyển GraphData sang dạng cột (để gửi cho client)"""
+        nodes, edges = graph.nodes, graph.edges
+        return cls.model_construct(
+            node_ids=[node.id for node in nodes],
+            lats=[node.lat for node in nodes],
+            lons=[node.lon for node in nodes],
+            labels=[node.label for node in nodes],
+            edge_sources=[edge.source for edge in edges],
+            edge_targets=[edge.target for edge in edges],
+            edge_weights=[edge.weight for edge in edges],
+            edge_directed=[edge.directed for edge in edges],
+            edge_capacities=[edge.capacity for edge in edges],
+            directed=graph.directed,
+            graph_type=graph.graph_type,
+            metadata=graph.metadata
+        )
+
+# ==================== Dựng model tin cậy (không validate) ====================
+
+@contextmanager
+def _gc_paused():
+    """
+    Tạm tắt GC khi dựng hàng loạt object không có chu trình tham chiếu
+    (GC thế hệ liên tục quét lại các object mới → chiếm ~nửa thời gian dựng)
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+_object_new = object.__new__
+_object_setattr = object.__setattr__
+
+def _construct(cls, values: Dict[str, Any]):
+    """
+    Giống cls.model_construct(**values) nhưng nhanh hơn khoảng 2 lần:
+    không xử lý alias/default nên `values` phải có đủ mọi field của model
+    """
+    obj = _object_new(cls)
+    _object_setattr(obj, "__dict__", values)
+    _object_setattr(obj, "__pydantic_fields_set__", set(values))
+    _object_setattr(obj, "__pydantic_extra__", None)
+    _object_setattr(obj, "__pydantic_private__", _private_defaults(cls))
+    return obj
+
+def _private_defaults(cls) -> Optional[Dict[str, Any]]:
+    """Giá trị mặc định của private attributes (None nếu model không có)"""
+    private = cls.__private_attributes__
+    if not private:
+        return None
+    return {name: attr.get_default() for name, attr in private.items()}
+
+def trusted_node(node_id: str, lat: float, lon: float, label: Optional[str] = None) -> Node:
+    """Dựng Node từ dữ liệu đã hợp lệ, bỏ qua validation"""
+    return _construct(Node, {"id": node_id, "lat": lat, "lon": lon, "label": label})
+
+def trusted_edge(source: str, target: str, weight: float = 1.0,
+                 directed: bool = False, capacity: Optional[float] = None) -> Edge:
+    """Dựng Edge từ dữ liệu đã hợp lệ, bỏ qua validation"""
+    return _construct(Edge, {
+        "source": source, "target": target, "weight": weight,
+        "directed": directed, "capacity": capacity
+    })
+
+def trusted_graph(nodes: List[Node], edges: List[Edge], directed: bool = False,
+                  graph_type: GraphType = GraphType.UNDIRECTED,
+                  metadata: Optional[Dict[str, Any]] = None) -> GraphData:
+    """Dựng GraphData từ Node/Edge đã hợp lệ, bỏ qua validation"""
+    return _construct(GraphData, {
+        "nodes": nodes, "edges": edges, "directed": directed,
+        "graph_type": GraphType(graph_type), "metadata": metadata
+    })
+
+def trusted_graph_from_dict(data: Dict[str, Any]) -> GraphData:
+    """
+    Dựng GraphData từ dict JSON do chính server ghi ra (vd: file đã lưu)
+
+    Nhận cả dạng GraphData (nodes/edges) lẫn dạng cột (node_ids/...).
+    """
+    if "node_ids" in data:
+        return ColumnarGraphData.model_validate(data).to_graph_data()
+    with _gc_paused():
+        nodes = [
+            trusted_node(n["id"], n["lat"], n["lon"], n.get("label"))
+            for n in data.get("nodes", ())
+        ]
+        edges = [
+            trusted_edge(
+                e["source"], e["target"], e.get("weight", 1.0),
+                e.get("directed", False), e.get("capacity")
+            )
+            for e in data.get("edges", ())
+        ]
+    return trusted_graph(
+        nodes, edges, data.get("directed", False),
+        data.get("graph_type", GraphType.UNDIRECTED), data.get("metadata")
+    )
+
+def _coerce_graph_input(value: Any) -> Any:
+    """Nếu client gửi đồ thị dạng cột, validate theo khối rồi dựng GraphData"""
+    if isinstance(value, dict) and "node_ids" in value:
+        return ColumnarGraphData.model_validate(value).to_graph_data()
+    return value
+
+# Kiểu của field `graph` trong request: GraphData hoặc ColumnarGraphData
+GraphInput = Annotated[GraphData, BeforeValidator(_coerce_graph_input)]
 
 class AlgorithmRequest(BaseModel):
     """Request để thực thi thuật toán"""
-    graph: GraphData
+    graph: GraphInput
     algorithm: Literal["bfs", "dfs", "shortest_path", "bipartite"]
     start_node: Optional[str] = None
     end_node: Optional[str] = None
+    # Chỉ cho shortest_path: "auto" = A* ALT nếu đồ thị đã có bảng mốc (algorithms/landmarks.py)
+    method: Literal["auto", "dijkstra", "alt"] = "auto"
+    # False = chỉ trả kết quả (không trace) → BFS/bipartite dùng đường NumPy nếu có
+    include_steps: bool = True
 
 class MSTRequest(BaseModel):
     """Request cho thuật toán MST (Prim, Kruskal)"""
-    graph: GraphData
+    graph: GraphInput
     algorithm: Literal["prim", "kruskal"]
     start_node: Optional[str] = None  # Cho thuật toán Prim
 
@@ -100,11 +314,13 @@ class MSTResponse(BaseModel):
     steps: List["AlgorithmStep"]
     mst_edges: List[Dict[str, Any]]
     total_weight: float
+    component_count: int = 1  # > 1: đồ thị không liên thông → rừng khung nhỏ nhất
+    parallel: bool = False  # Kruskal đã chạy từng thành phần trong process pool (partition.py)
     error: Optional[str] = None
 
 class MaxFlowRequest(BaseModel):
     """Request cho thuật toán luồng cực đại (Ford-Fulkerson)"""
-    graph: GraphData
+    graph: GraphInput
     source_node: str
     sink_node: str
 
@@ -119,7 +335,7 @@ class MaxFlowResponse(BaseModel):
 
 class EulerianRequest(BaseModel):
     """Request cho thuật toán đường đi/chu trình Euler (Fleury, Hierholzer)"""
-    graph: GraphData
+    graph: GraphInput
     algorithm: Literal["fleury", "hierholzer"]
     start_node: Optional[str] = None
 
@@ -135,10 +351,18 @@ class EulerianResponse(BaseModel):
     error: Optional[str] = None
 
 class ConversionRequest(BaseModel):
-    """Request để chuyển đổi biểu diễn đồ thị"""
-    graph: GraphData
-    from_format: Literal["adjacency_matrix", "adjacency_list", "edge_list"]
+    """Request để chuyển đổi biểu diễn đồ thị
+
+    Nguồn là `graph` (from_format="graph") hoặc dữ liệu thô `data` ở
+    from_format; dữ liệu thô được chuyển trực tiếp, không dựng Node/Edge.
+    """
+    graph: Optional[GraphInput] = None
+    data: Optional[Dict[str, Any]] = None  # Dữ liệu thô ở định dạng from_format
+    directed: bool = False  # Chỉ dùng cho data thô
+    from_format: Literal["graph", "adjacency_matrix", "adjacency_list", "edge_list"]
     to_format: Literal["adjacency_matrix", "adjacency_list", "edge_list"]
+    matrix_layout: Literal["dense", "coo", "csr"] = "dense"  # Cho adjacency_matrix
+    encoding: Literal["json", "binary"] = "json"  # binary: xem algorithms/conversion.py
 
 class AlgorithmStep(BaseModel):
     """Một bước trong quá trình thực thi thuật toán"""
@@ -164,6 +388,33 @@ class AlgorithmResponse(BaseModel):
     result: Any
     error: Optional[str] = None
 
+# Hàm được gọi mỗi khi sinh một bước - job nền (jobs.py) đếm tiến độ và dừng
+# job đã bị hủy tại đây; None (mặc định) ngoài job nền
+step_listener: ContextVar[Optional[Callable[[], None]]] = ContextVar("step_listener", default=None)
+
+def trusted_step(step: int, action: str, description: str, node: Optional[str] = None,
+                 **fields: Any) -> AlgorithmStep:
+    """
+    Dựng AlgorithmStep không validate - cho thuật toán sinh hàng nghìn bước
+
+    fields: các field tùy chọn khác của AlgorithmStep (distance, parent, queue, ...)
+    """
+    listener = step_listener.get()
+    if listener is not None:
+        listener()
+    values = {
+        "step": step, "action": action, "node": node, "edge": None,
+        "visited": [], "queue": [], "stack": [], "distance": None, "parent": None,
+        "mst_edges": None, "current_flow": None, "sets": None, "description": description
+    }
+    values.update(fields)
+    return _construct(AlgorithmStep, values)
+
+# Giải quyết forward reference "AlgorithmStep" của các response khai báo trước nó
+MSTResponse.model_rebuild()
+MaxFlowResponse.model_rebuild()
+EulerianResponse.model_rebuild()
+
 class ConversionResponse(BaseModel):
     """Response từ chuyển đổi biểu diễn"""
     success: bool
@@ -172,10 +423,113 @@ class ConversionResponse(BaseModel):
     data: Any
     error: Optional[str] = None
 
+class SimplifyRequest(BaseModel):
+    """Request rút gọn đồ thị (co chuỗi đỉnh bậc 2)"""
+    graph: GraphInput
+    keep_nodes: List[str] = []  # Đỉnh luôn giữ lại (vd: nguồn/đích đã chọn)
+
+class SimplifyResponse(BaseModel):
+    """Response rút gọn; hình học đã co nằm trong graph.metadata["chains"]"""
+    success: bool
+    graph: Optional[GraphData] = None
+    original_node_count: int = 0
+    original_edge_count: int = 0
+    node_count: int = 0
+    edge_count: int = 0
+    contracted_nodes: int = 0
+    error: Optional[str] = None
+
+class IsochroneRequest(BaseModel):
+    """Request vùng đến được trong bán kính (algorithms/isochrone.py)"""
+    graph: GraphInput
+    sources: List[str] = Field(..., min_length=1)
+    radius: float = Field(..., ge=0)  # Cùng đơn vị với trọng số (mét với bản đồ OSM)
+    include_steps: bool = False
+    hull: bool = False
+
+class ComponentsRequest(BaseModel):
+    """Request nhãn thành phần liên thông (algorithms/components.py)"""
+    graph: GraphInput
+    kind: Literal["weak", "strong"] = "weak"  # "strong" chỉ khác "weak" với đồ thị có hướng
+    include_labels: bool = True  # False → chỉ số lượng và kích thước
+
+class ComponentsResponse(BaseModel):
+    """Response thành phần liên thông; sizes[c] = số đỉnh của thành phần c"""
+    success: bool
+    kind: Optional[str] = None
+    count: int = 0
+    sizes: List[int] = []
+    largest: int = 0
+    labels: Optional[Dict[str, int]] = None  # {đỉnh: nhãn thành phần}
+    error: Optional[str] = None
+
+class LandmarkRequest(BaseModel):
+    """Request tiền xử lý mốc ALT cho tìm đường"""
+    graph: GraphInput
+    count: int = Field(8, ge=1, le=64)
+    strategy: Literal["avoid", "farthest"] = "avoid"
+    persist: bool = True  # Lưu bảng mốc vào saved_graphs/landmarks/
+
+class LandmarkResponse(BaseModel):
+    """Response tiền xử lý mốc ALT"""
+    success: bool
+    landmarks: List[str] = []
+    strategy: Optional[str] = None
+    node_count: int = 0
+    table_bytes: int = 0
+    build_ms: float = 0.0
+    persisted: bool = False
+    error: Optional[str] = None
+
+class ViewportResponse(BaseModel):
+    """Response khung nhìn (dạng cột); counts chỉ có ở mức "cluster" (số đỉnh gốc mỗi cụm)"""
+    success: bool
+    level: Optional[Literal["full", "simplified", "cluster"]] = None
+    zoom: Optional[int] = None
+    bbox: List[float] = []
+    node_ids: List[str] = []
+    lats: List[float] = []
+    lons: List[float] = []
+    counts: Optional[List[int]] = None
+    edge_sources: List[str] = []
+    edge_targets: List[str] = []
+    edge_coords: List[List[List[float]]] = []  # Polyline [[lat, lon], ...] của từng cạnh
+    total_nodes: int = 0  # Số đỉnh trong bbox trước khi cắt theo limit
+    truncated: bool = False
+    graph_node_count: int = 0
+    graph_edge_count: int = 0
+    error: Optional[str] = None
+
+class BatchJob(BaseModel):
+    """Một job trong /api/batch: params = body của endpoint tương ứng, bỏ field graph"""
+    id: Optional[str] = None  # Do client đặt, trả lại nguyên vẹn trong kết quả
+    algorithm: str  # Tên theo đường dẫn endpoint: "bfs", "shortest-path", "kruskal", ...
+    params: Dict[str, Any] = {}
+
+class BatchRequest(BaseModel):
+    """Request chạy nhiều job thuật toán trên cùng một đồ thị"""
+    graph: GraphInput
+    jobs: List[BatchJob] = Field(..., min_length=1, max_length=256)
+
+class JobStatus(BaseModel):
+    """Trạng thái một job nền (jobs.py); thời điểm là epoch giây"""
+    job_id: str
+    algorithm: str
+    priority: int = 0
+    status: Literal["queued", "running", "done", "failed", "cancelled"]
+    steps_done: int = 0  # Số bước thuật toán đã sinh (chỉ thuật toán có trace)
+    wait_ms: float = 0  # Thời gian chờ trong hàng đợi
+    elapsed_ms: float = 0  # Thời gian chạy (đến hiện tại nếu đang chạy)
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    cancel_requested: bool = False  # Đã yêu cầu hủy, job đang chạy sẽ dừng ở bước kế tiếp
+    error: Optional[str] = None
+
 class SaveGraphRequest(BaseModel):
     """Request để lưu đồ thị"""
     name: str
-    graph: GraphData
+    graph: GraphInput
 
 class SaveGraphResponse(BaseModel):
     """Response từ thao tác lưu"""
@@ -191,7 +545,7 @@ class LoadGraphResponse(BaseModel):
 
 class AddEdgeRequest(BaseModel):
     """Request để thêm cạnh thủ công"""
-    graph: GraphData
+    graph: GraphInput
     source: str
     target: str
     weight: float = 1.0
@@ -200,11 +554,26 @@ class AddEdgeRequest(BaseModel):
 
 class DeleteNodeRequest(BaseModel):
     """Request để xóa đỉnh"""
-    graph: GraphData
+    graph: GraphInput
     node_id: str
 
 class DeleteEdgeRequest(BaseModel):
     """Request để xóa cạnh"""
-    graph: GraphData
+    graph: GraphInput
     source: str
     target: str
+
+class ProfileResponse(BaseModel):
+    """Response từ endpoint profiling (xem profiling.py)"""
+    success: bool
+    algorithm: str
+    mode: Literal["sampling", "deterministic"]
+    duration_ms: float
+    result_success: Optional[bool] = None  # success của kết quả thuật toán
+    result_error: Optional[str] = None
+    sample_count: Optional[int] = None
+    top_functions: List[Dict[str, Any]] = []
+    folded_stacks: Optional[str] = None  # Chỉ có ở mode="sampling"
+    allocations: Optional[Dict[str, Any]] = None  # peak_kb + top dòng cấp phát
+    stored_as: Optional[str] = None  # Tên file trong backend/profiles/
+    error: Optional[str] = None
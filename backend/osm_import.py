@@ -0,0 +1,373 @@
+"""
+FILE: osm_import.py
+MÔ TẢ: Nhập bản đồ offline từ file OSM (.osm.pbf / .osm / .osm.bz2 / .osm.gz)
+
+CHỨC NĂNG:
+    - Đọc file trích xuất OSM (vd: Geofabrik, BBBike) KHÔNG cần mạng
+    - Đọc theo luồng: PBF giải nén từng block, XML dùng iterparse và xóa phần
+      tử đã đọc → bộ nhớ chỉ tỉ lệ với số node được đường tham chiếu, không
+      với kích thước file
+    - Lọc loại đường giống OSMDataFetcher (major_roads_only)
+    - Kết quả: GraphData (cùng cách tách giao lộ với map_data.RoadGraphBuilder),
+      hoặc ghi thẳng file .gshm (shared_graphs.py) / đồ thị đã lưu (saved_graphs)
+    - Báo cáo tốc độ nhập (phần tử/giây) của từng lượt
+
+CÁCH HOẠT ĐỘNG (hai lượt):
+    Lượt 1: chỉ đọc way có highway phù hợp → đếm số lần mỗi node được tham chiếu
+    Lượt 2: đọc node → giữ tọa độ các node đã đếm; đọc lại way → dựng cạnh
+            (node tham chiếu > 1 lần là giao lộ)
+    File phải được sắp xếp chuẩn (node trước way) - mọi bản trích xuất phổ
+    biến đều như vậy; file không sắp xếp bị báo lỗi
+
+ĐỊNH DẠNG PBF (giải mã thuần Python, không cần thư viện protobuf):
+    [độ dài BlobHeader u32 big-endian][BlobHeader][Blob (raw/zlib/lzma)]
+    Blob "OSMData" → PrimitiveBlock: bảng chuỗi + các nhóm node/dense/way
+
+CÁCH DÙNG:
+    python -m osm_import ho-chi-minh.osm.pbf --shared binh_thanh_major
+        → /api/map-data phục vụ bản đồ vừa nhập
+    python -m osm_import city.osm.bz2 --all-roads --save hcm_all
+        → GRAPH_API_DEFAULT_GRAPH=hcm_all.json để khởi động ấm (warmup.py)
+    Hoặc đặt GRAPH_API_OSM_FILE=<file> để OSMDataFetcher đọc file thay cho Overpass
+
+LƯU Ý:
+    - File cài bằng --shared hết hạn sau GRAPH_API_SHARED_TTL như mọi đồ thị
+      dùng chung; đặt thêm GRAPH_API_OSM_FILE để server tự nhập lại từ file
+"""
+import argparse
+import bz2
+import gzip
+import lzma
+import struct
+import time
+import zlib
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from xml.etree.ElementTree import iterparse
+
+from map_data import ALL_HIGHWAYS, MAJOR_HIGHWAYS, RoadGraphBuilder
+from models import GraphData
+
+NODE, WAY = "node", "way"
+
+# ==================== Giải mã protobuf tối thiểu ====================
+
+
+def _varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _fields(buf: bytes) -> Iterator[Tuple[int, Any]]:
+    """Duyệt (số field, giá trị) của một message; length-delimited trả về bytes"""
+    pos, end = 0, len(buf)
+    while pos < end:
+        key, pos = _varint(buf, pos)
+        field, wire = key >> 3, key & 7
+        if wire == 0:
+            value, pos = _varint(buf, pos)
+        elif wire == 2:
+            length, pos = _varint(buf, pos)
+            value = buf[pos:pos + length]
+            pos += length
+        elif wire == 1:
+            value = buf[pos:pos + 8]
+            pos += 8
+        elif wire == 5:
+            value = buf[pos:pos + 4]
+            pos += 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire}")
+        yield field, value
+
+
+def _packed(buf: bytes) -> List[int]:
+    values, pos, end = [], 0, len(buf)
+    while pos < end:
+        value, pos = _varint(buf, pos)
+        values.append(value)
+    return values
+
+
+def _zigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def _int64(value: int) -> int:
+    """int64 (không zigzag): số âm được mã hóa bù hai 64 bit"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _packed_sint_delta(buf: bytes) -> List[int]:
+    """Mảng sint64 đóng gói, mã hóa delta (id, lat, lon, refs)"""
+    return list(accumulate(_zigzag(v) for v in _packed(buf)))
+
+
+def _pbf_blocks(f) -> Iterator[bytes]:
+    """Các PrimitiveBlock (đã giải nén) của file PBF"""
+    while True:
+        prefix = f.read(4)
+        if len(prefix) < 4:
+            return
+        header = f.read(struct.unpack(">I", prefix)[0])
+        blob_type, size = "", 0
+        for field, value in _fields(header):
+            if field == 1:
+                blob_type = value.decode("utf-8")
+            elif field == 3:
+                size = value
+        blob = f.read(size)
+        if blob_type != "OSMData":
+            continue  # OSMHeader: không cần cho việc dựng đồ thị
+        data = None
+        for field, value in _fields(blob):
+            if field == 1:
+                data = value
+            elif field == 3:
+                data = zlib.decompress(value)
+            elif field == 4:
+                data = lzma.decompress(value)
+            elif field in (5, 6, 7):
+                raise ValueError("Unsupported PBF compression (bzip2/lz4/zstd)")
+        if data is not None:
+            yield data
+
+
+def _pbf_way(buf: bytes, strings: List[str]) -> Tuple[List[int], Dict[str, str]]:
+    keys, vals, refs = [], [], []
+    for field, value in _fields(buf):
+        if field == 2:
+            keys = _packed(value)
+        elif field == 3:
+            vals = _packed(value)
+        elif field == 8:
+            refs = _packed_sint_delta(value)
+    return refs, {strings[k]: strings[v] for k, v in zip(keys, vals)}
+
+
+def iter_pbf(path: Path, nodes: bool, ways: bool) -> Iterator[tuple]:
+    """
+    Phần tử của file .osm.pbf: (NODE, id, lat, lon) và (WAY, refs, tags)
+
+    Tham số:
+        nodes / ways: loại phần tử cần giải mã (loại còn lại chỉ được bỏ qua)
+    """
+    with open(path, "rb") as f:
+        for data in _pbf_blocks(f):
+            strings: List[str] = []
+            groups: List[bytes] = []
+            granularity, lat_offset, lon_offset = 100, 0, 0
+            for field, value in _fields(data):
+                if field == 1:
+                    strings = [s.decode("utf-8") for f_, s in _fields(value) if f_ == 1]
+                elif field == 2:
+                    groups.append(value)
+                elif field == 17:
+                    granularity = value
+                elif field == 19:
+                    lat_offset = _int64(value)
+                elif field == 20:
+                    lon_offset = _int64(value)
+            scale = 1e-9 * granularity
+            for group in groups:
+                for field, value in _fields(group):
+                    if field == 2 and nodes:  # DenseNodes
+                        ids = lats = lons = ()
+                        for f_, v in _fields(value):
+                            if f_ == 1:
+                                ids = _packed_sint_delta(v)
+                            elif f_ == 8:
+                                lats = _packed_sint_delta(v)
+                            elif f_ == 9:
+                                lons = _packed_sint_delta(v)
+                        for node_id, lat, lon in zip(ids, lats, lons):
+                            yield NODE, node_id, 1e-9 * lat_offset + scale * lat, 1e-9 * lon_offset + scale * lon
+                    elif field == 1 and nodes:  # Node thường
+                        node_id = lat = lon = 0
+                        for f_, v in _fields(value):
+                            if f_ == 1:
+                                node_id = _zigzag(v)
+                            elif f_ == 8:
+                                lat = _zigzag(v)
+                            elif f_ == 9:
+                                lon = _zigzag(v)
+                        yield NODE, node_id, 1e-9 * lat_offset + scale * lat, 1e-9 * lon_offset + scale * lon
+                    elif field == 3 and ways:
+                        refs, tags = _pbf_way(value, strings)
+                        yield WAY, refs, tags
+
+
+def _open_text(path: Path):
+    name = path.name.lower()
+    if name.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    if name.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def iter_xml(path: Path, nodes: bool, ways: bool) -> Iterator[tuple]:
+    """Phần tử của file .osm (XML, có thể nén bz2/gz) - cùng định dạng với iter_pbf"""
+    with _open_text(path) as f:
+        context = iterparse(f, events=("start", "end"))
+        _, root = next(context)
+        refs: List[int] = []
+        tags: Dict[str, str] = {}
+        for event, elem in context:
+            tag = elem.tag
+            if event == "start":
+                if tag == WAY:
+                    refs, tags = [], {}
+                continue
+            if tag == "nd":
+                refs.append(int(elem.get("ref")))
+            elif tag == "tag":
+                tags[elem.get("k")] = elem.get("v")
+            elif tag == NODE:
+                if nodes:
+                    yield NODE, int(elem.get("id")), float(elem.get("lat")), float(elem.get("lon"))
+                root.clear()  # Giải phóng phần tử đã đọc → bộ nhớ không tăng theo file
+            elif tag == WAY:
+                if ways:
+                    yield WAY, refs, tags
+                root.clear()
+            elif tag == "relation":
+                root.clear()
+
+
+def iter_osm_file(path: Path, nodes: bool = True, ways: bool = True) -> Iterator[tuple]:
+    """Chọn bộ đọc theo đuôi file"""
+    if path.name.lower().endswith(".pbf"):
+        return iter_pbf(path, nodes, ways)
+    return iter_xml(path, nodes, ways)
+
+
+# ==================== Nhập đồ thị ====================
+
+
+class OSMFileImporter:
+    """Nhập đồ thị đường từ một file OSM (hai lượt đọc theo luồng)"""
+
+    def __init__(self, path, major_roads_only: bool = True):
+        self.path = Path(path)
+        self.major_roads_only = major_roads_only
+        self.highways = set((MAJOR_HIGHWAYS if major_roads_only else ALL_HIGHWAYS).split("|"))
+        self.stats: Dict[str, Any] = {}
+
+    def _road(self, tags: Dict[str, str]) -> bool:
+        return tags.get("highway") in self.highways
+
+    def import_graph(self) -> GraphData:
+        """
+        Đọc file và dựng GraphData
+
+        Trả về:
+            GraphData; metadata["import_stats"] chứa số phần tử + tốc độ từng lượt
+        """
+        if not self.path.is_file():
+            raise FileNotFoundError(f"OSM file not found: {self.path}")
+
+        # Lượt 1: đếm tham chiếu node của các way là đường
+        started = time.perf_counter()
+        ref_count: Dict[int, int] = {}
+        elements = road_ways = 0
+        for _, refs, tags in iter_osm_file(self.path, nodes=False, ways=True):
+            elements += 1
+            if len(refs) >= 2 and self._road(tags):
+                road_ways += 1
+                for ref in refs:
+                    ref_count[ref] = ref_count.get(ref, 0) + 1
+        self.stats["pass1"] = _throughput(elements, time.perf_counter() - started)
+
+        # Lượt 2: tọa độ node được tham chiếu, rồi dựng cạnh từ các way
+        started = time.perf_counter()
+        coords: Dict[int, Tuple[float, float]] = {}
+        builder = RoadGraphBuilder(coords, ref_count)
+        elements = 0
+        seen_way = False
+        for element in iter_osm_file(self.path, nodes=True, ways=True):
+            elements += 1
+            if element[0] == NODE:
+                if seen_way:
+                    raise ValueError("OSM file is not sorted (node after way); sort it with osmium sort")
+                if element[1] in ref_count:
+                    coords[element[1]] = (element[2], element[3])
+            else:
+                seen_way = True
+                _, refs, tags = element
+                if len(refs) >= 2 and self._road(tags):
+                    builder.add_way(refs, tags.get("name"))
+        self.stats["pass2"] = _throughput(elements, time.perf_counter() - started)
+        self.stats.update({
+            "road_ways": road_ways,
+            "referenced_nodes": len(ref_count),
+            "missing_nodes": len(ref_count) - len(coords),  # Way bị cắt ở biên bản trích xuất
+        })
+
+        return builder.build({
+            "source": "OSM file",
+            "file": self.path.name,
+            "major_roads_only": self.major_roads_only,
+            "timestamp": time.time(),
+            "import_stats": dict(self.stats),
+        })
+
+
+def _throughput(elements: int, seconds: float) -> Dict[str, float]:
+    return {
+        "elements": elements,
+        "seconds": round(seconds, 3),
+        "elements_per_second": round(elements / seconds) if seconds > 0 else None,
+    }
+
+
+def import_osm_file(path, major_roads_only: bool = True) -> GraphData:
+    """Nhập file OSM thành GraphData (xem OSMFileImporter)"""
+    return OSMFileImporter(path, major_roads_only).import_graph()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Import a road graph from a local OSM extract")
+    parser.add_argument("file", help=".osm.pbf, .osm, .osm.bz2 or .osm.gz")
+    parser.add_argument("--all-roads", action="store_true", help="include residential/service roads")
+    parser.add_argument("--simplify", action="store_true", help="contract degree-2 chains")
+    parser.add_argument("--output", help="write the binary shared-graph format (.gshm) to this path")
+    parser.add_argument("--shared", metavar="NAME", help="install into the shared graph cache under NAME")
+    parser.add_argument("--save", metavar="NAME", help="save to saved_graphs/ under NAME")
+    args = parser.parse_args(argv)
+
+    importer = OSMFileImporter(args.file, major_roads_only=not args.all_roads)
+    graph = importer.import_graph()
+    for name in ("pass1", "pass2"):
+        stats = importer.stats[name]
+        print(f"{name}: {stats['elements']} elements in {stats['seconds']}s "
+              f"({stats['elements_per_second']} elements/s)")
+    if args.simplify:
+        from algorithms.simplification import simplify_graph
+        graph = simplify_graph(graph).graph
+    print(f"graph: {len(graph.nodes)} nodes, {len(graph.edges)} edges "
+          f"({importer.stats['missing_nodes']} referenced nodes outside the extract)")
+
+    if args.output:
+        from shared_graphs import write_shared_graph
+        write_shared_graph(Path(args.output), Path(args.output).stem, graph)
+        print(f"written: {args.output}")
+    if args.shared:
+        from shared_graphs import shared_graphs, write_shared_graph
+        write_shared_graph(shared_graphs.directory / f"{args.shared}.gshm", args.shared, graph)
+        print(f"installed: {shared_graphs.directory / args.shared}.gshm")
+    if args.save:
+        from graph_storage import graph_storage
+        result = graph_storage.save_graph(args.save, graph)
+        print(f"saved: {result.filename}" if result.success else f"save failed: {result.error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+FILE: profiling.py
+MÔ TẢ: Profiling theo yêu cầu cho từng request thuật toán (chẩn đoán điểm nóng)
+
+CHỨC NĂNG:
+    - Chạy một request thuật toán dưới profiler và trả về:
+        + mode="sampling"     : lấy mẫu stack mỗi ~2ms → "folded stacks"
+                                (định dạng của flamegraph.pl / speedscope / inferno)
+        + mode="deterministic": cProfile → bảng hàm theo thời gian tích lũy,
+                                file .prof (mở bằng snakeviz, gprof2dot, flameprof)
+    - Thống kê cấp phát bộ nhớ bằng tracemalloc (đỉnh + top dòng mã)
+    - Lưu profile vào backend/profiles/ để tải về sau
+
+BẢO VỆ (guard):
+    - Chỉ bật khi đặt biến môi trường GRAPH_API_PROFILING_TOKEN
+    - Request phải gửi header "X-Profile-Token" khớp token
+    - Không đặt token → endpoint trả 404 như không tồn tại
+
+CÁCH HOẠT ĐỘNG (sampling):
+    1. Luồng lấy mẫu đọc sys._current_frames() của luồng chạy thuật toán
+    2. Mỗi stack được ghép "hàm_ngoài;...;hàm_trong" và đếm số lần gặp
+    3. Độ phân giải thực tế bị giới hạn bởi GIL switch interval (~5ms)
+       nên khoảng lấy mẫu nhỏ hơn không thêm độ chính xác
+"""
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+PROFILING_TOKEN = os.environ.get("GRAPH_API_PROFILING_TOKEN", "")
+PROFILE_DIR = Path(__file__).parent / "profiles"
+
+SAMPLE_INTERVAL = 0.002  # giây
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 20
+
+# tracemalloc/cProfile là trạng thái toàn cục → mỗi lúc chỉ profile một request
+_profile_lock = threading.Lock()
+
+
+def profiling_enabled() -> bool:
+    """Profiling chỉ bật khi đã cấu hình token"""
+    return bool(PROFILING_TOKEN)
+
+
+def check_token(token: Optional[str]) -> bool:
+    """So sánh token trong thời gian hằng (tránh timing attack)"""
+    return profiling_enabled() and token is not None and hmac.compare_digest(token, PROFILING_TOKEN)
+
+
+class SamplingProfiler:
+    """Profiler lấy mẫu stack của một luồng, xuất folded stacks"""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._target: Optional[int] = None
+        self._root_code = None
+
+    def start(self, thread_id: int, root_code=None) -> None:
+        """Bắt đầu lấy mẫu luồng thread_id; các frame từ root_code trở ra ngoài bị bỏ"""
+        self._target = thread_id
+        self._root_code = root_code
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and frame.f_code is not self._root_code:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        """Định dạng folded stacks: mỗi dòng "a;b;c <số mẫu>" """
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+    def top_functions(self, limit: int = TOP_FUNCTIONS) -> List[Dict[str, Any]]:
+        """
+        Hàm chiếm nhiều mẫu nhất, xếp theo self (đang ở đỉnh stack) rồi total
+        (có mặt trong stack)
+        """
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.samples.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for name in set(frames):
+                total[name] += count
+        all_samples = sum(self.samples.values()) or 1
+        return [
+            {"function": name, "self_samples": own[name], "total_samples": count,
+             "total_pct": round(100 * count / all_samples, 1)}
+            for name, count in sorted(total.items(), key=lambda item: (-own[item[0]], -item[1]))[:limit]
+        ]
+
+
+def _cprofile_top(profile: cProfile.Profile, limit: int = TOP_FUNCTIONS) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(profile, stream=io.StringIO())
+    rows = []
+    for (filename, line, name), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{name} ({Path(filename).name}:{line})",
+            "calls": ncalls,
+            "self_ms": round(tottime * 1000, 3),
+            "cumulative_ms": round(cumtime * 1000, 3),
+        })
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:limit]
+
+
+def _allocation_stats(snapshot: tracemalloc.Snapshot, peak: int) -> Dict[str, Any]:
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+    top = [
+        {"location": f"{Path(stat.traceback[0].filename).name}:{stat.traceback[0].lineno}",
+         "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+        for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+    ]
+    return {"peak_kb": round(peak / 1024, 1), "top": top}
+
+
+def _store(algorithm: str, suffix: str, write: Callable[[Path], None]) -> str:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{algorithm}{suffix}"
+    write(PROFILE_DIR / filename)
+    return filename
+
+
+def profile_call(fn: Callable[[], Any], algorithm: str, mode: str = "sampling",
+                 allocations: bool = True, store: bool = False) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Chạy fn() dưới profiler
+
+    Tham số:
+        fn: Hàm không tham số chạy thuật toán (vd: lambda: _run_basic_algorithm(...))
+        algorithm: Tên thuật toán (dùng đặt tên file lưu)
+        mode: "sampling" hoặc "deterministic"
+        allocations: Bật tracemalloc (làm chậm thuật toán ~2-4 lần)
+        store: Lưu profile vào PROFILE_DIR
+
+    Trả về:
+        (kết quả của fn, báo cáo profile dạng dict)
+    """
+    with _profile_lock:
+        return _profile_locked(fn, algorithm, mode, allocations, store)
+
+
+def _profile_locked(fn: Callable[[], Any], algorithm: str, mode: str,
+                    allocations: bool, store: bool) -> Tuple[Any, Dict[str, Any]]:
+    sampler = SamplingProfiler() if mode == "sampling" else None
+    profiler = cProfile.Profile() if mode == "deterministic" else None
+
+    if allocations:
+        tracemalloc.start()
+    started = time.perf_counter()
+    if sampler is not None:
+        sampler.start(threading.get_ident(), _profile_locked.__code__)
+    if profiler is not None:
+        profiler.enable()
+    try:
+        result = fn()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if sampler is not None:
+            sampler.stop()
+        duration = time.perf_counter() - started
+        allocation_report = None
+        if allocations:
+            _, peak = tracemalloc.get_traced_memory()
+            allocation_report = _allocation_stats(tracemalloc.take_snapshot(), peak)
+            tracemalloc.stop()
+
+    report: Dict[str, Any] = {
+        "mode": mode,
+        "duration_ms": round(duration * 1000, 3),
+        "allocations": allocation_report,
+        "folded_stacks": None,
+        "stored_as": None,
+    }
+    if sampler is not None:
+        report["folded_stacks"] = sampler.folded()
+        report["top_functions"] = sampler.top_functions()
+        report["sample_count"] = sum(sampler.samples.values())
+        if store:
+            report["stored_as"] = _store(
+                algorithm, ".folded", lambda path: path.write_text(report["folded_stacks"], encoding="utf-8")
+            )
+    else:
+        report["top_functions"] = _cprofile_top(profiler)
+        report["sample_count"] = None
+        if store:
+            report["stored_as"] = _store(algorithm, ".prof", lambda path: profiler.dump_stats(str(path)))
+    return result, report
+
+
+def stored_profile_path(filename: str) -> Optional[Path]:
+    """Đường dẫn file profile đã lưu (chỉ basename, chống path traversal)"""
+    path = PROFILE_DIR / Path(filename).name
+    return path if path.is_file() else None
@@ -0,0 +1,262 @@
+"""
+FILE: result_cache.py
+MÔ TẢ: Cache kết quả thuật toán theo nội dung đồ thị + tham số
+
+CHỨC NĂNG:
+    - Khóa cache = hash(nội dung đồ thị, thuật toán, tham số, CACHE_VERSION)
+      → cùng đồ thị + cùng start/end luôn cho cùng kết quả, không cần tính lại
+    - Giới hạn bộ nhớ: số entry tối đa + tổng dung lượng tối đa, loại bỏ LRU
+    - TTL cho mỗi entry
+    - Lưu đĩa tùy chọn (sống qua restart, dùng chung giữa các worker), có
+      giới hạn dung lượng
+    - ETag = digest của khóa → client gửi If-None-Match để nhận 304
+      mà server không cần chạy thuật toán hay tra cache
+
+CẤU HÌNH (biến môi trường):
+    GRAPH_API_RESULT_CACHE=0           Tắt cache
+    GRAPH_API_RESULT_CACHE_ENTRIES     Số entry tối đa trong bộ nhớ (512)
+    GRAPH_API_RESULT_CACHE_MB          Dung lượng tối đa trong bộ nhớ (64 MB)
+    GRAPH_API_RESULT_CACHE_TTL         Thời gian sống, giây (600)
+    GRAPH_API_RESULT_CACHE_DIR         Thư mục lưu đĩa (bỏ trống = không lưu)
+    GRAPH_API_RESULT_CACHE_DISK_MB     Dung lượng đĩa tối đa (256 MB)
+
+CÁCH HOẠT ĐỘNG:
+    1. graph_content_hash() (algorithms/validation.py): blake2b trên JSON
+       của đồ thị → 16 byte hex, nhớ trên GraphIndex
+    2. make_key(): ghép hash đồ thị + thuật toán + tham số (JSON sắp xếp khóa)
+    3. get(): bộ nhớ (OrderedDict, move_to_end khi hit) → đĩa → None
+    4. put(): chỉ lưu kết quả success=True; ước lượng kích thước bằng độ dài
+       JSON, loại entry cũ nhất đến khi đủ chỗ
+    5. Đĩa: ghi file tạm tên duy nhất (mkstemp) rồi os.replace → nhiều worker
+       ghi cùng khóa không giẫm lên nhau; vượt dung lượng → quét thư mục, xóa
+       file cũ nhất (theo mtime) đến khi còn DISK_TRIM_RATIO giới hạn
+
+LƯU Ý:
+    - Thuật toán phải tất định; khi đổi cài đặt thuật toán hãy tăng CACHE_VERSION
+      để khóa (và ETag) cũ không còn khớp
+    - Khóa theo NỘI DUNG đồ thị: đồ thị bị sửa có hash mới, entry cũ vẫn đúng
+      cho nội dung cũ (client có thể hoàn tác) nên không xóa - LRU/TTL tự dọn
+    - Cache chỉ là tăng tốc: lỗi ghi đĩa (đầy đĩa, thiếu quyền) chỉ ghi log,
+      request vẫn trả kết quả bình thường
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from algorithms.validation import graph_content_hash
+from metrics import record_cache
+from models import GraphData
+
+CACHE_VERSION = "1"
+# Dọn đĩa xuống còn tỉ lệ này của giới hạn (tránh quét thư mục ở mỗi lần ghi)
+DISK_TRIM_RATIO = 0.8
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+class CacheKey:
+    """Khóa cache: hash đồ thị (tiền tố tên file) + digest đầy đủ"""
+
+    __slots__ = ("graph_hash", "digest")
+
+    def __init__(self, graph_hash: str, digest: str):
+        self.graph_hash = graph_hash
+        self.digest = digest
+
+    @property
+    def etag(self) -> str:
+        # Weak ETag: cùng nội dung nhưng có thể khác mã hóa (JSON/msgpack/gzip)
+        return f'W/"{self.digest}"'
+
+    @property
+    def filename(self) -> str:
+        return f"{self.graph_hash}-{self.digest}.json"
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at")
+
+    def __init__(self, value: BaseModel, size: int, expires_at: float):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
+
+class ResultCache:
+    """Cache LRU + TTL cho kết quả thuật toán, có thể lưu đĩa"""
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 64 * 1024 * 1024,
+                 ttl: float = 600.0, cache_dir: Optional[str] = None, enabled: bool = True,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        # Ước lượng dung lượng thư mục (gồm file của worker khác), đo lại mỗi lần dọn
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+
+    def make_key(self, graph_data: GraphData, algorithm: str, params: Dict[str, Any]) -> CacheKey:
+        """
+        Tạo khóa cache
+
+        Tham số:
+            graph_data: Đồ thị đầu vào
+            algorithm: Tên thuật toán
+            params: Tham số còn lại của request (start_node, end_node, ...)
+        """
+        graph_hash = graph_content_hash(graph_data)
+        material = json.dumps([CACHE_VERSION, graph_hash, algorithm, params],
+                              sort_keys=True, separators=(",", ":"), default=str)
+        digest = hashlib.blake2b(material.encode("utf-8"), digest_size=16).hexdigest()
+        return CacheKey(graph_hash, digest)
+
+    def get(self, key: CacheKey, model: Type[M]) -> Optional[M]:
+        """Tra cache (bộ nhớ rồi đĩa); None nếu không có hoặc đã hết hạn"""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key.digest)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._entries.move_to_end(key.digest)
+                    record_cache("result", True)
+                    return entry.value
+                self._remove(key.digest)
+
+        value = self._load_from_disk(key, model)
+        record_cache("result", value is not None)
+        if value is not None:
+            self._store_in_memory(key, value, len(value.__pydantic_serializer__.to_json(value)))
+        return value
+
+    def put(self, key: CacheKey, value: BaseModel) -> None:
+        """Lưu kết quả (bỏ qua kết quả lỗi - lỗi có thể do điều kiện tạm thời)"""
+        if not self.enabled or not getattr(value, "success", False):
+            return
+        payload = value.__pydantic_serializer__.to_json(value)
+        if len(payload) > self.max_bytes:
+            return
+        self._store_in_memory(key, value, len(payload))
+        if self.cache_dir is not None:
+            self._write_to_disk(key, payload)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes,
+                    "max_entries": self.max_entries, "max_bytes": self.max_bytes}
+
+    # ==================== Nội bộ ====================
+
+    def _store_in_memory(self, key: CacheKey, value: BaseModel, size: int) -> None:
+        with self._lock:
+            if key.digest in self._entries:
+                self._remove(key.digest)
+            self._entries[key.digest] = _Entry(value, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, digest: str) -> None:
+        """Xóa một entry khỏi bộ nhớ (gọi khi đang giữ khóa)"""
+        entry = self._entries.pop(digest, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _write_to_disk(self, key: CacheKey, payload: bytes) -> None:
+        """Ghi file tạm tên duy nhất rồi os.replace; lỗi chỉ ghi log"""
+        path = self.cache_dir / key.filename
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{key.digest}.", suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.chmod(tmp, 0o644)  # mkstemp tạo 0600, worker khác có thể chạy dưới user khác
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("result cache: cannot write %s: %s", path.name, e)
+            if tmp is not None:
+                Path(tmp).unlink(missing_ok=True)
+            return
+        with self._lock:
+            self._disk_bytes += len(payload)
+            over = self._disk_bytes > self.max_disk_bytes
+        if over:
+            self._trim_disk()
+
+    def _disk_files(self) -> List[Tuple[Path, int, float]]:
+        """(đường dẫn, kích thước, mtime) của các file kết quả trên đĩa"""
+        files = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # Worker khác vừa xóa
+            files.append((path, stat.st_size, stat.st_mtime))
+        return files
+
+    def _trim_disk(self) -> None:
+        """Xóa file cũ nhất đến khi tổng dung lượng <= DISK_TRIM_RATIO giới hạn"""
+        files = sorted(self._disk_files(), key=lambda item: item[2])
+        total = sum(size for _, size, _ in files)
+        target = self.max_disk_bytes * DISK_TRIM_RATIO
+        for path, size, _ in files:
+            if total <= target:
+                break
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                continue  # Không xóa được - vẫn tính vào tổng
+            total -= size
+        with self._lock:
+            self._disk_bytes = total
+
+    def _load_from_disk(self, key: CacheKey, model: Type[M]) -> Optional[M]:
+        if self.cache_dir is None:
+            return None
+        path = self.cache_dir / key.filename
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                return None
+            return model.model_validate_json(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+
+
+result_cache = ResultCache(
+    max_entries=_env_int("GRAPH_API_RESULT_CACHE_ENTRIES", 512),
+    max_bytes=_env_int("GRAPH_API_RESULT_CACHE_MB", 64) * 1024 * 1024,
+    ttl=float(os.environ.get("GRAPH_API_RESULT_CACHE_TTL", 600)),
+    cache_dir=os.environ.get("GRAPH_API_RESULT_CACHE_DIR") or None,
+    enabled=os.environ.get("GRAPH_API_RESULT_CACHE", "1").lower() not in ("0", "false", "no"),
+    max_disk_bytes=_env_int("GRAPH_API_RESULT_CACHE_DISK_MB", 256) * 1024 * 1024,
+)
@@ -0,0 +1,372 @@
+"""
+FILE: shared_graphs.py
+MÔ TẢ: Cache đồ thị dùng chung giữa các worker uvicorn (file ánh xạ bộ nhớ)
+
+CHỨC NĂNG:
+    - Đồ thị đã parse được ghi MỘT lần thành file nhị phân, mọi worker mở
+      bằng mmap (chỉ đọc) → các trang nằm chung trong page cache của hệ điều
+      hành, bộ nhớ không nhân theo số worker
+    - Trong file có sẵn JSON response của /api/map-data (dạng đối tượng và
+      dạng cột) → worker trả thẳng bytes (memoryview trên mmap), không dựng
+      lại Node/Edge
+    - Mảng gọn của đồ thị cũng nằm trong file, worker dựng view trên mmap:
+        + adjacency(): IntAdjacency (CSR theo thứ tự cạnh, đã gộp cạnh song
+          song - algorithms/traversal_engine.py) cho BFS/DFS/bipartite/thành phần
+        + node_ids(), coordinates(): id và tọa độ đỉnh cho mức chi tiết "full"
+          của viewport và chỉ mục không gian
+    - Một tiến trình nạp duy nhất: khóa file (fcntl.flock) đảm bảo chỉ
+      một worker/tiến trình tải OSM + dựng file, các worker khác chờ rồi đọc
+    - shared_map_graph_async(): cho endpoint - giữ khóa file rồi mới tải OSM
+      bằng client async (map_data.py), ghi file ở luồng phụ; trong một worker
+      các coroutine xếp hàng trên asyncio.Lock theo tên → chỉ MỘT luồng chờ
+      flock, thread pool mặc định không bị các luồng chờ khóa chiếm hết
+    - Nạp trước từ tiến trình cha (python main.py với GRAPH_API_WORKERS > 1)
+      hoặc chạy tay: python -m shared_graphs
+
+ĐỊNH DẠNG FILE (<tên>.gshm):
+    "GSHM" | version u16 | header_len u32 | header JSON | các section căn 8 byte
+    header: {"meta": {...}, "sections": {tên: [offset, length, typecode]}}
+    section: map_json, map_columnar_json (B) | node_id_offsets (q) + node_id_data
+             (B, UTF-8 nối liền) | lats, lons (d) | adj_offsets, adj_targets (q)
+
+LƯU Ý:
+    - Mảng ghi theo thứ tự byte của máy: file chỉ dùng chung trên cùng máy
+    - GraphData vẫn parse từ JSON trong từng worker khi cần (NetworkX cho
+      Dijkstra/MST/max-flow, mức simplified/cluster của viewport); phần dùng
+      chung là JSON response, CSR, id và tọa độ đỉnh
+
+CẤU HÌNH:
+    GRAPH_API_SHARED_DIR   Thư mục chứa file (mặc định /dev/shm/graph-api
+                           nếu có, ngược lại backend/shared_cache)
+    GRAPH_API_SHARED_TTL   Tuổi tối đa của file, giây (86400)
+"""
+import asyncio
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from pathlib import Path
+from array import array
+from typing import IO, Any, Callable, Dict, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: không có khóa liên tiến trình
+    fcntl = None
+
+from models import ColumnarGraphData, GraphData
+
+MAGIC = b"GSHM"
+VERSION = 2
+_PREFIX = struct.Struct("<4sHI")
+ALIGN = 8
+
+SHARED_TTL = float(os.environ.get("GRAPH_API_SHARED_TTL", 24 * 3600))
+# Đồ thị mẫu (OSM lỗi, xem map_data.py) chỉ giữ ngắn để sớm thử tải lại
+FALLBACK_TTL = 300.0
+
+
+def _default_dir() -> Path:
+    configured = os.environ.get("GRAPH_API_SHARED_DIR")
+    if configured:
+        return Path(configured)
+    shm = Path("/dev/shm")
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return shm / "graph-api"
+    return Path(__file__).resolve().parent / "shared_cache"
+
+
+def _map_payload(graph: GraphData, graph_dict: Dict[str, Any]) -> bytes:
+    """JSON của response /api/map-data (cùng cấu trúc với main.get_map_data)"""
+    return json.dumps({
+        "success": True,
+        "graph": graph_dict,
+        "metadata": {"node_count": len(graph.nodes), "edge_count": len(graph.edges)}
+    }, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _string_table(values: Sequence[str]) -> Tuple[bytes, bytes]:
+    """(offsets 'q', dữ liệu UTF-8 nối liền) của một danh sách chuỗi"""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = array("q", [0]) * (len(encoded) + 1)
+    total = 0
+    for i, item in enumerate(encoded):
+        total += len(item)
+        offsets[i + 1] = total
+    return offsets.tobytes(), b"".join(encoded)
+
+
+def write_shared_graph(path: Path, name: str, graph: GraphData) -> None:
+    """Ghi đồ thị ra file .gshm (ghi file tạm rồi os.replace → nguyên tử)"""
+    from algorithms.traversal_engine import build_int_adjacency
+    graph_dict = graph.model_dump(mode="json")
+    columnar = ColumnarGraphData.from_graph_data(graph).model_dump(mode="json")
+    adj = build_int_adjacency(graph)
+    id_offsets, id_data = _string_table([node.id for node in graph.nodes])
+    sections: Dict[str, Tuple[bytes, str]] = {
+        "map_json": (_map_payload(graph, graph_dict), "B"),
+        "map_columnar_json": (_map_payload(graph, columnar), "B"),
+        "node_id_offsets": (id_offsets, "q"),
+        "node_id_data": (id_data, "B"),
+        "lats": (array("d", [node.lat for node in graph.nodes]).tobytes(), "d"),
+        "lons": (array("d", [node.lon for node in graph.nodes]).tobytes(), "d"),
+        "adj_offsets": (adj.offsets.tobytes(), "q"),
+        "adj_targets": (adj.targets.tobytes(), "q"),
+    }
+    meta = {
+        "name": name, "created_at": time.time(), "directed": graph.directed,
+        "source": (graph.metadata or {}).get("source"),
+        "node_count": len(graph.nodes), "edge_count": len(graph.edges)
+    }
+
+    # Tính offset: header có độ dài phụ thuộc offset nên lặp đến khi ổn định
+    header_len = 0
+    while True:
+        offset = _align(_PREFIX.size + header_len)
+        layout = {}
+        for key, (blob, typecode) in sections.items():
+            layout[key] = [offset, len(blob), typecode]
+            offset = _align(offset + len(blob))
+        header = json.dumps({"meta": meta, "sections": layout}).encode("utf-8")
+        if len(header) == header_len:
+            break
+        header_len = len(header)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PREFIX.pack(MAGIC, VERSION, header_len))
+            f.write(header)
+            for key, (blob, _) in sections.items():
+                f.seek(layout[key][0])
+                f.write(blob)
+        os.chmod(tmp, 0o644)  # mkstemp tạo 0600; worker có thể chạy dưới user khác
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+class SharedStrings:
+    """Dãy chuỗi chỉ đọc trên mmap: giải mã UTF-8 khi truy cập từng phần tử"""
+
+    __slots__ = ("_offsets", "_data")
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return str(self._data[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class SharedGraph:
+    """Một file .gshm đã mmap - section() trả memoryview, không sao chép"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_len = _PREFIX.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a shared graph file: {path}")
+        header = json.loads(self._mm[_PREFIX.size:_PREFIX.size + header_len])
+        self.meta: Dict[str, Any] = header["meta"]
+        self._sections: Dict[str, list] = header["sections"]
+        self._adjacency = None
+
+    def section(self, key: str) -> memoryview:
+        offset, length, typecode = self._sections[key]
+        view = memoryview(self._mm)[offset:offset + length]
+        return view if typecode == "B" else view.cast(typecode)
+
+    def map_json(self, columnar: bool = False) -> memoryview:
+        """Bytes JSON của response /api/map-data"""
+        return self.section("map_columnar_json" if columnar else "map_json")
+
+    def node_ids(self) -> SharedStrings:
+        """Id đỉnh theo thứ tự của đồ thị"""
+        return SharedStrings(self.section("node_id_offsets"), self.section("node_id_data"))
+
+    def coordinates(self) -> Tuple[memoryview, memoryview]:
+        """(lats, lons) dạng memoryview 'd' trên mmap"""
+        return self.section("lats"), self.section("lons")
+
+    def adjacency(self):
+        """IntAdjacency trên mmap (dựng view một lần cho mỗi file đã mở)"""
+        if self._adjacency is None:
+            from algorithms.traversal_engine import IntAdjacency
+            self._adjacency = IntAdjacency(self.node_ids(), self.section("adj_offsets"),
+                                           self.section("adj_targets"), self.meta["directed"])
+        return self._adjacency
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.meta["created_at"]
+
+    def expired(self, ttl: float) -> bool:
+        if self.meta.get("source") == "Sample Data":
+            ttl = min(ttl, FALLBACK_TTL)
+        return self.age > ttl
+
+
+class SharedGraphCache:
+    """Mở (hoặc dựng một lần) các SharedGraph theo tên"""
+
+    def __init__(self, directory: Optional[Path] = None, ttl: float = SHARED_TTL):
+        self.directory = directory or _default_dir()
+        self.ttl = ttl
+        self._open: Dict[str, SharedGraph] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Path:
+        return self.directory / f"{name}.gshm"
+
+    def get(self, name: str) -> Optional[SharedGraph]:
+        """SharedGraph còn hạn nếu đã có file, ngược lại None"""
+        with self._lock:
+            shared = self._open.get(name)
+            path = self._path(name)
+            # File có thể đã được tiến trình khác dựng lại (inode mới)
+            if shared is not None and not shared.expired(self.ttl) and _inode(path) == shared.inode:
+                return shared
+            try:
+                shared = SharedGraph(path)
+            except (OSError, ValueError):
+                return None
+            if shared.expired(self.ttl):
+                return None
+            self._open[name] = shared
+            return shared
+
+    def get_or_build(self, name: str, builder: Callable[[], GraphData]) -> SharedGraph:
+        """
+        Lấy đồ thị dùng chung, dựng nếu chưa có hoặc đã hết hạn
+
+        Chỉ tiến trình giữ khóa file mới gọi builder(); các tiến trình khác
+        chờ khóa rồi đọc file vừa được ghi
+        """
+        shared = self.get(name)
+        if shared is not None:
+            return shared
+        with self.lock_file(name) as lock_file:
+            _lock(lock_file)
+            shared = self.get(name)  # Tiến trình khác có thể vừa dựng xong
+            if shared is None:
+                self.write(name, builder())
+                shared = self.get(name)
+        if shared is None:
+            raise RuntimeError(f"Failed to build shared graph: {name}")
+        return shared
+
+    def write(self, name: str, graph: GraphData) -> None:
+        """Ghi (đè) file của `name` - gọi khi đang giữ khóa file"""
+        write_shared_graph(self._path(name), name, graph)
+
+    def lock_file(self, name: str) -> IO:
+        """File khóa của `name` (khóa bằng _lock(); đóng file là nhả khóa)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return open(self.directory / f"{name}.lock", "w")
+
+    def invalidate(self, name: str) -> None:
+        with self._lock:
+            self._open.pop(name, None)
+        self._path(name).unlink(missing_ok=True)
+
+
+def _lock(lock_file: IO) -> None:
+    """Khóa độc quyền liên tiến trình (chờ đến khi có); nhả khi đóng file"""
+    if fcntl is not None:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+
+# Khóa trong tiến trình cho shared_map_graph_async (theo tên đồ thị)
+_async_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _inode(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_ino
+    except OSError:
+        return None
+
+
+def map_graph_name(major_roads_only: bool, simplified: bool = False) -> str:
+    """Tên đồ thị dùng chung của bản đồ Bình Thạnh"""
+    name = "binh_thanh_major" if major_roads_only else "binh_thanh_all"
+    return f"{name}_simplified" if simplified else name
+
+
+def shared_map_graph(major_roads_only: bool, simplified: bool = False) -> SharedGraph:
+    """Bản đồ Bình Thạnh dùng chung (tải OSM nếu chưa có trong cache)"""
+    from map_data import osm_fetcher
+    return shared_graphs.get_or_build(
+        map_graph_name(major_roads_only, simplified),
+        lambda: osm_fetcher.fetch_binh_thanh_roads(major_roads_only, simplified)
+    )
+
+
+async def shared_map_graph_async(major_roads_only: bool, simplified: bool = False) -> SharedGraph:
+    """
+    Bản async của shared_map_graph(): không chặn event loop khi phải tải OSM
+
+    Chờ khóa file (ở luồng phụ) TRƯỚC khi tải OSM rồi kiểm tra lại file →
+    khởi động lạnh với N worker chỉ một worker gọi Overpass, các worker khác
+    đọc file vừa ghi. Trong một worker, các coroutine chờ asyncio.Lock trước:
+    nếu mỗi coroutine tự chờ flock ở luồng phụ, các luồng chờ sẽ chiếm hết
+    thread pool mặc định và coroutine giữ khóa không còn luồng để tải/ghi
+    """
+    name = map_graph_name(major_roads_only, simplified)
+    shared = shared_graphs.get(name)
+    if shared is not None:
+        return shared
+    from map_data import osm_fetcher
+    async with _async_locks.setdefault(name, asyncio.Lock()):
+        shared = shared_graphs.get(name)  # Coroutine trước vừa dựng xong
+        if shared is not None:
+            return shared
+        with shared_graphs.lock_file(name) as lock_file:
+            await asyncio.to_thread(_lock, lock_file)
+            # Giữ khóa rồi mới tải: worker chờ khóa thấy file đã có, không tải OSM lần nữa
+            shared = shared_graphs.get(name)
+            if shared is None:
+                graph = await osm_fetcher.fetch_binh_thanh_roads_async(major_roads_only, simplified)
+                await asyncio.to_thread(shared_graphs.write, name, graph)
+                shared = shared_graphs.get(name)
+    if shared is None:
+        raise RuntimeError(f"Failed to build shared graph: {name}")
+    return shared
+
+
+def preload(variants=(True, False)) -> None:
+    """Nạp trước các bản đồ mặc định (tiến trình cha, trước khi fork worker)"""
+    for major_roads_only in variants:
+        shared = shared_map_graph(major_roads_only)
+        print(f"Shared graph ready: {shared.path} "
+              f"({shared.meta['node_count']} nodes, {shared.meta['edge_count']} edges)")
+
+
+shared_graphs = SharedGraphCache()
+
+
+if __name__ == "__main__":
+    preload()
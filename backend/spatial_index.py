@@ -0,0 +1,96 @@
+"""
+FILE: spatial_index.py
+MÔ TẢ: Chỉ mục không gian dạng lưới cho đỉnh đồ thị (lat/lon)
+
+CHỨC NĂNG:
+    - Chia mặt phẳng lat/lon thành ô vuông cạnh `cell_size` độ
+    - query_bbox(): các đỉnh nằm trong khung nhìn - chỉ duyệt các ô giao bbox
+    - nearest(): đỉnh gần nhất với một điểm (tìm theo vòng ô mở rộng dần)
+
+CÁCH HOẠT ĐỘNG:
+    1. Dựng: mỗi đỉnh i → ô (floor(lat / cell), floor(lon / cell)) - O(V)
+    2. Truy vấn bbox: duyệt ô trong phạm vi, lọc chính xác theo tọa độ
+       → O(số ô + số đỉnh trả về)
+    3. nearest: mở rộng vòng ô r = 0, 1, 2...; khi đã có ứng viên thì
+       duyệt thêm một vòng (điểm gần nhất có thể nằm ở ô chéo) rồi dừng
+
+ĐẦU VÀO:
+    - lats, lons: dãy tọa độ bất kỳ hỗ trợ len()/[] (list, array, memoryview
+      trên file mmap của shared_graphs.py, ...);
+      chỉ mục giữ tham chiếu, không sao chép
+
+ĐẦU RA:
+    - Chỉ số đỉnh (vị trí trong lats/lons)
+"""
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_CELL_SIZE = 0.002  # độ (~220m ở vĩ độ TP.HCM)
+
+
+class GridSpatialIndex:
+    """Chỉ mục lưới đều trên tọa độ lat/lon"""
+
+    def __init__(self, lats: Sequence[float], lons: Sequence[float], cell_size: float = DEFAULT_CELL_SIZE):
+        self.lats = lats
+        self.lons = lons
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        cells = self.cells
+        cell = self._cell  # Cùng công thức với truy vấn: nhân nghịch đảo có thể lệch ô ở biên
+        for i in range(len(lats)):
+            key = cell(lats[i], lons[i])
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [i]
+            else:
+                bucket.append(i)
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_size), math.floor(lon / self.cell_size)
+
+    def query_bbox(self, south: float, west: float, north: float, east: float) -> List[int]:
+        """Chỉ số các đỉnh có south <= lat <= north và west <= lon <= east"""
+        (r0, c0), (r1, c1) = self._cell(south, west), self._cell(north, east)
+        lats, lons = self.lats, self.lons
+        result: List[int] = []
+        # Ít ô hơn số ô có dữ liệu → duyệt theo phạm vi; ngược lại duyệt các ô có dữ liệu
+        if (r1 - r0 + 1) * (c1 - c0 + 1) <= len(self.cells):
+            buckets = (self.cells.get((r, c)) for r in range(r0, r1 + 1) for c in range(c0, c1 + 1))
+        else:
+            buckets = (b for (r, c), b in self.cells.items() if r0 <= r <= r1 and c0 <= c <= c1)
+        for bucket in buckets:
+            if bucket:
+                result.extend(i for i in bucket
+                              if south <= lats[i] <= north and west <= lons[i] <= east)
+        return result
+
+    def nearest(self, lat: float, lon: float, max_rings: int = 64) -> Optional[int]:
+        """Chỉ số đỉnh gần (lat, lon) nhất theo khoảng cách phẳng, None nếu chỉ mục rỗng"""
+        if not self.cells:
+            return None
+        r0, c0 = self._cell(lat, lon)
+        lats, lons = self.lats, self.lons
+        best, best_d = None, float("inf")
+        found_at = None
+        for ring in range(max_rings + 1):
+            for r in range(r0 - ring, r0 + ring + 1):
+                for c in range(c0 - ring, c0 + ring + 1):
+                    if max(abs(r - r0), abs(c - c0)) != ring:
+                        continue  # Chỉ duyệt viền của vòng
+                    for i in self.cells.get((r, c), ()):
+                        d = (lats[i] - lat) ** 2 + (lons[i] - lon) ** 2
+                        if d < best_d:
+                            best, best_d = i, d
+            if best is not None:
+                if found_at is None:
+                    found_at = ring
+                elif ring > found_at:
+                    break
+        if best is None:
+            # Điểm ở rất xa mọi ô: quét tuyến tính
+            best = min(range(len(lats)), key=lambda i: (lats[i] - lat) ** 2 + (lons[i] - lon) ** 2)
+        return best
@@ -0,0 +1,260 @@
+"""
+FILE: viewport.py
+MÔ TẢ: Trả đồ thị theo khung nhìn + mức chi tiết (LOD) cho bản đồ frontend
+
+CHỨC NĂNG:
+    - Với bbox + zoom, chỉ trả các đỉnh trong khung nhìn và các cạnh nối tới
+      chúng → frontend vẽ vài trăm phần tử thay vì toàn bộ đồ thị
+    - Các mức chi tiết dựng sẵn một lần cho mỗi đồ thị (GraphLOD):
+        + "full"       (zoom >= 16): đồ thị gốc, hình học đầy đủ
+        + "simplified" (zoom >= 14): co chuỗi đỉnh bậc 2 (algorithms/simplification.py),
+                                     hình học chuỗi rút gọn bằng Douglas-Peucker
+        + "cluster"    (zoom < 14) : gộp đỉnh theo ô lưới (ô lớn dần khi zoom nhỏ),
+                                     mỗi cụm là một điểm có counts = số đỉnh gốc
+    - Mỗi mức có chỉ mục lưới riêng (spatial_index.py) → truy vấn O(kết quả)
+    - Bản đồ dùng chung (shared_graphs.py): mức "full" lấy id/tọa độ đỉnh
+      thẳng từ file mmap thay vì dựng list riêng trong mỗi worker
+    - LRU các GraphLOD theo khóa đồ thị (tên + inode/mtime → tự dựng lại khi
+      file đồ thị thay đổi); warmup.py dựng sẵn cho bản đồ mặc định
+
+ĐẦU RA (ViewportResponse, dạng cột cho gọn):
+    - node_ids/lats/lons (+ counts ở mức cluster)
+    - edge_sources/edge_targets + edge_coords: polyline [[lat, lon], ...] của từng cạnh
+    - truncated = True nếu vượt limit (client nên phóng to)
+
+CẤU HÌNH:
+    GRAPH_API_LOD_CACHE   Số đồ thị giữ LOD trong bộ nhớ (4)
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from algorithms.simplification import CHAINS_KEY, simplify_graph
+from models import GraphData
+from spatial_index import GridSpatialIndex
+
+DETAIL_ZOOM = 16
+SIMPLIFIED_ZOOM = 14
+SIMPLIFY_TOLERANCE = 1e-4  # độ (~11m): sai lệch hình học tối đa ở mức simplified
+# (zoom tối thiểu, cạnh ô gộp cụm theo độ)
+CLUSTER_LEVELS = ((12, 0.002), (10, 0.008), (8, 0.032), (0, 0.128))
+MAX_FEATURES = 5000
+LOD_CACHE_SIZE = int(os.environ.get("GRAPH_API_LOD_CACHE", 4))
+
+
+def _douglas_peucker(points: List[List[float]], tolerance: float) -> List[List[float]]:
+    """Rút gọn polyline, giữ điểm đầu/cuối (bản lặp, không đệ quy)"""
+    if len(points) < 3:
+        return points
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    tol2 = tolerance * tolerance
+    while stack:
+        first, last = stack.pop()
+        (ax, ay), (bx, by) = points[first], points[last]
+        dx, dy = bx - ax, by - ay
+        length2 = dx * dx + dy * dy
+        worst, worst_d = -1, tol2
+        for i in range(first + 1, last):
+            px, py = points[i]
+            if length2 == 0:
+                d = (px - ax) ** 2 + (py - ay) ** 2
+            else:
+                t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length2))
+                d = (px - ax - t * dx) ** 2 + (py - ay - t * dy) ** 2
+            if d > worst_d:
+                worst, worst_d = i, d
+        if worst > 0:
+            keep[worst] = True
+            stack.append((first, worst))
+            stack.append((worst, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+class LODLevel:
+    """Một mức chi tiết: đỉnh + cạnh (kèm polyline) + chỉ mục không gian"""
+
+    def __init__(self, name: str, min_zoom: int, ids: List[str], lats: List[float], lons: List[float],
+                 edges: List[Tuple[int, int]], geometry: Optional[List[Optional[list]]] = None,
+                 counts: Optional[List[int]] = None, cell_size: float = 0.002, margin: float = 0.0):
+        self.name = name
+        self.min_zoom = min_zoom
+        self.ids, self.lats, self.lons = ids, lats, lons
+        self.edges = edges
+        self.geometry = geometry  # Điểm giữa của từng cạnh, None = đoạn thẳng
+        self.counts = counts
+        self.margin = margin  # Mở rộng bbox: tâm cụm có thể nằm ngoài khung dù ô của nó giao khung
+        self.index = GridSpatialIndex(lats, lons, cell_size)
+        self.incident: List[List[int]] = [[] for _ in ids]
+        for k, (i, j) in enumerate(edges):
+            self.incident[i].append(k)
+            if j != i:
+                self.incident[j].append(k)
+
+    def _edge_coords(self, k: int) -> List[List[float]]:
+        i, j = self.edges[k]
+        coords = [[self.lats[i], self.lons[i]]]
+        if self.geometry is not None and self.geometry[k]:
+            coords.extend(self.geometry[k])
+        coords.append([self.lats[j], self.lons[j]])
+        return coords
+
+    def query(self, bbox: Sequence[float], limit: int) -> Dict[str, Any]:
+        """Đỉnh trong bbox (tối đa limit) + mọi cạnh nối tới chúng"""
+        south, west, north, east = bbox
+        m = self.margin
+        found = self.index.query_bbox(south - m, west - m, north + m, east + m)
+        total = len(found)
+        if total > limit:
+            found = found[:limit]
+        edge_ids = sorted({k for i in found for k in self.incident[i]})
+        ids = self.ids
+        return {
+            "level": self.name,
+            "node_ids": [ids[i] for i in found],
+            "lats": [self.lats[i] for i in found],
+            "lons": [self.lons[i] for i in found],
+            "counts": [self.counts[i] for i in found] if self.counts is not None else None,
+            "edge_sources": [ids[self.edges[k][0]] for k in edge_ids],
+            "edge_targets": [ids[self.edges[k][1]] for k in edge_ids],
+            "edge_coords": [self._edge_coords(k) for k in edge_ids],
+            "total_nodes": total,
+            "truncated": total > limit,
+        }
+
+
+def _graph_level(name: str, min_zoom: int, graph: GraphData, tolerance: Optional[float],
+                 columns: Optional[Tuple[Sequence[str], Sequence[float], Sequence[float]]] = None) -> LODLevel:
+    """
+    Mức từ một GraphData; hình học chuỗi đã co (metadata["chains"]) được giữ/rút gọn
+
+    columns: (ids, lats, lons) dựng sẵn theo thứ tự graph.nodes (vd. view trên
+    mmap); None = lấy từ graph.nodes
+    """
+    position = {node.id: i for i, node in enumerate(graph.nodes)}
+    chains = (graph.metadata or {}).get(CHAINS_KEY) or {}
+    edges: List[Tuple[int, int]] = []
+    geometry: List[Optional[list]] = []
+    for edge in graph.edges:
+        i, j = position.get(edge.source), position.get(edge.target)
+        if i is None or j is None:
+            continue
+        edges.append((i, j))
+        chain = chains.get(f"{edge.source}|{edge.target}")
+        coords = chain["coords"] if chain else None
+        if coords and tolerance:
+            ends = [[graph.nodes[i].lat, graph.nodes[i].lon]] + coords + [[graph.nodes[j].lat, graph.nodes[j].lon]]
+            coords = _douglas_peucker(ends, tolerance)[1:-1]
+        geometry.append(coords or None)
+    if columns is None:
+        columns = ([node.id for node in graph.nodes],
+                   [node.lat for node in graph.nodes], [node.lon for node in graph.nodes])
+    return LODLevel(name, min_zoom, *columns, edges, geometry if chains else None, cell_size=0.002)
+
+
+def _cluster_level(min_zoom: int, cell: float, base: LODLevel, base_counts: List[int]) -> LODLevel:
+    """Gộp đỉnh của mức base theo ô lưới cạnh cell; cạnh trùng giữa hai cụm bị gộp"""
+    cluster_of: List[int] = []
+    cells: Dict[Tuple[int, int], int] = {}
+    sums: List[List[float]] = []  # [tổng lat * count, tổng lon * count, count]
+    for lat, lon, count in zip(base.lats, base.lons, base_counts):
+        key = (int(lat // cell), int(lon // cell))
+        c = cells.get(key)
+        if c is None:
+            c = cells[key] = len(sums)
+            sums.append([0.0, 0.0, 0])
+        s = sums[c]
+        s[0] += lat * count
+        s[1] += lon * count
+        s[2] += count
+        cluster_of.append(c)
+    edges = sorted({(min(a, b), max(a, b)) for a, b in
+                    ((cluster_of[i], cluster_of[j]) for i, j in base.edges) if a != b})
+    keys = list(cells)
+    return LODLevel(
+        "cluster", min_zoom, [f"cluster:{min_zoom}:{r}:{c}" for r, c in keys],
+        [s[0] / s[2] for s in sums], [s[1] / s[2] for s in sums],
+        edges, None, counts=[s[2] for s in sums], cell_size=cell * 4, margin=cell
+    )
+
+
+class GraphLOD:
+    """Các mức chi tiết của một đồ thị, xếp theo min_zoom giảm dần"""
+
+    def __init__(self, graph: GraphData, columns=None):
+        self.node_count = len(graph.nodes)
+        self.edge_count = len(graph.edges)
+        full = _graph_level("full", DETAIL_ZOOM, graph, None, columns)
+        simplified = _graph_level("simplified", SIMPLIFIED_ZOOM,
+                                  simplify_graph(graph).graph, SIMPLIFY_TOLERANCE)
+        self.levels: List[LODLevel] = [full, simplified]
+        base, counts = simplified, [1] * len(simplified.ids)
+        for min_zoom, cell in CLUSTER_LEVELS:
+            base = _cluster_level(min_zoom, cell, base, counts)
+            counts = base.counts
+            self.levels.append(base)
+
+    def level_for(self, zoom: int) -> LODLevel:
+        for level in self.levels:
+            if zoom >= level.min_zoom:
+                return level
+        return self.levels[-1]
+
+    def query(self, bbox: Sequence[float], zoom: int, limit: int = MAX_FEATURES) -> Dict[str, Any]:
+        result = self.level_for(zoom).query(bbox, limit)
+        result.update(zoom=zoom, bbox=list(bbox),
+                      graph_node_count=self.node_count, graph_edge_count=self.edge_count)
+        return result
+
+
+class _LODCache:
+    """LRU các GraphLOD theo khóa đồ thị"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: "OrderedDict[str, GraphLOD]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: str, loader: Callable[[], GraphData], columns=None) -> GraphLOD:
+        """columns: (ids, lats, lons) cho mức "full" (xem _graph_level)"""
+        with self._lock:
+            lod = self._items.get(key)
+            if lod is not None:
+                self._items.move_to_end(key)
+                return lod
+            # Dựng trong khóa: các request cùng đồ thị chờ một lần dựng duy nhất
+            lod = GraphLOD(loader(), columns)
+            self._items[key] = lod
+            while len(self._items) > max(self.max_size, 1):
+                self._items.popitem(last=False)
+            return lod
+
+
+graph_lods = _LODCache(LOD_CACHE_SIZE)
+
+
+def map_lod_key(shared) -> str:
+    """Khóa LOD của bản đồ dùng chung (inode đổi khi file được dựng lại)"""
+    return f"map:{shared.meta['name']}:{shared.inode}"
+
+
+def shared_columns(shared) -> Tuple[Sequence[str], Sequence[float], Sequence[float]]:
+    """(ids, lats, lons) của bản đồ dùng chung - view trên mmap, không sao chép"""
+    return (shared.node_ids(), *shared.coordinates())
+
+
+def saved_lod_key(filename: str, mtime: float) -> str:
+    return f"saved:{filename}:{mtime}"
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """ "south,west,north,east" → tuple; ValueError nếu sai định dạng"""
+    parts = [float(value) for value in bbox.split(",")]
+    if len(parts) != 4:
+        raise ValueError("bbox must be south,west,north,east")
+    south, west, north, east = parts
+    if south > north or west > east:
+        raise ValueError("bbox must satisfy south <= north and west <= east")
+    return south, west, north, east
@@ -0,0 +1,167 @@
+"""
+FILE: warmup.py
+MÔ TẢ: Khởi động ấm - nạp và dựng sẵn đồ thị mặc định khi server khởi động
+
+CHỨC NĂNG:
+    - lifespan() của FastAPI: server nhận kết nối NGAY, việc nạp chạy ở luồng nền
+    - Nạp đồ thị mặc định:
+        + GRAPH_API_DEFAULT_GRAPH=<tên file> → đồ thị đã lưu trong saved_graphs/
+        + bỏ trống → bản đồ Bình Thạnh (đường chính) từ shared_graphs
+          (file mmap đã có thì không gọi Overpass)
+    - Dựng sẵn: chỉ mục đỉnh (GraphIndex), đồ thị NetworkX, hash nội dung,
+      các mức chi tiết cho /api/viewport (viewport.py) - chỉ mục không gian
+      của mức đầy đủ dùng làm spatial_index
+    - Đăng ký đồ thị NetworkX cho GraphAlgorithms.register_prebuilt()
+      → request đầu tiên trên bản đồ mặc định không phải dựng lại
+    - Bản đồ dùng chung: đăng ký CSR trên mmap (register_shared_adjacency)
+      và dùng id/tọa độ trong file cho mức "full" → không nhân theo số worker
+    - Nhãn thành phần liên thông (algorithms/components.py) của đồ thị mặc định
+    - Bảng mốc ALT (algorithms/landmarks.py): nạp từ file đã lưu hoặc tính
+      rồi lưu → shortest-path trên bản đồ mặc định dùng A* ALT ngay
+    - Trạng thái (starting/warming/ready/failed/disabled) + thời gian từng bước
+      được /api/health trả về
+
+CẤU HÌNH:
+    GRAPH_API_WARMUP=0          Tắt khởi động ấm
+    GRAPH_API_DEFAULT_GRAPH     Tên đồ thị đã lưu dùng làm đồ thị mặc định
+    GRAPH_API_ALT_LANDMARKS=0   Không tính bảng mốc ALT lúc khởi động
+
+LƯU Ý:
+    - Luồng nền là daemon: tắt server khi đang tải OSM không phải chờ
+    - Lỗi khi nạp không làm hỏng server, chỉ ghi vào trạng thái ("failed");
+      request vẫn chạy bình thường theo đường dựng lười
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, Tuple
+
+from models import GraphData, trusted_graph_from_dict
+from spatial_index import GridSpatialIndex
+
+WARMUP_ENABLED = os.environ.get("GRAPH_API_WARMUP", "1").lower() not in ("0", "false", "no")
+DEFAULT_GRAPH = os.environ.get("GRAPH_API_DEFAULT_GRAPH", "")
+
+
+class WarmState:
+    """Trạng thái khởi động ấm + các cấu trúc đã dựng sẵn"""
+
+    def __init__(self):
+        self.status = "starting" if WARMUP_ENABLED else "disabled"
+        self.source: Optional[str] = None
+        self.error: Optional[str] = None
+        self.timings_ms: Dict[str, float] = {}
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.graph: Optional[GraphData] = None
+        self.spatial_index: Optional[GridSpatialIndex] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        """Đã xong (thành công hoặc thất bại) - server phục vụ được đầy đủ"""
+        return self.status in ("ready", "failed", "disabled")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "source": self.source,
+            "node_count": len(self.graph.nodes) if self.graph is not None else None,
+            "edge_count": len(self.graph.edges) if self.graph is not None else None,
+            "timings_ms": dict(self.timings_ms),
+            "uptime_s": round(time.time() - self.started_at, 3),
+            "error": self.error,
+        }
+
+    def start(self) -> None:
+        """Chạy warm_up() ở luồng nền (gọi một lần từ lifespan)"""
+        if not WARMUP_ENABLED or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.warm_up, name="graph-warmup", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Chờ warm-up xong; trả về self.ready"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def _timed(self, name: str, fn):
+        started = time.perf_counter()
+        value = fn()
+        self.timings_ms[name] = round((time.perf_counter() - started) * 1000, 3)
+        return value
+
+    def warm_up(self) -> None:
+        """Nạp đồ thị mặc định và dựng sẵn mọi cấu trúc cho thuật toán"""
+        self.status = "warming"
+        try:
+            graph, source, lod_key, shared = self._timed("load", _load_default_graph)
+            self.graph, self.source = graph, source
+
+            # Import ở đây: networkx/algorithms chỉ nạp trong luồng nền
+            from algorithms import GraphAlgorithms
+            from algorithms.validation import graph_content_hash
+            from algorithms.landmarks import DEFAULT_LANDMARKS
+            from algorithms.traversal_engine import register_shared_adjacency
+            from viewport import DETAIL_ZOOM, graph_lods, shared_columns
+            algo = GraphAlgorithms(graph)
+            self._timed("build_graph", lambda: algo.G)  # self.G dựng lười
+            self._timed("content_hash", lambda: graph_content_hash(graph))
+            if shared is not None:
+                register_shared_adjacency(graph, shared.adjacency())
+            self._timed("components", algo.components)
+            GraphAlgorithms.register_prebuilt(algo)
+            if DEFAULT_LANDMARKS > 0 and graph.nodes and not algo.index.report.has_negative_weights:
+                self._timed("landmarks", lambda: algo.landmark_table(build=True, persist=True))
+
+            columns = shared_columns(shared) if shared is not None else None
+            lod = self._timed("viewport_lod", lambda: graph_lods.get_or_build(lod_key, lambda: graph, columns))
+            self.spatial_index = lod.level_for(DETAIL_ZOOM).index
+            self.status = "ready"
+        except Exception as e:
+            self.status = "failed"
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            self.finished_at = time.time()
+            self.timings_ms["total"] = round((self.finished_at - self.started_at) * 1000, 3)
+
+
+def _load_default_graph() -> Tuple[GraphData, str, str, Any]:
+    """
+    Nạp đồ thị mặc định
+
+    Trả về:
+        (đồ thị, mô tả nguồn, khóa LOD trùng với khóa /api/viewport dùng,
+         SharedGraph nếu là bản đồ dùng chung - None với đồ thị đã lưu)
+    """
+    from viewport import map_lod_key, saved_lod_key
+    if DEFAULT_GRAPH:
+        from graph_storage import graph_storage
+        mtime = graph_storage.modified_time(DEFAULT_GRAPH)
+        loaded = graph_storage.load_graph(DEFAULT_GRAPH)
+        if not loaded.success:
+            raise RuntimeError(loaded.error)
+        return loaded.graph, f"saved:{DEFAULT_GRAPH}", saved_lod_key(DEFAULT_GRAPH, mtime), None
+
+    from shared_graphs import shared_map_graph
+    shared = shared_map_graph(True)
+    payload = json.loads(bytes(shared.map_json()))
+    graph = trusted_graph_from_dict(payload["graph"])
+    return graph, f"shared:{shared.meta['name']}", map_lod_key(shared), shared
+
+
+warm_state = WarmState()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Lifespan FastAPI: khởi động warm-up nền rồi nhường cho server; tắt thì đóng client HTTP"""
+    warm_state.start()
+    yield
+    map_data = sys.modules.get("map_data")  # Chưa import = chưa từng tải OSM
+    if map_data is not None:
+        await map_data.osm_fetcher.aclose()
@@ -1,6 +1,9 @@
 // Configuration
 const API_BASE_URL = 'http://localhost:8000/api';
 const ANIMATION_SPEED_DEFAULT = 500;
+// Graphs larger than this are drawn per viewport (/api/viewport) instead of all at once
+const VIEWPORT_NODE_THRESHOLD = 2000;
+const VIEWPORT_DEBOUNCE_MS = 250;
 
 // Application State
 const state = {
@@ -13,7 +16,10 @@ const state = {
     animationSpeed: ANIMATION_SPEED_DEFAULT,
     isAnimating: false,
     animationPaused: false,
-    currentAnimation: null
+    currentAnimation: null,
+    viewport: null,          // { graph: saved filename or null for OSM map } when viewport mode is on
+    viewportRequestId: 0,
+    viewportTimer: null
 };
 
 // Initialize application
@@ -95,6 +101,9 @@ function initializeMap() {
         console.log('Custom node created:', customId, 'at', lat.toFixed(6), lon.toFixed(6));
     });
 
+    // Large graphs: fetch only what is in view after every pan/zoom
+    state.map.on('moveend', scheduleViewportRefresh);
+
     console.log('Map initialized with click-to-create functionality');
 }
 
@@ -178,7 +187,11 @@ async function loadMapData() {
 
         if (data.success && data.graph) {
             state.graphData = data.graph;
-            renderGraph(data.graph);
+            if (data.graph.nodes.length > VIEWPORT_NODE_THRESHOLD) {
+                enableViewportMode(null, data.graph.nodes);
+            } else {
+                renderGraph(data.graph);
+            }
             populateNodeSelectors(data.graph.nodes);
             updateStats(data.metadata.node_count, data.metadata.edge_count);
             setStatus('Ready', 'ready');
@@ -422,7 +435,11 @@ async function loadSavedGraph(filename) {
 
         if (data.success && data.graph) {
             state.graphData = data.graph;
-            renderGraph(data.graph);
+            if (data.graph.nodes.length > VIEWPORT_NODE_THRESHOLD) {
+                enableViewportMode(filename, data.graph.nodes);
+            } else {
+                renderGraph(data.graph);
+            }
             populateNodeSelectors(data.graph.nodes);
             updateStats(data.graph.nodes.length, data.graph.edges.length);
             setStatus('Ready', 'ready');
@@ -489,6 +506,116 @@ function renderGraph(graphData) {
     }
 }
 
+// Viewport mode: the full graph stays in state.graphData for algorithms,
+// but only the part in view is drawn, with coarser detail when zoomed out
+function enableViewportMode(graphName, nodes) {
+    clearMap();
+    state.viewport = { graph: graphName };
+
+    if (nodes.length > 0) {
+        const bounds = L.latLngBounds(nodes.map(n => [n.lat, n.lon]));
+        state.map.fitBounds(bounds, { padding: [50, 50] });
+    }
+    // fitBounds does not fire moveend when the view is unchanged
+    scheduleViewportRefresh();
+}
+
+function scheduleViewportRefresh() {
+    if (!state.viewport) return;
+    clearTimeout(state.viewportTimer);
+    state.viewportTimer = setTimeout(refreshViewport, VIEWPORT_DEBOUNCE_MS);
+}
+
+async function refreshViewport() {
+    if (!state.viewport) return;
+    const requestId = ++state.viewportRequestId;
+    const bounds = state.map.getBounds();
+    const params = new URLSearchParams({
+        bbox: [bounds.getSouth(), bounds.getWest(), bounds.getNorth(), bounds.getEast()].join(','),
+        zoom: state.map.getZoom(),
+        major_roads_only: 'true'
+    });
+    if (state.viewport.graph) params.set('graph', state.viewport.graph);
+
+    try {
+        const response = await fetch(`${API_BASE_URL}/viewport?${params}`);
+        const data = await response.json();
+        // Ignore responses overtaken by a newer pan/zoom
+        if (requestId !== state.viewportRequestId || !state.viewport) return;
+        if (!data.success) throw new Error(data.error);
+        renderViewport(data);
+    } catch (error) {
+        console.error('Error loading viewport:', error);
+    }
+}
+
+function renderViewport(data) {
+    clearLayers();
+
+    data.edge_coords.forEach((coords, i) => {
+        const polyline = L.polyline(coords, {
+            color: '#4b5563',
+            weight: 2,
+            opacity: 0.6
+        }).addTo(state.map);
+
+        state.edgePolylines.push({
+            polyline: polyline,
+            source: data.edge_sources[i],
+            target: data.edge_targets[i]
+        });
+    });
+
+    data.node_ids.forEach((nodeId, i) => {
+        const latlng = [data.lats[i], data.lons[i]];
+
+        if (data.counts) {
+            // Cluster of nodes: click to zoom in
+            const count = data.counts[i];
+            const marker = L.circleMarker(latlng, {
+                radius: Math.min(18, 5 + Math.log2(count + 1) * 2),
+                fillColor: '#06b6d4',
+                color: '#fff',
+                weight: 1,
+                opacity: 1,
+                fillOpacity: 0.6
+            }).addTo(state.map);
+            marker.bindTooltip(`${count} nodes`);
+            marker.on('click', (event) => {
+                L.DomEvent.stopPropagation(event);
+                state.map.setView(latlng, Math.min(state.map.getZoom() + 2, 19));
+            });
+            state.nodeMarkers[nodeId] = marker;
+            return;
+        }
+
+        const marker = L.circleMarker(latlng, {
+            radius: 6,
+            fillColor: '#06b6d4',
+            color: '#fff',
+            weight: 2,
+            opacity: 1,
+            fillOpacity: 0.8
+        }).addTo(state.map);
+
+        marker.bindPopup(`<b>Node ${nodeId}</b><br>Lat: ${latlng[0].toFixed(6)}<br>Lon: ${latlng[1].toFixed(6)}`);
+        marker.on('click', (event) => {
+            L.DomEvent.stopPropagation(event);
+            selectNode(nodeId);
+        });
+
+        state.nodeMarkers[nodeId] = marker;
+    });
+
+    // Keep the current selection visible after redrawing
+    if (state.selectedStartNode) highlightNode(state.selectedStartNode, '#f97316');
+    if (state.selectedEndNode) highlightNode(state.selectedEndNode, '#10b981');
+
+    if (data.truncated) {
+        console.log(`Viewport truncated: ${data.node_ids.length} of ${data.total_nodes} nodes, zoom in for more`);
+    }
+}
+
 function selectNode(nodeId) {
     console.log('Node clicked:', nodeId);
     console.log('Current state - Start:', state.selectedStartNode, 'End:', state.selectedEndNode);
@@ -775,7 +902,7 @@ function setStatus(status, type) {
     statusEl.style.color = colors[type] || colors.ready;
 }
 
-function clearMap() {
+function clearLayers() {
     // Remove all markers
     Object.values(state.nodeMarkers).forEach(marker => marker.remove());
     state.nodeMarkers = {};
@@ -783,6 +910,14 @@ function clearMap() {
     // Remove all polylines
     state.edgePolylines.forEach(({ polyline }) => polyline.remove());
     state.edgePolylines = [];
+}
+
+function clearMap() {
+    clearLayers();
+
+    // Leave viewport mode; a pending refresh must not redraw the old graph
+    state.viewport = null;
+    clearTimeout(state.viewportTimer);
 
     // Reset selections
     state.selectedStartNode = null;